@@ -0,0 +1,104 @@
+"""Command line tools.
+
+Examples:
+    python -m sphinx_multi_theme merge docs/_build/html shard1/html shard2/html
+    python -m sphinx_multi_theme serve-builds /tmp/docs.sock -- -b html docs docs/_build/html
+    python -m sphinx_multi_theme request-build /tmp/docs.sock
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme import __version__, utils
+from sphinx_multi_theme.daemon import send_request, serve_builds
+from sphinx_multi_theme.shard import merge
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :param argv: Arguments excluding the program name, defaults to sys.argv.
+
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python -m sphinx_multi_theme", description="Command line tools.")
+    parser.add_argument("--version", action="version", version=__version__)
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    merge_parser = commands.add_parser("merge", help="Combine output directories of sharded builds.")
+    merge_parser.add_argument("outdir", metavar="OUTDIR", help="Merged output directory.")
+    merge_parser.add_argument("shard_dirs", metavar="SHARD_DIR", nargs="+", help="Output directory of each shard.")
+
+    serve_parser = commands.add_parser("serve-builds", help="Keep Sphinx loaded and build all themes on request.")
+    serve_parser.add_argument("socket", metavar="SOCKET", help="Unix socket file path to listen on.")
+    serve_parser.add_argument("sphinx_args", metavar="SPHINX_ARG", nargs="+", help="sphinx-build arguments.")
+
+    request_parser = commands.add_parser("request-build", help="Ask a serve-builds process to build.")
+    request_parser.add_argument("socket", metavar="SOCKET", help="Unix socket file path of the serve-builds process.")
+    request_parser.add_argument("sphinx_args", metavar="SPHINX_ARG", nargs="*", help="Extra sphinx-build arguments.")
+    request_parser.add_argument("--stop", action="store_true", help="Stop the serve-builds process instead.")
+    return parser.parse_args(argv)
+
+
+def print_results(response: Dict) -> int:
+    """Print a build's per-theme results.
+
+    :param response: Response of a build request.
+
+    :return: Exit status of the build.
+    """
+    if "error" in response:
+        print(f"{utils.LOGGING_PREFIX}Error: {response['error']}", file=sys.stderr)
+        return 1
+    for theme in response["themes"]:
+        subdir = theme["subdir"] or "(primary theme)"
+        print(f"{utils.LOGGING_PREFIX}{theme['status']:<8} {theme['name']} {subdir} ({theme['seconds']:.2f} seconds)")
+    print(f"{utils.LOGGING_PREFIX}Build exited with status {response['status']} ({response['seconds']:.2f} seconds)")
+    return response["status"]
+
+
+def main_merge(args: argparse.Namespace) -> int:
+    """Combine output directories of sharded builds.
+
+    :param args: Parsed arguments.
+
+    :return: Exit status.
+    """
+    try:
+        owners = merge(args.shard_dirs, args.outdir)
+    except SphinxError as exc:
+        print(f"{utils.LOGGING_PREFIX}Error: {exc}", file=sys.stderr)
+        return 1
+    for subdir, shard_dir in sorted(owners.items()):
+        print(f"{utils.LOGGING_PREFIX}Merged {subdir or '(primary theme)'} from {shard_dir}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point.
+
+    :param argv: Arguments excluding the program name, defaults to sys.argv.
+
+    :return: Exit status.
+    """
+    args = parse_args(argv)
+    if args.command == "merge":
+        return main_merge(args)
+    try:
+        if args.command == "serve-builds":
+            serve_builds(args.socket, args.sphinx_args)
+            return 0
+        if args.stop:
+            send_request(args.socket, "stop")
+            return 0
+        return print_results(send_request(args.socket, "build", args.sphinx_args))
+    except (OSError, SphinxError) as exc:
+        print(f"{utils.LOGGING_PREFIX}Error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Write theme-independent output files once in the original process instead of once per theme.
+
+Images, downloadable files, copied sources, and the object inventory (objects.inv) come from source files and doctrees, not
+from the theme. Forked processes skip writing them and the original process hardlinks its own copies into their output
+directories after they finished (falling back to copies across filesystems). Like deduplicated files, linked files are
+turned back into independent copies before the next build so Sphinx never overwrites them in place through the links.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterator, Optional
+
+from sphinx.application import Sphinx
+from sphinx.builders.html import INVENTORY_FILENAME, StandaloneHTMLBuilder
+from sphinx.environment import BuildEnvironment
+from sphinx.util import ensuredir, logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.fingerprint import fingerprint_path, refresh_fingerprint
+from sphinx_multi_theme.search import noop
+from sphinx_multi_theme.theme import MultiTheme
+
+SHARED_DIRS = ("_downloads", "_images", "_sources")
+SHARED_FILES = (INVENTORY_FILENAME,)
+
+
+def skip_artifacts(app: Sphinx, _: BuildEnvironment):
+    """Stop a forked process from writing theme-independent files. Runs after forking, before the write phase.
+
+    :param app: Sphinx application.
+    :param _: Sphinx build environment.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if not app.config[utils.CONFIG_NAME_INTERNAL_IS_CHILD] or not multi_theme_instance:
+        return
+    if not isinstance(app.builder, StandaloneHTMLBuilder) or multi_theme_instance.active.own_artifacts:
+        return
+    app.builder.copy_image_files = noop
+    app.builder.copy_download_files = noop
+    app.builder.dump_inventory = noop
+    app.builder.copysource = False  # Pages still link to _sources since html_copy_source is unchanged.
+    log = logging.getLogger(__name__)
+    log.info("%sReusing the primary theme's images, downloads, sources, and inventory", utils.LOGGING_PREFIX)
+
+
+def iter_artifacts(outdir: str) -> Iterator[str]:
+    """Yield theme-independent files written by the original process.
+
+    :param outdir: Output directory of the primary theme.
+
+    :return: Paths relative to outdir.
+    """
+    for name in SHARED_FILES:
+        if os.path.isfile(os.path.join(outdir, name)):
+            yield name
+    for top in SHARED_DIRS:
+        for root, dirs, files in os.walk(os.path.join(outdir, top)):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.relpath(os.path.join(root, name), outdir)
+
+
+def share_file(src: str, dst: str) -> bool:
+    """Atomically replace dst with a hardlink to src (or a copy if hardlinks aren't possible) unless already linked.
+
+    :param src: File written by the original process.
+    :param dst: File in a secondary theme's output directory.
+
+    :return: True if dst was replaced.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return False
+    except OSError:
+        ensuredir(os.path.dirname(dst))  # Missing dst.
+    tmp = f"{dst}.multi_theme_tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)  # Left behind by an interrupted build.
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return True
+
+
+def share_artifacts(app: Sphinx, exc: Optional[Exception]):
+    """Link theme-independent files into every secondary theme's output that skipped writing them.
+
+    The original process rewrites these files on every build, so fingerprints of all sharing themes are refreshed to keep
+    up-to-date themes skipped. Linked files are recorded for deduplicate.unshare() to copy them before the next build.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if exc or not multi_theme_instance or not isinstance(app.builder, StandaloneHTMLBuilder):
+        return
+    artifacts = list(iter_artifacts(app.outdir))
+    linked: Dict[str, int] = {}
+    replaced = themes = 0
+    for theme in multi_theme_instance.themes[1:]:
+        subdir = os.path.join(app.outdir, theme.subdir)
+        if theme.own_artifacts or not os.path.isdir(subdir):  # Opted out, or built by another shard.
+            continue
+        for rel in artifacts:
+            dst = os.path.join(subdir, rel)
+            replaced += share_file(os.path.join(app.outdir, rel), dst)
+            linked[os.path.join(theme.subdir, rel)] = os.stat(dst).st_mtime_ns
+        refresh_fingerprint(fingerprint_path(app.outdir, theme))
+        themes += 1
+    if linked:
+        with open(os.path.join(app.doctreedir, utils.SHARED_ARTIFACTS_FILE_NAME), "w", encoding="utf8") as handle:
+            json.dump(linked, handle, indent=2, sort_keys=True)
+    log = logging.getLogger(__name__)
+    log.info("%sLinked %d shared files into %d secondary themes", utils.LOGGING_PREFIX, replaced, themes)
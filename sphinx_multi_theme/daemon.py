@@ -0,0 +1,264 @@
+"""Keep Sphinx, extensions, and themes imported in a long-running process and build on request over a Unix socket.
+
+Sphinx applications can't be reused across builds, so each request forks a fresh build from the warm process. Python startup
+and imports are paid once; conf.py and the pickled environment are still loaded by every build so changes are picked up.
+The build forks per-theme children as usual and reports each theme's result back through a pipe.
+
+Protocol: one JSON object per line. Requests are {"command": "build", "args": [...]}, {"command": "ping"}, or
+{"command": "stop"}; extra args are appended to the sphinx-build arguments the daemon was started with.
+"""
+import importlib
+import json
+import os
+import socket
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from sphinx.application import Sphinx
+from sphinx.cmd.build import build_main, get_parser
+from sphinx.config import CONFIG_FILENAME, eval_config_file
+from sphinx.errors import SphinxError
+from sphinx.util.tags import Tags
+
+from sphinx_multi_theme import utils
+
+WARM_MODULES = ["sphinx.builders.html", "sphinx.builders.linkcheck", "sphinx.search"]
+
+
+@dataclass
+class ThemeResult:
+    """A 'struct' representing the outcome of one theme in one build."""
+
+    name: str
+    subdir: str
+    status: str = "skipped"  # "built", "failed", or "skipped" (up-to-date, another shard's, or never started).
+    exit_status: Optional[int] = None
+    seconds: float = 0.0
+
+
+@dataclass
+class BuildResults:
+    """Collects per-theme results in the build process forked by the daemon, from multi-theme events."""
+
+    themes: Dict[str, ThemeResult] = field(default_factory=dict)  # Keyed by theme name.
+    pids: Dict[int, str] = field(default_factory=dict)
+    started: Dict[str, float] = field(default_factory=dict)
+    current: str = ""
+
+    def before_fork(self, _: Sphinx, *args):
+        """Record a secondary theme about to be forked (or skipped). Event handler.
+
+        :param _: Sphinx application.
+        :param args: Config, theme name, and subdir; empty when emitted right before os.fork().
+        """
+        if args:
+            _, name, subdir = args
+            self.themes[name] = ThemeResult(name, subdir)
+            self.current = name
+
+    def child_running(self, _: Sphinx, pid: int):
+        """Map a forked child to its theme. Event handler.
+
+        :param _: Sphinx application.
+        :param pid: Child process ID.
+        """
+        self.pids[pid] = self.current
+        self.started[self.current] = time.monotonic()
+
+    def child_exited(self, _: Sphinx, pid: int, exit_status: int):
+        """Record a child's result. Event handler.
+
+        :param _: Sphinx application.
+        :param pid: Child process ID.
+        :param exit_status: Exit status of the child.
+        """
+        name = self.pids.get(pid)
+        if name is None:
+            return
+        result = self.themes[name]
+        result.status = "built" if exit_status == 0 else "failed"
+        result.exit_status = exit_status
+        result.seconds = time.monotonic() - self.started[name]
+
+    def build_finished(self, app: Sphinx, _: Optional[Exception]):
+        """Record the primary theme built by this process. Event handler.
+
+        :param app: Sphinx application.
+        :param _: Exception raised during Sphinx build process.
+        """
+        if app.config[utils.CONFIG_NAME_INTERNAL_IS_CHILD] or not app.config[utils.CONFIG_NAME_INTERNAL_THEMES]:
+            return
+        primary = app.config[utils.CONFIG_NAME_INTERNAL_THEMES].themes[0]
+        self.themes[primary.name] = ThemeResult(primary.name, primary.subdir)
+
+    def finish(self, status: int, seconds: float) -> Dict:
+        """Fill in the primary theme's result once the build returned.
+
+        :param status: Exit status of the build.
+        :param seconds: Duration of the build.
+
+        :return: JSON serializable results.
+        """
+        for result in self.themes.values():
+            if not result.subdir:
+                result.status = "built" if status == 0 else "failed"
+                result.exit_status = status
+                result.seconds = seconds
+        return {"status": status, "seconds": seconds, "themes": [asdict(r) for r in self.themes.values()]}
+
+
+BUILD_RESULTS: Optional[BuildResults] = None  # Only set in build processes forked by the daemon.
+
+
+def setup_daemon(app: Sphinx):
+    """Report per-theme results to the daemon if this build was forked by it.
+
+    :param app: Sphinx application.
+    """
+    if BUILD_RESULTS is None:
+        return
+    app.connect("build-finished", BUILD_RESULTS.build_finished)
+    app.connect("multi-theme-after-fork-parent-child-exited", BUILD_RESULTS.child_exited)
+    app.connect("multi-theme-after-fork-parent-child-running", BUILD_RESULTS.child_running)
+    app.connect("multi-theme-before-fork", BUILD_RESULTS.before_fork)
+
+
+def warm_up(sphinx_args: List[str]) -> List[str]:
+    """Import Sphinx, the extensions listed in conf.py, and theme packages once so every build inherits them.
+
+    :param sphinx_args: sphinx-build arguments.
+
+    :return: Imported module names.
+    """
+    args = get_parser().parse_args(sphinx_args)
+    modules = list(WARM_MODULES)
+    namespace = eval_config_file(
+        os.path.join(os.path.abspath(args.confdir or args.sourcedir), CONFIG_FILENAME), Tags(args.tags)
+    )
+    modules.extend(namespace.get("extensions", []))
+    for module in modules:
+        importlib.import_module(module)
+    themes = getattr(namespace.get("html_theme"), "themes", [])
+    return modules + utils.preload_themes([t.name for t in themes])
+
+
+def run_build(sphinx_args: List[str]) -> Dict:
+    """Fork a build from the warm process and wait for it.
+
+    :param sphinx_args: sphinx-build arguments.
+
+    :return: Exit status, duration, and per-theme results.
+    """
+    global BUILD_RESULTS  # pylint: disable=global-statement
+
+    read_fd, write_fd = os.pipe()
+    start = time.monotonic()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()  # pylint: disable=no-member
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            BUILD_RESULTS = BuildResults()
+            sys.argv = [sys.argv[0], *sphinx_args]  # So -E and -a given with the request also rebuild up-to-date themes.
+            try:
+                status = build_main(sphinx_args)
+            except SystemExit as exc:  # Invalid arguments.
+                status = exc.code if isinstance(exc.code, int) else 1
+            payload = json.dumps(BUILD_RESULTS.finish(status, time.monotonic() - start)).encode("utf8")
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(payload)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)  # noqa pylint: disable=protected-access
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        payload = pipe.read()
+    exit_status = utils.decode_wait_status(os.waitpid(pid, 0)[1])
+    try:
+        return json.loads(payload.decode("utf8"))
+    except ValueError:
+        return {"status": exit_status, "seconds": time.monotonic() - start, "themes": []}
+
+
+def handle_request(connection: socket.socket, sphinx_args: List[str]) -> bool:
+    """Answer one request.
+
+    :param connection: Accepted client connection.
+    :param sphinx_args: sphinx-build arguments the daemon was started with.
+
+    :return: False if the daemon should stop.
+    """
+    command = ""
+    try:
+        with connection, connection.makefile("rwb") as stream:
+            response: Dict = {"pid": os.getpid()}
+            try:
+                request = json.loads(stream.readline().decode("utf8"))
+                command = request["command"]
+                args = request.get("args", [])
+                if not isinstance(args, list):
+                    raise TypeError(f"args must be a list, not {type(args).__name__}")
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                command, args, response = "", [], {"error": f"Invalid request: {exc}"}
+            if command == "build":
+                response = run_build(sphinx_args + [str(a) for a in args])
+            elif command and command not in ("ping", "stop"):
+                response = {"error": f"Unknown command {command!r}"}
+            stream.write(json.dumps(response).encode("utf8") + b"\n")
+            stream.flush()
+    except OSError as exc:  # Client disconnected before the response, e.g. request-build interrupted.
+        print(f"{utils.LOGGING_PREFIX}Could not answer {command or 'invalid'} request: {exc}", file=sys.stderr, flush=True)
+    return command != "stop"
+
+
+def serve_builds(socket_path: str, sphinx_args: List[str]):
+    """Warm up and answer requests until asked to stop. One build runs at a time.
+
+    :param socket_path: Unix socket file path, replaced if it exists. Only accessible by the current user.
+    :param sphinx_args: sphinx-build arguments.
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        raise SphinxError("serve-builds requires os.fork() and Unix sockets")
+    start = time.monotonic()
+    modules = warm_up(sphinx_args)
+    print(f"{utils.LOGGING_PREFIX}Imported {len(modules)} modules in {time.monotonic() - start:.2f} seconds", flush=True)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+    umask = os.umask(0o177)  # Only the owner may request builds, the socket is created 0600 without a race.
+    try:
+        try:
+            server.bind(socket_path)
+        finally:
+            os.umask(umask)
+        server.listen()
+        print(f"{utils.LOGGING_PREFIX}Serving builds on {socket_path}", flush=True)
+        while handle_request(server.accept()[0], sphinx_args):
+            pass
+    finally:
+        server.close()
+        os.remove(socket_path)
+
+
+def send_request(socket_path: str, command: str, args: Optional[List[str]] = None) -> Dict:
+    """Send one request to a running daemon and wait for the response.
+
+    :param socket_path: Unix socket file path.
+    :param command: "build", "ping", or "stop".
+    :param args: Extra sphinx-build arguments for this build.
+
+    :return: Response.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+    client.connect(socket_path)
+    with client, client.makefile("rwb") as stream:
+        stream.write(json.dumps({"command": command, "args": args or []}).encode("utf8") + b"\n")
+        stream.flush()
+        return json.loads(stream.readline().decode("utf8"))
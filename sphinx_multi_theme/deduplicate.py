@@ -0,0 +1,189 @@
+"""Replace identical files across theme subdirectories with links to save disk space and upload size.
+
+Sphinx overwrites existing output files in place, which would write through hardlinks and symlinks into every other theme's
+copy. Files linked by the previous build are therefore turned back into independent copies before the next build starts.
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sphinx.application import Sphinx
+from sphinx.util import logging
+
+from sphinx_multi_theme import utils
+
+try:
+    import fcntl
+except ImportError:  # Windows.
+    fcntl = None
+
+FICLONE = 0x40049409  # Linux ioctl to share data blocks of a file copy-on-write (btrfs, XFS).
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_output_files(outdir: str) -> Iterator[str]:
+    """Yield regular files in the output directory, skipping hidden directories (e.g. .doctrees) and symlinks.
+
+    :param outdir: Output directory of the primary theme, which contains all theme subdirectories.
+
+    :return: File paths.
+    """
+    for root, dirs, files in os.walk(outdir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name != utils.FINGERPRINT_FILE_NAME and not os.path.islink(path):
+                yield path
+
+
+def file_digest(path: str) -> str:
+    """Hash a file's contents.
+
+    :param path: File path.
+
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicates(paths: List[str]) -> List[List[str]]:
+    """Group files with identical contents. Only files of equal size are hashed.
+
+    :param paths: File paths.
+
+    :return: Groups of two or more paths, shallowest path first (files of the primary theme are kept as the originals).
+    """
+    by_size: Dict[int, List[str]] = {}
+    for path in paths:
+        size = os.path.getsize(path)
+        if size:
+            by_size.setdefault(size, []).append(path)
+
+    groups = []
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        by_digest: Dict[str, List[str]] = {}
+        for path in same_size:
+            by_digest.setdefault(file_digest(path), []).append(path)
+        groups.extend(g for g in by_digest.values() if len(g) > 1)
+    return sorted(sorted(g, key=lambda p: (p.count(os.sep), p)) for g in groups)
+
+
+def reflink(src: str, dst: str):
+    """Create a copy-on-write clone of a file.
+
+    :param src: Existing file.
+    :param dst: New file.
+    """
+    if fcntl is None:
+        raise OSError("Reflinks not supported on this platform")
+    with open(src, "rb") as src_handle, open(dst, "wb") as dst_handle:
+        try:
+            fcntl.ioctl(dst_handle.fileno(), FICLONE, src_handle.fileno())
+        except OSError:
+            dst_handle.close()
+            os.remove(dst)
+            raise
+
+
+def link_file(src: str, dst: str) -> str:
+    """Atomically replace dst with a hardlink to src, falling back to a reflink and then a relative symlink.
+
+    :param src: File to keep.
+    :param dst: Duplicate file to replace.
+
+    :return: The kind of link created.
+    """
+    tmp = f"{dst}.multi_theme_tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)  # Left behind by an interrupted build.
+    try:
+        os.link(src, tmp)
+        kind = "hardlink"
+    except OSError:
+        try:
+            reflink(src, tmp)
+            kind = "reflink"
+        except OSError:
+            os.symlink(os.path.relpath(src, os.path.dirname(dst)), tmp)
+            kind = "symlink"
+    if kind == "reflink":
+        shutil.copystat(dst, tmp)
+    os.replace(tmp, dst)
+    return kind
+
+
+def deduplicate(outdir: str) -> Tuple[Dict[str, int], int]:
+    """Replace duplicate files in the output directory with links.
+
+    :param outdir: Output directory of the primary theme.
+
+    :return: Original mtimes (in nanoseconds) of files replaced with hardlinks or symlinks keyed by paths relative to
+        outdir, and the number of bytes saved.
+    """
+    linked = {}
+    saved = 0
+    for group in find_duplicates(list(iter_output_files(outdir))):
+        src = group[0]
+        for dst in group[1:]:
+            if os.path.samefile(src, dst):
+                continue  # Already linked, e.g. shared by the original process.
+            stat = os.stat(dst)
+            if link_file(src, dst) != "reflink":
+                linked[os.path.relpath(dst, outdir)] = stat.st_mtime_ns
+            saved += stat.st_size
+    return linked, saved
+
+
+def unshare(outdir: str, manifest: str) -> int:
+    """Turn files linked by the previous build back into independent copies so Sphinx can safely overwrite them.
+
+    :param outdir: Output directory of the primary theme.
+    :param manifest: JSON file listing linked files, written by deduplicate_files() or share_artifacts(). Removed afterwards.
+
+    :return: Number of files copied.
+    """
+    try:
+        with open(manifest, encoding="utf8") as handle:
+            linked = json.load(handle)
+    except (OSError, ValueError):
+        return 0
+
+    copied = 0
+    for relpath, mtime_ns in linked.items():
+        path = os.path.join(outdir, relpath)
+        try:
+            if not os.path.islink(path) and os.stat(path).st_nlink < 2:
+                continue
+            tmp = f"{path}.multi_theme_tmp"
+            shutil.copy2(path, tmp)
+        except OSError:
+            continue  # Deleted since.
+        os.utime(tmp, ns=(mtime_ns, mtime_ns))  # Restore so fingerprints of skipped themes still match.
+        os.replace(tmp, path)
+        copied += 1
+    os.remove(manifest)
+    return copied
+
+
+def deduplicate_files(app: Sphinx, exc: Optional[Exception]):
+    """Deduplicate the output of all themes after the parent and all children are done. Connected in the parent only.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    if exc:
+        return
+    log = logging.getLogger(__name__)
+    linked, saved = deduplicate(app.outdir)
+    if linked:
+        with open(os.path.join(app.doctreedir, utils.DEDUPLICATED_FILE_NAME), "w", encoding="utf8") as handle:
+            json.dump(linked, handle, indent=2, sort_keys=True)
+    log.info("%sDeduplicated files, saved %.1f MiB (%d bytes)", utils.LOGGING_PREFIX, saved / 1024 / 1024, saved)
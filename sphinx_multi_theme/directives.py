@@ -9,6 +9,7 @@ from sphinx.util import logging
 
 from sphinx_multi_theme import utils
 from sphinx_multi_theme.nodes import MultiThemeTocTreeNode
+from sphinx_multi_theme.switcher import is_enabled, placeholder
 from sphinx_multi_theme.theme import MultiTheme
 
 
@@ -25,6 +26,10 @@ class MultiThemeTocTreeDirective(other.TocTree):
         Usually only called from index.rst and no other documents despite the sidebar being rendered in all documents on some
         Sphinx themes.
         """
+        multi_theme: Optional[MultiTheme] = self.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+        if is_enabled(self.config) and multi_theme and len(multi_theme.themes) > 1:
+            return [placeholder(self.options.get("caption"), "reversed" in self.options)]
+
         self.options["maxdepth"] = 1
         self.options["titlesonly"] = True
         return super().run()
@@ -43,27 +48,18 @@ class MultiThemeTocTreeDirective(other.TocTree):
             self.options["hidden"] = True
             return []
 
-        # Populate entries.
+        # Populate entries. Relative links are resolved when writing since the active theme may change after reading.
         entries: List[Tuple[str, str]] = toctree.setdefault("entries", [])
-        ref_prefixes: List[str] = toctree.setdefault("ref_prefixes", [])
-        active_is_primary = multi_theme.active == multi_theme.primary
+        ref_subdirs: List[str] = toctree.setdefault("ref_subdirs", [])
         for theme in multi_theme.themes:
-            if theme.is_active:
-                ref_prefix = ""
-            elif active_is_primary:
-                ref_prefix = theme.subdir
-            elif theme.is_primary:
-                ref_prefix = ".."
-            else:
-                ref_prefix = f"../{theme.subdir}"
             text = theme.display_name or theme.name
             ref = "self"
             entries.append((text, ref))
-            ref_prefixes.append(ref_prefix)
+            ref_subdirs.append(theme.subdir)
 
         # Implement reversed option.
         if "reversed" in self.options:
-            for key in ("entries", "ref_prefixes"):
+            for key in ("entries", "ref_subdirs"):
                 toctree[key] = list(reversed(toctree[key]))
 
         # Replace the original toctree node with a custom one.
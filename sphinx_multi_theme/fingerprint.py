@@ -0,0 +1,270 @@
+"""Fingerprints of everything a secondary theme's output depends on so up-to-date themes can be skipped without forking."""
+import hashlib
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import sphinx
+from sphinx.application import Sphinx
+from sphinx.builders.html import get_stable_hash
+from sphinx.cmd.build import get_parser
+from sphinx.config import Config, CONFIG_FILENAME
+from sphinx.util import logging
+from sphinx.util.matching import Matcher
+
+from sphinx_multi_theme import __version__, utils
+from sphinx_multi_theme.theme import MultiTheme, Theme
+
+CONFIG_CATEGORIES = ["env", "html"]  # Config values that cause Sphinx to re-read or re-write documents when changed.
+CONFIG_PATHS = ["html_extra_path", "html_static_path", "html_theme_path", "templates_path"]  # Relative to the confdir.
+
+
+def iter_file_stats(top: str, exclude: Matcher, *skip_dirs: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield modification time and size of every file in a directory tree.
+
+    Hidden directories (e.g. .git and .doctrees), __pycache__, excluded directories, skipped directories, and fingerprint
+    files are skipped.
+
+    :param top: Directory to walk, e.g. the Sphinx source directory.
+    :param exclude: Matcher built from exclude_patterns.
+    :param skip_dirs: Directories to skip, e.g. the output and doctree directories.
+
+    :return: Relative path, mtime in nanoseconds, and size of each file.
+    """
+    skip = {os.path.abspath(d) for d in skip_dirs}
+    for root, dirs, files in os.walk(top):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+        dirs[:] = [d for d in dirs if not exclude(os.path.relpath(os.path.join(root, d), top))]
+        dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) not in skip]
+        for name in sorted(files):
+            if name == utils.FINGERPRINT_FILE_NAME:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield os.path.relpath(path, top), stat.st_mtime_ns, stat.st_size
+
+
+def directory_fingerprint(top: str, exclude: Matcher, *skip_dirs: str) -> str:
+    """Hash the state of all files in a directory tree.
+
+    :param top: Directory to walk.
+    :param exclude: Matcher built from exclude_patterns.
+    :param skip_dirs: Directories to skip.
+
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for stat in iter_file_stats(top, exclude, *skip_dirs):
+        digest.update(repr(stat).encode())
+    return digest.hexdigest()
+
+
+def paths_fingerprint(paths: Sequence[str]) -> str:
+    """Hash the state of individual files, missing files included.
+
+    :param paths: File paths.
+
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest.update(repr((path, None)).encode())
+            continue
+        digest.update(repr((path, stat.st_mtime_ns, stat.st_size)).encode())
+    return digest.hexdigest()
+
+
+def dependency_paths(app: Sphinx) -> List[str]:
+    """Files documents depend on according to the build environment, e.g. included files and autodoc'd modules.
+
+    :param app: Sphinx application after the read phase.
+
+    :return: Absolute paths.
+    """
+    dependencies = getattr(app.env, "dependencies", None) or {}
+    return sorted({os.path.normpath(os.path.join(app.srcdir, d)) for deps in dependencies.values() for d in deps})
+
+
+def theme_package_version(name: str) -> str:
+    """Get the version of the Python package providing a theme.
+
+    :param name: Theme name.
+
+    :return: Package version, or an empty string for built-in themes and themes found via html_theme_path.
+    """
+    entry_point = utils.theme_entry_points().get(name)
+    dist = getattr(entry_point, "dist", None)
+    return getattr(dist, "version", "") or ""
+
+
+def sources_fingerprint(app: Sphinx, config: Config) -> str:
+    """Hash the state of all files in the source directory, conf.py, and directories listed in config values.
+
+    Directories listed in config values (e.g. html_theme_path) are only walked if they're outside the source directory.
+    Computed once for all themes.
+
+    :param app: Sphinx application.
+    :param config: Sphinx configuration.
+
+    :return: Hex digest.
+    """
+    srcdir = os.path.abspath(app.srcdir)
+    digest = hashlib.sha256()
+    digest.update(directory_fingerprint(srcdir, Matcher(config.exclude_patterns), app.outdir, app.doctreedir).encode())
+    if not app.confdir:
+        return digest.hexdigest()
+    digest.update(paths_fingerprint([os.path.join(os.path.abspath(app.confdir), CONFIG_FILENAME)]).encode())
+    for name in CONFIG_PATHS:
+        for entry in config[name] if name in config else []:
+            path = os.path.join(os.path.abspath(app.confdir), entry)
+            if os.path.commonpath([srcdir, path]) != srcdir and os.path.isdir(path):
+                digest.update(directory_fingerprint(path, Matcher([]), app.outdir, app.doctreedir).encode())
+    return digest.hexdigest()
+
+
+def compute_fingerprint(config: Config, multi_theme_instance: MultiTheme, theme: Theme, sources: str) -> str:
+    """Hash config values, package versions, all themes' names and subdirs, and the state of source files.
+
+    :param config: Sphinx configuration.
+    :param multi_theme_instance: MultiTheme instance, every theme's toctree links to every other theme.
+    :param theme: The theme being fingerprinted.
+    :param sources: Output of sources_fingerprint().
+
+    :return: Hex digest.
+    """
+    values: Dict[str, object] = {}
+    for opt in config.filter(CONFIG_CATEGORIES):
+        if opt.name == "html_theme" or opt.name.startswith("multi_theme__INTERNAL__"):
+            continue
+        value = opt.value
+        if isinstance(value, dict):  # html_context may reference the MultiTheme instance like html_theme does.
+            value = {k: (theme.name if v is multi_theme_instance else v) for k, v in value.items()}
+        values[opt.name] = value
+
+    digest = hashlib.sha256()
+    digest.update(get_stable_hash(values).encode())
+    digest.update(repr((sphinx.__version__, __version__, theme_package_version(theme.name))).encode())
+    digest.update(repr([(t.name, t.display_name, t.subdir) for t in multi_theme_instance.themes]).encode())
+    digest.update(repr((theme.name, theme.subdir)).encode())
+    digest.update(sources.encode())
+    return digest.hexdigest()
+
+
+def fingerprint_path(outdir: str, theme: Theme) -> str:
+    """Path to the fingerprint file stored next to the theme's output (like Sphinx's .buildinfo).
+
+    :param outdir: Output directory of the primary theme.
+    :param theme: Secondary theme.
+
+    :return: File path.
+    """
+    return os.path.join(outdir, theme.subdir, utils.FINGERPRINT_FILE_NAME)
+
+
+def read_fingerprint(path: str) -> Tuple[str, str, str, List[str]]:
+    """Read a previously written fingerprint.
+
+    :param path: File path.
+
+    :return: Hex digests of the theme's inputs, outputs, and dependencies, followed by the dependencies' paths. Empty if
+        the file is missing or invalid.
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            lines = handle.read().splitlines()
+    except OSError:
+        return "", "", "", []
+    if len(lines) < 3 or not all(lines[:3]):
+        return "", "", "", []
+    return lines[0], lines[1], lines[2], lines[3:]
+
+
+def write_fingerprint(path: str, fingerprint: str, dependencies: Sequence[str] = ()):
+    """Write a fingerprint after the theme was built successfully, along with fingerprints of its outputs and dependencies.
+
+    :param path: File path.
+    :param fingerprint: Hex digest of the theme's inputs.
+    :param dependencies: Files the theme's documents depend on, from dependency_paths().
+    """
+    outputs = directory_fingerprint(os.path.dirname(path), Matcher([]))
+    with open(path, "w", encoding="utf8") as handle:
+        handle.write(f"{fingerprint}\n{outputs}\n{paths_fingerprint(dependencies)}\n")
+        handle.writelines(f"{d}\n" for d in dependencies)
+
+
+def refresh_fingerprint(path: str):
+    """Update the output fingerprint after the original process changed a successfully built theme's output directory.
+
+    :param path: File path, nothing is written if the file is missing.
+    """
+    inputs, _, _, dependencies = read_fingerprint(path)
+    if inputs:
+        write_fingerprint(path, inputs, dependencies)
+
+
+def save_fingerprint(app: Sphinx, exc: Optional[Exception], fingerprint: str):
+    """Write the fingerprint into the child's output directory if its build succeeded. Connected with functools.partial.
+
+    :param app: Sphinx application.
+    :param exc: Exception during build if it failed.
+    :param fingerprint: Hex digest of the theme's inputs.
+    """
+    if not exc:
+        write_fingerprint(os.path.join(app.outdir, utils.FINGERPRINT_FILE_NAME), fingerprint, dependency_paths(app))
+
+
+def is_up_to_date(path: str, fingerprint: str) -> bool:
+    """Check if the theme was built with the same inputs and neither its dependencies nor its output directory changed.
+
+    Dependencies are files recorded by Sphinx while reading (e.g. included files and autodoc'd modules), also outside the
+    source directory.
+
+    :param path: File path.
+    :param fingerprint: Hex digest of the theme's current inputs.
+
+    :return: True if the theme can be skipped.
+    """
+    inputs, outputs, dependencies_digest, dependencies = read_fingerprint(path)
+    if inputs != fingerprint or dependencies_digest != paths_fingerprint(dependencies):
+        return False
+    return outputs == directory_fingerprint(os.path.dirname(path), Matcher([]))
+
+
+def rebuild_requested(app: Sphinx, argv: Optional[List[str]] = None) -> bool:
+    """Check if sphinx-build was asked to rebuild everything (-E or -a), which must not skip up-to-date themes either.
+
+    The application doesn't keep either flag (-a is only passed to Sphinx.build() after forking), so they're read from the
+    command line (sphinx-build's or make mode's) if that is the command line building this output directory.
+
+    :param app: Sphinx application.
+    :param argv: Command line arguments, defaults to sys.argv[1:].
+
+    :return: True if all themes must be built.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["-M"] and len(argv) >= 4:  # sphinx-build -M builder sourcedir builddir [options]
+        argv = argv[4:] + [argv[2], os.path.join(argv[3], argv[1])]
+
+    def error(message: str):
+        raise ValueError(message)
+
+    parser = get_parser()
+    parser.error = error  # Not sphinx-build's command line (e.g. serve-builds or pytest), don't print usage and exit.
+    try:
+        args, _ = parser.parse_known_args(argv)
+    except ValueError:
+        return False
+    if os.path.abspath(args.outputdir) != os.path.abspath(app.outdir):
+        return False
+    log = logging.getLogger(__name__)
+    if args.freshenv:
+        log.info("%sNot skipping up-to-date themes, fresh environment requested (-E)", utils.LOGGING_PREFIX)
+    elif args.force_all:
+        log.info("%sNot skipping up-to-date themes, writing all files requested (-a)", utils.LOGGING_PREFIX)
+    return args.freshenv or args.force_all
@@ -0,0 +1,221 @@
+"""GNU make jobserver client so forked children and Sphinx parallel workers share one budget of job slots.
+
+https://www.gnu.org/software/make/manual/html_node/Job-Slots.html
+
+Every process started by make holds one implicit job slot. Additional slots are tokens (single bytes) read from the jobserver
+pipe or fifo and must be written back when the job is done.
+"""
+import os
+import select
+import shlex
+from typing import List, Optional, Tuple, Union
+
+from sphinx.application import Sphinx
+from sphinx.util import logging
+
+from sphinx_multi_theme import utils
+
+
+def parse_makeflags(makeflags: str) -> Optional[Union[Tuple[int, int], str]]:
+    """Find jobserver details in the MAKEFLAGS environment variable.
+
+    :param makeflags: Value of MAKEFLAGS.
+
+    :return: Read and write file descriptors, a fifo path, or None if there is no jobserver.
+    """
+    try:
+        words = shlex.split(makeflags)
+    except ValueError:
+        words = makeflags.split()
+    auth = None
+    for word in words:
+        for prefix in ("--jobserver-auth=", "--jobserver-fds="):
+            if word.startswith(prefix):
+                auth = word[len(prefix) :]  # noqa
+    if not auth:
+        return None
+    if auth.startswith("fifo:"):
+        return auth[5:]
+    try:
+        read_fd, write_fd = (int(fd) for fd in auth.split(","))
+    except ValueError:
+        return None
+    if read_fd < 0 or write_fd < 0:
+        return None  # Make disabled the jobserver for this recipe (e.g. not marked with "+").
+    return read_fd, write_fd
+
+
+class JobServer:
+    """Acquire and release job slot tokens shared with GNU make or other sphinx-build processes."""
+
+    TOKEN = b"+"
+
+    def __init__(self, read_fd: int, write_fd: int, parallel: int = 1):
+        """Constructor.
+
+        :param read_fd: File descriptor to read tokens from.
+        :param write_fd: File descriptor to return tokens to.
+        :param parallel: Number of parallel jobs Sphinx was asked to use (sphinx-build -j).
+        """
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+        self.parallel = parallel
+        self.held: List[bytes] = []  # Extra tokens held by this process for Sphinx's own parallel workers.
+        self.owned_fds: List[int] = []  # Opened by this process, closed by close().
+        self.makeflags: Optional[Tuple[Optional[str]]] = None  # MAKEFLAGS to restore in close(), None if not changed.
+
+    @classmethod
+    def from_makeflags(cls, makeflags: str, parallel: int = 1) -> Optional["JobServer"]:
+        """Connect to the jobserver advertised in MAKEFLAGS.
+
+        :param makeflags: Value of MAKEFLAGS.
+        :param parallel: Number of parallel jobs Sphinx was asked to use.
+
+        :return: JobServer instance or None if there is no usable jobserver.
+        """
+        auth = parse_makeflags(makeflags)
+        if auth is None:
+            return None
+        try:
+            if isinstance(auth, str):
+                read_fd = os.open(auth, os.O_RDONLY | os.O_NONBLOCK)
+                write_fd = os.open(auth, os.O_WRONLY)
+            else:
+                os.fstat(auth[0])
+                os.fstat(auth[1])
+                read_fd = cls.reopen_nonblocking(auth[0])
+                write_fd = auth[1]
+        except OSError:
+            return None
+        jobserver = cls(read_fd, write_fd, parallel)
+        if isinstance(auth, str):
+            jobserver.owned_fds = [read_fd, write_fd]
+        elif read_fd != auth[0]:
+            jobserver.owned_fds = [read_fd]
+        return jobserver
+
+    @classmethod
+    def create(cls, slots: int, parallel: int = 1) -> "JobServer":
+        """Create an internal jobserver and advertise it in MAKEFLAGS for any sub-processes until close() is called.
+
+        :param slots: Total number of job slots including the one implicitly held by this process.
+        :param parallel: Number of parallel jobs Sphinx was asked to use.
+        """
+        read_fd, write_fd = os.pipe()
+        os.set_inheritable(read_fd, True)
+        os.set_inheritable(write_fd, True)
+        os.write(write_fd, cls.TOKEN * (max(slots, 1) - 1))
+        makeflags = os.environ.get("MAKEFLAGS")
+        os.environ["MAKEFLAGS"] = f"{makeflags or ''} -j{slots} --jobserver-auth={read_fd},{write_fd}".strip()
+        jobserver = cls(cls.reopen_nonblocking(read_fd), write_fd, parallel)
+        jobserver.owned_fds = sorted({read_fd, write_fd, jobserver.read_fd})
+        jobserver.makeflags = (makeflags,)
+        return jobserver
+
+    @staticmethod
+    def reopen_nonblocking(read_fd: int) -> int:
+        """Open a new non-blocking file description for a pipe so other processes sharing it stay blocking.
+
+        :param read_fd: File descriptor of the read end of the pipe.
+
+        :return: New non-blocking file descriptor, or the original one if the platform doesn't support reopening.
+        """
+        proc_path = f"/proc/self/fd/{read_fd}"
+        if os.path.exists(proc_path):
+            try:
+                return os.open(proc_path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                pass
+        return read_fd
+
+    def try_acquire(self) -> Optional[bytes]:
+        """Read one token without blocking.
+
+        :return: The token or None if none are available.
+        """
+        try:
+            readable = select.select([self.read_fd], [], [], 0)[0]
+        except (OSError, ValueError):
+            return None
+        if not readable:
+            return None
+        try:
+            token = os.read(self.read_fd, 1)
+        except (BlockingIOError, InterruptedError):
+            return None
+        return token or None
+
+    def release(self, token: bytes = TOKEN):
+        """Return a token to the jobserver.
+
+        :param token: The token previously acquired.
+        """
+        os.write(self.write_fd, token)
+
+    def release_held(self, *_):
+        """Return all extra tokens held by this process. Can be connected to Sphinx events."""
+        while self.held:
+            self.release(self.held.pop())
+
+    def close(self, *_):
+        """Return all extra tokens, close file descriptors opened by this process, and restore MAKEFLAGS.
+
+        Can be connected to Sphinx events.
+        """
+        self.release_held()
+        while self.owned_fds:
+            try:
+                os.close(self.owned_fds.pop())
+            except OSError:
+                pass
+        if self.makeflags is not None:
+            if self.makeflags[0] is None:
+                os.environ.pop("MAKEFLAGS", None)
+            else:
+                os.environ["MAKEFLAGS"] = self.makeflags[0]
+            self.makeflags = None
+
+    def forked(self):
+        """Forget tokens held by the parent process. Call in the child right after forking."""
+        self.held = []
+
+    def limit_parallel(self, app: Sphinx):
+        """Set Sphinx's number of parallel workers to the implicit slot plus as many extra tokens as are available now.
+
+        :param app: Sphinx application.
+        """
+        self.release_held()
+        while len(self.held) < self.parallel - 1:
+            token = self.try_acquire()
+            if token is None:
+                break
+            self.held.append(token)
+        app.parallel = len(self.held) + 1
+        if self.parallel > 1:
+            log = logging.getLogger(__name__)
+            log.info("%sUsing %d of %d parallel jobs", utils.LOGGING_PREFIX, app.parallel, self.parallel)
+
+
+def init_jobserver(app: Sphinx, slots: Optional[int]) -> Optional[JobServer]:
+    """Connect to the GNU make jobserver, or create an internal one if requested and make doesn't provide one.
+
+    :param app: Sphinx application.
+    :param slots: Number of job slots for the internal jobserver, None to only use GNU make's.
+
+    :return: JobServer instance or None.
+    """
+    log = logging.getLogger(__name__)
+    jobserver = JobServer.from_makeflags(os.environ.get("MAKEFLAGS", ""), app.parallel)
+    if jobserver:
+        log.info("%sUsing GNU make jobserver", utils.LOGGING_PREFIX)
+    elif slots:
+        jobserver = JobServer.create(slots, app.parallel)
+        log.info("%sCreated jobserver with %d job slots", utils.LOGGING_PREFIX, slots)
+    else:
+        return None
+
+    # Return extra tokens when Sphinx is done, including in children that exit early. Stop advertising an internal jobserver.
+    app.connect("build-finished", jobserver.close, priority=utils.SPHINX_CONNECT_PRIORITY_RELEASE_JOB_SLOTS)
+    app.connect("multi-theme-unsupported-builder-child-before-exit", jobserver.release_held)
+    jobserver.limit_parallel(app)
+    return jobserver
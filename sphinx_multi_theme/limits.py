@@ -0,0 +1,69 @@
+"""Per-theme wall clock and memory limits for forked children."""
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from sphinx.config import Config
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme import utils
+
+try:
+    import resource
+except ImportError:  # Windows.
+    resource = None
+
+
+@dataclass
+class Limits:
+    """A 'struct' representing the limits of one child process."""
+
+    timeout: Optional[float] = None  # Wall clock seconds, enforced by the parent.
+    memory: Optional[int] = None  # Address space in MiB, enforced by the kernel in the child.
+
+
+def resolve_limit(value: Optional[Union[int, float, Dict[str, Union[int, float]]]], theme_name: str, name: str):
+    """Get one theme's limit from a config value.
+
+    :param value: Config value, either a number for all themes or a dict keyed by theme name ("*" for all others).
+    :param theme_name: Theme name.
+    :param name: Config name for error messages.
+
+    :return: Positive number, or None if the theme has no limit.
+    """
+    if isinstance(value, dict):
+        value = value.get(theme_name, value.get("*"))
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise SphinxError(f"Invalid value for {name}: {value!r}")
+    return value
+
+
+def set_memory_limit(mib: int):
+    """Limit the address space of the current (child) process. Allocations beyond it raise MemoryError.
+
+    The hard limit is left alone, the soft limit is never raised above it.
+
+    :param mib: Limit in MiB.
+    """
+    if resource is None:
+        return
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    soft = int(mib * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def theme_limits(config: Config, theme_name: str) -> Limits:
+    """Get one theme's limits from the Sphinx config.
+
+    :param config: Sphinx configuration.
+    :param theme_name: Theme name.
+
+    :return: Limits of the theme's child process.
+    """
+    return Limits(
+        timeout=resolve_limit(config[utils.CONFIG_NAME_TIMEOUT], theme_name, utils.CONFIG_NAME_TIMEOUT),
+        memory=resolve_limit(config[utils.CONFIG_NAME_MEMORY_LIMIT], theme_name, utils.CONFIG_NAME_MEMORY_LIMIT),
+    )
@@ -0,0 +1,123 @@
+"""Persistent cache of linkcheck results so stable external links aren't checked again on every build.
+
+Results are stored in an SQLite database keyed by URL and anchor. SQLite serializes concurrent writers, so forked processes
+checking links per theme can share one cache file.
+"""
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from sphinx.config import Config
+from sphinx.errors import SphinxError
+from sphinx.util import ensuredir
+
+from sphinx_multi_theme import utils
+
+DEFAULT_TTLS = {"broken": 0, "ok": 7 * 24 * 3600, "redirect": 24 * 3600}  # Seconds, 0 never caches.
+STATUS_TTL_KEYS = {"broken": "broken", "redirected": "redirect", "working": "ok"}  # Sphinx linkcheck status to TTL key.
+LOCK_TIMEOUT = 60  # Seconds to wait for another process holding the write lock.
+
+
+def resolve_ttls(value: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Merge the TTL config value with the defaults.
+
+    :param value: Config value, seconds keyed by "ok", "redirect", or "broken".
+
+    :return: TTL of every key.
+    """
+    ttls = dict(DEFAULT_TTLS)
+    for key, ttl in (value or {}).items():
+        if key not in ttls or isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0:
+            raise SphinxError(f"Invalid value for {utils.CONFIG_NAME_LINKCHECK_CACHE_TTL}: {value!r}")
+        ttls[key] = ttl
+    return ttls
+
+
+def split_uri(uri: str) -> Tuple[str, str]:
+    """Split a link into the URL and its anchor.
+
+    :param uri: Link as found in the documents.
+
+    :return: URL and anchor (empty if none).
+    """
+    url, _, anchor = uri.partition("#")
+    return url, anchor
+
+
+class LinkCache:
+    """Look up and store linkcheck results, counting hits and misses."""
+
+    def __init__(self, path: str, ttls: Dict[str, float]):
+        """Constructor.
+
+        :param path: SQLite database file path, created if missing.
+        :param ttls: Seconds results stay valid, keyed by "ok", "redirect", or "broken".
+        """
+        self.path = path
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self.pending: Dict[Tuple[str, str], Tuple[str, str, int, float]] = {}
+        ensuredir(os.path.dirname(path))
+        self.connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS links (url TEXT, anchor TEXT, status TEXT, message TEXT, code INTEGER, "
+                "checked REAL, PRIMARY KEY (url, anchor))"
+            )
+
+    def get(self, uri: str) -> Optional[Tuple[str, str, int]]:
+        """Look up an unexpired result.
+
+        :param uri: Link as found in the documents.
+
+        :return: Status, message, and HTTP status code, or None on a cache miss.
+        """
+        row = self.connection.execute(
+            "SELECT status, message, code, checked FROM links WHERE url = ? AND anchor = ?", split_uri(uri)
+        ).fetchone()
+        if row and time.time() - row[3] < self.ttls.get(STATUS_TTL_KEYS.get(row[0], ""), 0):
+            self.hits += 1
+            return row[0], row[1], row[2]
+        self.misses += 1
+        return None
+
+    def put(self, uri: str, status: str, message: str, code: int):
+        """Remember a result until save() is called. Statuses without a TTL (e.g. ignored or local links) are skipped.
+
+        :param uri: Link as found in the documents.
+        :param status: Sphinx linkcheck status.
+        :param message: Reason or redirect target.
+        :param code: HTTP status code.
+        """
+        if self.ttls.get(STATUS_TTL_KEYS.get(status, ""), 0) > 0:
+            self.pending[split_uri(uri)] = (status, message, code, time.time())
+
+    def save(self):
+        """Write remembered results in one transaction and drop entries older than the longest TTL."""
+        oldest = time.time() - max(self.ttls.values())
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?, ?)", [k + v for k, v in self.pending.items()]
+            )
+            self.connection.execute("DELETE FROM links WHERE checked < ?", (oldest,))
+        self.pending.clear()
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+
+def open_cache(config: Config, confdir: str) -> Optional[LinkCache]:
+    """Open the cache if enabled.
+
+    :param config: Sphinx configuration.
+    :param confdir: Directory the cache path is relative to.
+
+    :return: LinkCache instance or None.
+    """
+    path = config[utils.CONFIG_NAME_LINKCHECK_CACHE]
+    if not path:
+        return None
+    return LinkCache(os.path.join(confdir, path), resolve_ttls(config[utils.CONFIG_NAME_LINKCHECK_CACHE_TTL]))
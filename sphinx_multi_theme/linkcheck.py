@@ -0,0 +1,127 @@
+"""Check external links once for all themes instead of once per theme.
+
+Links come from doctrees, which are the same for every theme unless an extension changes them depending on the theme. Forked
+processes only collect their links and hand them to the original process, which checks the union of all links and writes
+one report.
+"""
+import json
+import os
+from typing import Dict, List
+
+from sphinx.application import Sphinx
+from sphinx.builders.linkcheck import CheckExternalLinksBuilder
+from sphinx.util import logging
+
+try:
+    from sphinx.builders.linkcheck import CheckResult, Hyperlink, HyperlinkAvailabilityChecker
+except ImportError:  # Sphinx < 4.1 checks links while writing each document.
+    CheckResult = Hyperlink = HyperlinkAvailabilityChecker = None
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.fingerprint import fingerprint_path
+from sphinx_multi_theme.linkcache import LinkCache, open_cache
+from sphinx_multi_theme.theme import MultiTheme
+
+
+def save_links(path: str, hyperlinks: Dict[str, Hyperlink]):
+    """Write links collected by a forked process.
+
+    :param path: JSON file path.
+    :param hyperlinks: Links keyed by URI.
+    """
+    with open(path, "w", encoding="utf8") as handle:
+        json.dump([link._asdict() for link in hyperlinks.values()], handle)
+
+
+def load_links(path: str) -> List[Hyperlink]:
+    """Read links collected by a forked process.
+
+    The file is kept next to the theme's fingerprint so the links are reused when the theme is skipped as up-to-date.
+
+    :param path: JSON file path.
+
+    :return: Links, empty if the file is missing or invalid.
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            return [Hyperlink(**link) for link in json.load(handle)]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+class MultiThemeLinkCheckBuilder(CheckExternalLinksBuilder):
+    """Linkcheck builder that checks links found in all themes in the original process only."""
+
+    def finish(self):
+        """Check links, or hand them to the original process in forked processes."""
+        multi_theme_instance: MultiTheme = self.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+        if self.config[utils.CONFIG_NAME_LINKCHECK] != utils.LINKCHECK_ONCE or not multi_theme_instance or not Hyperlink:
+            self.check_links()
+            return
+        if self.config[utils.CONFIG_NAME_INTERNAL_IS_CHILD]:
+            save_links(os.path.join(self.outdir, utils.LINKCHECK_LINKS_FILE_NAME), self.hyperlinks)
+            return
+
+        # Children still running while the original process built the primary theme must finish collecting first.
+        self.app.emit("multi-theme-before-linkcheck")
+        own = len(self.hyperlinks)
+        for theme in multi_theme_instance.themes[1:]:
+            if not os.path.exists(fingerprint_path(self.outdir, theme)):
+                continue  # Theme failed, its links file may be left over from an older build.
+            for link in load_links(os.path.join(self.outdir, theme.subdir, utils.LINKCHECK_LINKS_FILE_NAME)):
+                self.hyperlinks.setdefault(link.uri, link)
+        log = logging.getLogger(__name__)
+        log.info(
+            "%sChecking %d links once for %d themes (%d only found in secondary themes)",
+            utils.LOGGING_PREFIX,
+            len(self.hyperlinks),
+            len(multi_theme_instance.themes),
+            len(self.hyperlinks) - own,
+        )
+        self.check_links()
+
+    def check_links(self):
+        """Check collected links and write the report, skipping links with results in the persistent cache."""
+        cache = open_cache(self.config, self.app.confdir) if Hyperlink else None
+        if not cache:
+            super().finish()
+            return
+        try:
+            self.check_links_cached(cache)
+            cache.save()
+        finally:
+            cache.close()
+        log = logging.getLogger(__name__)
+        log.info("%sLinkcheck cache: %d hits, %d misses", utils.LOGGING_PREFIX, cache.hits, cache.misses)
+
+    def check_links_cached(self, cache: LinkCache):
+        """Same as CheckExternalLinksBuilder.finish() but only links missing from the cache are checked.
+
+        :param cache: Opened cache, results of checked links are added to it.
+        """
+        checker = HyperlinkAvailabilityChecker(self.env, self.config, self)
+        logging.getLogger(__name__).info("")
+        uncached: Dict[str, Hyperlink] = {}
+        txt_path, json_path = os.path.join(self.outdir, "output.txt"), os.path.join(self.outdir, "output.json")
+        with open(txt_path, "w", encoding="utf8") as txt_outfile, open(json_path, "w", encoding="utf8") as json_outfile:
+            self.txt_outfile, self.json_outfile = txt_outfile, json_outfile  # pylint: disable=attribute-defined-outside-init
+            for uri, link in self.hyperlinks.items():
+                cached = cache.get(uri)
+                if cached:
+                    self.process_result(CheckResult(uri, link.docname, link.lineno, *cached))
+                else:
+                    uncached[uri] = link
+            for result in checker.check(uncached):
+                cache.put(result.uri, result.status, result.message, result.code)
+                self.process_result(result)
+        if self._broken:
+            self.app.statuscode = 1
+
+
+def setup_linkcheck(app: Sphinx):
+    """Replace Sphinx's linkcheck builder.
+
+    :param app: Sphinx application.
+    """
+    app.add_builder(MultiThemeLinkCheckBuilder, override=True)
+    app.add_event("multi-theme-before-linkcheck")
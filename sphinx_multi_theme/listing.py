@@ -0,0 +1,144 @@
+"""Stream a listing of the output directory with os.scandir() instead of rendering the whole tree in memory first."""
+import heapq
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STYLES = {  # Same tokens as seedir, which this replaces.
+    "arrow": {"split": "  ", "extend": "  ", "space": "  ", "final": "  ", "folderstart": ">", "filestart": ">"},
+    "dash": {"split": "|-", "extend": "| ", "space": "  ", "final": "|-", "folderstart": "", "filestart": ""},
+    "emoji": {"split": "├─", "extend": "│ ", "space": "  ", "final": "└─", "folderstart": "📁 ", "filestart": "📄 "},
+    "lines": {"split": "├─", "extend": "│ ", "space": "  ", "final": "└─", "folderstart": "", "filestart": ""},
+    "plus": {"split": "+-", "extend": "| ", "space": "  ", "final": "+-", "folderstart": "", "filestart": ""},
+    "spaces": {"split": "  ", "extend": "  ", "space": "  ", "final": "  ", "folderstart": "", "filestart": ""},
+}
+
+
+@dataclass
+class TreeSummary:
+    """A 'struct' representing the files in one theme's output directory."""
+
+    name: str  # Theme name.
+    subdir: str
+    files: int = 0
+    size: int = 0  # Bytes.
+    largest: List[Tuple[int, str]] = field(default_factory=list)  # Min-heap of size and path relative to the subdir.
+
+    def add(self, path: str, size: int, keep: int):
+        """Count one file.
+
+        :param path: File path relative to the theme's subdir.
+        :param size: File size in bytes.
+        :param keep: Remember this many of the largest files.
+        """
+        self.files += 1
+        self.size += size
+        if keep > 0:
+            if len(self.largest) < keep:
+                heapq.heappush(self.largest, (size, path))
+            else:
+                heapq.heappushpop(self.largest, (size, path))
+
+
+def scan(path: str) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """List one directory, folders first like seedir.
+
+    :param path: Directory path.
+
+    :return: Subdirectories and other entries, each sorted by name. Symlinked directories are not followed.
+    """
+    dirs, files = [], []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            (dirs if entry.is_dir(follow_symlinks=False) else files).append(entry)
+    return sorted(dirs, key=lambda e: e.name), sorted(files, key=lambda e: e.name)
+
+
+class TreeWalker:
+    """Yield a directory tree line by line, reading each directory only when reaching it."""
+
+    def __init__(self, style: str = "dash", max_depth: Optional[int] = None, max_entries: Optional[int] = None):
+        """Constructor.
+
+        :param style: Key of STYLES.
+        :param max_depth: Don't descend into directories deeper than this, 1 lists only the top level. None for unlimited.
+        :param max_entries: List up to this many entries per directory, then the number of remaining entries.
+        """
+        self.tokens = STYLES[style]
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+
+    def walk(self, path: str) -> Iterator[str]:
+        """Yield the listing of a directory.
+
+        :param path: Directory path.
+
+        :return: Lines, starting with the directory itself.
+        """
+        yield f"{self.tokens['folderstart']}{os.path.basename(os.path.normpath(path))}{os.sep}"
+        yield from self.children(path, "", 1)
+
+    def children(self, path: str, prefix: str, depth: int) -> Iterator[str]:
+        """Yield the entries of one directory and their descendants.
+
+        :param path: Directory path.
+        :param prefix: Indentation of this level.
+        :param depth: Depth of the entries, 1 for the top level.
+
+        :return: Lines.
+        """
+        try:
+            dirs, files = scan(path)
+        except OSError:
+            return
+        entries = [(e, True) for e in dirs] + [(e, False) for e in files]
+        hidden = 0
+        if self.max_entries is not None and len(entries) > self.max_entries:
+            hidden = len(entries) - self.max_entries
+            entries = entries[: self.max_entries]
+
+        for i, (entry, is_dir) in enumerate(entries):
+            last = i == len(entries) - 1 and not hidden
+            branch = self.tokens["final" if last else "split"]
+            if not is_dir:
+                yield f"{prefix}{branch}{self.tokens['filestart']}{entry.name}"
+                continue
+            yield f"{prefix}{branch}{self.tokens['folderstart']}{entry.name}{os.sep}"
+            if self.max_depth is None or depth < self.max_depth:
+                yield from self.children(entry.path, prefix + self.tokens["space" if last else "extend"], depth + 1)
+        if hidden:
+            yield f"{prefix}{self.tokens['final']}... {hidden} more"
+
+
+def summarize(outdir: str, themes: List[Tuple[str, str]], keep: int = 3) -> List[TreeSummary]:
+    """Count files and bytes of each theme's output, skipping hidden directories such as .doctrees.
+
+    :param outdir: Output directory of the primary theme.
+    :param themes: Name and subdir of each theme, the primary theme's subdir is "".
+    :param keep: Remember this many of the largest files per theme.
+
+    :return: One summary per theme in the same order.
+    """
+    summaries = [TreeSummary(name, subdir) for name, subdir in themes]
+    by_subdir: Dict[str, TreeSummary] = {s.subdir: s for s in summaries}
+    stack = [(outdir, "", by_subdir.get("", TreeSummary("", "")))]
+    while stack:
+        path, rel, summary = stack.pop()
+        try:
+            dirs, files = scan(path)
+        except OSError:
+            continue
+        for entry in dirs:
+            if entry.name.startswith("."):
+                continue
+            if path == outdir and entry.name in by_subdir:
+                stack.append((entry.path, "", by_subdir[entry.name]))
+            else:
+                stack.append((entry.path, os.path.join(rel, entry.name), summary))
+        for entry in files:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue  # Dangling symlink.
+            summary.add(os.path.join(rel, entry.name), size, keep)
+    return summaries
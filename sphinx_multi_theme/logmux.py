@@ -0,0 +1,192 @@
+"""Stream log output of forked child processes to the parent process through pipes.
+
+Each child replaces its Sphinx status and warning streams with PipeStream instances which send newline-delimited JSON records
+to the parent. The parent's LogMultiplexer reads all pipes in a background thread, so children never block on a full pipe
+even while the parent is busy building the primary theme, and writes complete lines prefixed with the theme name to the
+parent's own status or warning stream.
+"""
+import json
+import os
+import select
+import threading
+from typing import Dict, IO, List, Optional
+
+from sphinx.application import Sphinx
+from sphinx.util import logging
+
+STREAM_STATUS = "status"
+STREAM_WARNING = "warning"
+
+
+class PipeStream:
+    """File-like object given to Sphinx's logging handlers in a child process."""
+
+    encoding = "utf-8"
+
+    def __init__(self, write_fd: int, stream: str):
+        """Constructor.
+
+        :param write_fd: Write end of the pipe to the parent.
+        :param stream: Which of the parent's streams to write to, STREAM_STATUS or STREAM_WARNING.
+        """
+        self.write_fd = write_fd
+        self.stream = stream
+
+    def write(self, text: str):
+        """Send text to the parent.
+
+        :param text: Text to write, does not have to be a complete line.
+        """
+        if not text:
+            return
+        data = (json.dumps({"stream": self.stream, "text": text}) + "\n").encode("utf8")
+        while data:
+            data = data[os.write(self.write_fd, data) :]  # noqa
+
+    def flush(self):
+        """Nothing is buffered."""
+
+    @staticmethod
+    def isatty() -> bool:
+        """Never a terminal."""
+        return False
+
+
+def redirect_logs(app: Sphinx, write_fd: int):
+    """Send all Sphinx log output of this (child) process to the parent.
+
+    :param app: Sphinx application.
+    :param write_fd: Write end of the pipe to the parent.
+    """
+    status = PipeStream(write_fd, STREAM_STATUS)
+    warning = PipeStream(write_fd, STREAM_WARNING)
+    app._status = status  # noqa pylint: disable=protected-access
+    app._warning = warning  # noqa pylint: disable=protected-access
+    logging.setup(app, status, warning)
+
+
+class Source:  # pylint: disable=too-few-public-methods
+    """Buffers for one child's pipe."""
+
+    def __init__(self, prefix: str):
+        """Constructor.
+
+        :param prefix: Prepended to every line, e.g. the theme name.
+        """
+        self.prefix = prefix
+        self.records = b""  # Incomplete JSON record.
+        self.lines = {STREAM_STATUS: "", STREAM_WARNING: ""}  # Incomplete lines.
+        self.closed = threading.Event()
+
+
+class LogMultiplexer:
+    """Read log records from children's pipes in a background thread and write them to the parent's streams."""
+
+    def __init__(self, status: Optional[IO], warning: Optional[IO]):
+        """Constructor.
+
+        :param status: Parent's status stream (app._status).
+        :param warning: Parent's warning stream (app._warning).
+        """
+        self.streams = {STREAM_STATUS: status, STREAM_WARNING: warning}
+        self.lock = threading.Lock()  # Held while writing, acquire it around os.fork() so the child doesn't inherit it held.
+        self.sources: Dict[int, Source] = {}
+        self.wake_read_fd, self.wake_write_fd = os.pipe()
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, read_fd: int, prefix: str) -> Source:
+        """Start reading from a child's pipe.
+
+        :param read_fd: Read end of the pipe. Closed once the child closed its end.
+        :param prefix: Prepended to every line.
+
+        :return: The child's buffers, to be passed to drain().
+        """
+        source = self.sources[read_fd] = Source(prefix)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="multi-theme-logs", daemon=True)
+            self.thread.start()
+        else:
+            os.write(self.wake_write_fd, b"\0")
+        return source
+
+    @staticmethod
+    def drain(source: Source, timeout: float = 5.0):
+        """Wait until everything the child wrote has been processed. Call after the child exited.
+
+        :param source: Returned by add().
+        :param timeout: Give up after this many seconds, e.g. if the child left a grandchild holding the pipe open.
+        """
+        source.closed.wait(timeout)
+
+    def forked(self):
+        """Release resources inherited by a child process, which has no background thread."""
+        for read_fd in self.sources:
+            os.close(read_fd)
+        self.sources = {}
+        os.close(self.wake_read_fd)
+        os.close(self.wake_write_fd)
+        self.thread = None
+
+    def stop(self):
+        """Stop the background thread after all children exited."""
+        if self.thread is None:
+            return
+        os.write(self.wake_write_fd, b"\1")
+        self.thread.join()
+        self.thread = None
+
+    def run(self):
+        """Background thread."""
+        while True:
+            readable: List[int] = select.select([self.wake_read_fd, *self.sources], [], [])[0]
+            for read_fd in readable:
+                if read_fd == self.wake_read_fd:
+                    if b"\1" in os.read(self.wake_read_fd, 512):
+                        return
+                    continue
+                data = os.read(read_fd, 65536)
+                with self.lock:
+                    self.feed(self.sources[read_fd], data)
+                    if not data:
+                        os.close(read_fd)
+                        self.sources.pop(read_fd).closed.set()
+
+    def feed(self, source: Source, data: bytes):
+        """Parse records and write complete lines.
+
+        :param source: The child's buffers.
+        :param data: Bytes read from the pipe, empty at EOF.
+        """
+        *records, source.records = (source.records + data + (b"" if data else b"\n")).split(b"\n")
+        for record in records:
+            if not record:
+                continue
+            try:
+                decoded = json.loads(record.decode("utf8"))
+                stream, text = decoded["stream"], decoded["text"]
+            except (ValueError, KeyError, TypeError):
+                stream, text = STREAM_STATUS, record.decode("utf8", "replace") + "\n"
+            if stream not in source.lines:
+                stream = STREAM_STATUS
+            *lines, source.lines[stream] = (source.lines[stream] + text).split("\n")
+            self.write(stream, "".join(f"{source.prefix}{line}\n" for line in lines))
+
+        if not data:  # EOF, flush incomplete lines.
+            for stream, line in source.lines.items():
+                if line:
+                    self.write(stream, f"{source.prefix}{line}\n")
+            source.lines = {}
+
+    def write(self, stream: str, text: str):
+        """Write to one of the parent's streams.
+
+        :param stream: STREAM_STATUS or STREAM_WARNING.
+        :param text: Complete lines.
+        """
+        handle = self.streams[stream]
+        if not text or handle is None:
+            return
+        handle.write(text)
+        if hasattr(handle, "flush"):
+            handle.flush()
@@ -0,0 +1,127 @@
+"""Write a machine-readable manifest of every output file (size, mtime, SHA-256) for deploy diffing and cache keys.
+
+Files are hashed in a thread pool (hashlib releases the GIL) with a bounded number of files in flight, and entries are
+written in order as they complete, so memory use doesn't grow with the number of files.
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sphinx.application import Sphinx
+from sphinx.util import ensuredir, logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.deduplicate import file_digest
+from sphinx_multi_theme.theme import MultiTheme
+
+HASH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+NDJSON_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def iter_manifest_files(outdir: str, exclude: str = "") -> Iterator[str]:
+    """Yield files in the output directory, skipping hidden directories (e.g. .doctrees) and bookkeeping files.
+
+    Unlike deduplication, symlinked files are included since they are deployed like any other file.
+
+    :param outdir: Output directory of the primary theme, which contains all theme subdirectories.
+    :param exclude: Absolute path of a file to skip (and its temporary file), i.e. the manifest itself.
+
+    :return: Paths relative to outdir.
+    """
+    for root, dirs, files in os.walk(outdir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name in (utils.FINGERPRINT_FILE_NAME, utils.SHARD_MANIFEST_FILE_NAME):
+                continue
+            if exclude and os.path.abspath(path) in (exclude, f"{exclude}.tmp"):
+                continue
+            yield os.path.relpath(path, outdir)
+
+
+def manifest_entry(outdir: str, rel: str, theme_name: str) -> Dict[str, Union[str, int, float]]:
+    """Stat and hash one file.
+
+    :param outdir: Output directory of the primary theme.
+    :param rel: File path relative to outdir.
+    :param theme_name: Name of the theme that built the file.
+
+    :return: Manifest entry.
+    """
+    path = os.path.join(outdir, rel)
+    stat = os.stat(path)
+    return {
+        "path": rel.replace(os.sep, "/"),
+        "theme": theme_name,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": file_digest(path),
+    }
+
+
+def iter_manifest(outdir: str, themes: List[Tuple[str, str]], exclude: str = "") -> Iterator[Dict]:
+    """Yield manifest entries in directory walk order while hashing up to HASH_WORKERS files concurrently.
+
+    :param outdir: Output directory of the primary theme.
+    :param themes: Name and subdir of each theme, the primary theme's subdir is "".
+    :param exclude: Absolute path of a file to skip.
+
+    :return: Manifest entries.
+    """
+    by_subdir = {subdir: name for name, subdir in themes}
+    primary = by_subdir.get("", "")
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        for rel in iter_manifest_files(outdir, exclude):
+            top = rel.split(os.sep, 1)[0] if os.sep in rel else ""
+            pending.append(executor.submit(manifest_entry, outdir, rel, by_subdir.get(top, primary)))
+            if len(pending) >= HASH_WORKERS * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_manifest(path: str, entries: Iterable[Dict]) -> int:
+    """Write entries as a JSON list, or one JSON object per line if the file extension is .jsonl or .ndjson.
+
+    The file is replaced atomically so readers never see a partial manifest.
+
+    :param path: File path.
+    :param entries: Manifest entries.
+
+    :return: Number of entries written.
+    """
+    ndjson = path.endswith(NDJSON_EXTENSIONS)
+    count = 0
+    ensuredir(os.path.dirname(path))
+    with open(f"{path}.tmp", "w", encoding="utf8") as handle:
+        if not ndjson:
+            handle.write("[")
+        for entry in entries:
+            if ndjson:
+                handle.write(f"{json.dumps(entry, sort_keys=True)}\n")
+            else:
+                handle.write(f"{',' if count else ''}\n  {json.dumps(entry, sort_keys=True)}")
+            count += 1
+        if not ndjson:
+            handle.write("\n]\n")
+    os.replace(f"{path}.tmp", path)
+    return count
+
+
+def write_output_manifest(app: Sphinx, exc: Optional[Exception]):
+    """Write the output manifest after all themes are built. Noop in children.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    if exc or not app.config[utils.CONFIG_NAME_OUTPUT_MANIFEST] or app.config[utils.CONFIG_NAME_INTERNAL_IS_CHILD]:
+        return
+    log = logging.getLogger(__name__)
+    path = os.path.abspath(os.path.join(app.confdir, app.config[utils.CONFIG_NAME_OUTPUT_MANIFEST]))
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    themes = [(t.name, t.subdir) for t in multi_theme_instance.themes] if multi_theme_instance else []
+    count = write_manifest(path, iter_manifest(app.outdir, themes, exclude=path))
+    log.info("%sWrote output manifest of %d files to %s", utils.LOGGING_PREFIX, count, path)
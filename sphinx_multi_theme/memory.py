@@ -0,0 +1,101 @@
+"""Observe available memory on Linux (including cgroup limits of containers) to admit new children without OOMing."""
+import os
+from typing import Iterator, Optional, Tuple
+
+CGROUP_UNLIMITED = 1 << 60  # cgroup v1 reports "unlimited" as a huge number close to 2**63.
+
+
+def read_int(path: str) -> Optional[int]:
+    """Read a file containing a single integer, such as cgroup memory files.
+
+    :param path: File path.
+
+    :return: The integer, or None if the file is missing, unreadable, or contains "max".
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            return int(handle.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def meminfo_available(path: str = "/proc/meminfo") -> Optional[int]:
+    """Get the memory available for new processes on the whole machine.
+
+    :param path: Path to meminfo.
+
+    :return: MemAvailable in bytes, or None if unknown.
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def cgroup_dirs(root: str, proc_cgroup: str) -> Iterator[Tuple[str, str, str]]:
+    """Find the memory cgroup directories of the current process, for both cgroup v2 and v1.
+
+    Inside containers the cgroup path in /proc/self/cgroup may not exist under root (cgroup namespaces), so root itself is
+    tried as well.
+
+    :param root: cgroup filesystem mount point.
+    :param proc_cgroup: Path to /proc/self/cgroup.
+
+    :return: Directory, limit file name, and usage file name.
+    """
+    try:
+        with open(proc_cgroup, encoding="utf8") as handle:
+            lines = handle.read().splitlines()
+    except OSError:
+        return
+    for line in lines:
+        hierarchy, controllers, path = (line.split(":", 2) + ["", ""])[:3]
+        if hierarchy == "0" and not controllers:  # cgroup v2.
+            for directory in (os.path.join(root, path.lstrip("/")), root):
+                yield directory, "memory.max", "memory.current"
+        elif "memory" in controllers.split(","):  # cgroup v1.
+            for directory in (os.path.join(root, "memory", path.lstrip("/")), os.path.join(root, "memory")):
+                yield directory, "memory.limit_in_bytes", "memory.usage_in_bytes"
+
+
+def cgroup_available(root: str = "/sys/fs/cgroup", proc_cgroup: str = "/proc/self/cgroup") -> Optional[int]:
+    """Get the memory left before hitting the memory limit of the current process's cgroup (e.g. a CI container).
+
+    :param root: cgroup filesystem mount point.
+    :param proc_cgroup: Path to /proc/self/cgroup.
+
+    :return: Limit minus usage in bytes, or None if there is no limit.
+    """
+    for directory, limit_name, usage_name in cgroup_dirs(root, proc_cgroup):
+        limit = read_int(os.path.join(directory, limit_name))
+        usage = read_int(os.path.join(directory, usage_name))
+        if limit is not None and usage is not None and limit < CGROUP_UNLIMITED:
+            return max(limit - usage, 0)
+    return None
+
+
+def available_memory() -> Optional[int]:
+    """Get the memory available to new child processes, the lower of the machine's and the cgroup's.
+
+    :return: Bytes, or None if unknown (e.g. not Linux).
+    """
+    values = [v for v in (meminfo_available(), cgroup_available()) if v is not None]
+    return min(values) if values else None
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Get the current resident set size of a process.
+
+    :param pid: Process ID.
+
+    :return: Bytes, or None if unknown.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", encoding="utf8") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
@@ -14,22 +14,46 @@ Example output file structure:
 """
 import os
 import sys
+from functools import partial
 from os import _exit as os_exit  # noqa
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-from seedir import seedir
 from sphinx.application import Sphinx
-from sphinx.config import Config
+from sphinx.config import Config, ENUM
+from sphinx.environment import BuildEnvironment
 from sphinx.util import logging
 
 from sphinx_multi_theme import __version__, utils
+from sphinx_multi_theme.artifacts import share_artifacts, skip_artifacts
+from sphinx_multi_theme.daemon import setup_daemon
+from sphinx_multi_theme.deduplicate import deduplicate_files, unshare
 from sphinx_multi_theme.directives import MultiThemeTocTreeDirective
+from sphinx_multi_theme.fingerprint import (
+    compute_fingerprint,
+    fingerprint_path,
+    is_up_to_date,
+    rebuild_requested,
+    save_fingerprint,
+    sources_fingerprint,
+)
+from sphinx_multi_theme.jobserver import init_jobserver, JobServer
+from sphinx_multi_theme.limits import theme_limits
+from sphinx_multi_theme.linkcheck import setup_linkcheck
+from sphinx_multi_theme.listing import STYLES, summarize, TreeWalker
+from sphinx_multi_theme.manifest import write_output_manifest
 from sphinx_multi_theme.nodes import MultiThemeTocTreeNode
+from sphinx_multi_theme.profiling import start_profiler
+from sphinx_multi_theme.search import share_search_index, skip_search_index
+from sphinx_multi_theme.shard import owned_themes, save_shard_manifest
+from sphinx_multi_theme.supervisor import resolve_max_parallel, Supervisor
+from sphinx_multi_theme.switcher import add_script, add_static_files, write_switcher_map
 from sphinx_multi_theme.theme import MultiTheme
 
 
 def fork_sphinx(app: Sphinx, config: Config):
-    """Fork the Python Sphinx process serially as many times as there are secondary themes.
+    """Fork the Python Sphinx process as many times as there are secondary themes.
+
+    Children are built serially unless multi_theme_max_parallel is greater than 1.
 
     :param app: Sphinx application.
     :param config: Sphinx configuration.
@@ -53,19 +77,145 @@ def fork_sphinx(app: Sphinx, config: Config):
         log.warning("Platform does not support forking, removing themes: %r", removed_names)
         return
 
-    # Fork and wait.
+    # Files linked by the previous build's deduplication or sharing must be copies again before Sphinx overwrites them.
+    copied = unshare(app.outdir, os.path.join(app.doctreedir, utils.DEDUPLICATED_FILE_NAME))
+    if copied:
+        log.info("%sRestored %d deduplicated files", utils.LOGGING_PREFIX, copied)
+    copied = unshare(app.outdir, os.path.join(app.doctreedir, utils.SHARED_ARTIFACTS_FILE_NAME))
+    if copied:
+        log.info("%sRestored %d shared files", utils.LOGGING_PREFIX, copied)
+
+    # Share job slots with GNU make (or an internal jobserver) between children and Sphinx's own parallel workers.
+    job_slots = config[utils.CONFIG_NAME_JOB_SLOTS]
+    job_slots = None if job_slots is None else resolve_max_parallel(job_slots, utils.CONFIG_NAME_JOB_SLOTS)
+    config[utils.CONFIG_NAME_INTERNAL_JOBSERVER] = init_jobserver(app, job_slots)
+
+    # Defer forking until after all sources have been read if the user opted in.
+    if config[utils.CONFIG_NAME_FORK_POINT] == utils.FORK_POINT_ENV_UPDATED:
+        log.info("%sDeferring multi-theme build mode until after reading sources", utils.LOGGING_PREFIX)
+        read_docs: List[str] = []
+        app.connect("env-before-read-docs", lambda _, __, docnames: read_docs.extend(docnames))
+        priority = utils.SPHINX_CONNECT_PRIORITY_FORK_SPHINX
+        app.connect("env-updated", partial(fork_sphinx_after_read, read_docs=read_docs), priority=priority)
+        return
+    if config[utils.CONFIG_NAME_SHARED_DOCTREES]:
+        log.warning(
+            "Ignoring %s, only supported with %s = %r",
+            utils.CONFIG_NAME_SHARED_DOCTREES,
+            utils.CONFIG_NAME_FORK_POINT,
+            utils.FORK_POINT_ENV_UPDATED,
+        )
+
+    fork_themes(app, config, multi_theme_instance)
+
+
+def fork_sphinx_after_read(app: Sphinx, env: BuildEnvironment, read_docs: List[str]) -> Optional[List[str]]:
+    """Fork the Python Sphinx process after the read phase so children only run the write phase with their own theme.
+
+    :param app: Sphinx application.
+    :param env: Sphinx build environment shared by all themes.
+    :param read_docs: Documents read (added or changed) during this build. Connected with functools.partial.
+
+    :return: In child processes, the documents that are out of date in the child's output directory.
+    """
+    multi_theme_instance: MultiTheme = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if len(multi_theme_instance.themes) < 2:
+        return None  # Removed by unsupported_builder_noop().
+    # Documents may have been read because of changes fingerprints don't cover (e.g. generated by other extensions).
+    if read_docs and not app.config[utils.CONFIG_NAME_FORCE_REBUILD]:
+        log = logging.getLogger(__name__)
+        log.info("%sNot skipping up-to-date themes, %d documents were read", utils.LOGGING_PREFIX, len(read_docs))
+    if not fork_themes(app, app.config, multi_theme_instance, force=bool(read_docs)):
+        return None
+
+    # This is the child process. Outdated documents so far were determined using the primary theme's outdir.
+    outdated = app.builder.get_outdated_docs()
+    if isinstance(outdated, str):
+        return sorted(env.found_docs)
+    return sorted(outdated)
+
+
+def fork_themes(app: Sphinx, config: Config, multi_theme_instance: MultiTheme, force: bool = False) -> bool:
+    """Fork once per secondary theme and wait for the children.
+
+    :param app: Sphinx application.
+    :param config: Sphinx configuration.
+    :param multi_theme_instance: MultiTheme instance with more than one theme.
+    :param force: Build all themes even if they're up-to-date, like multi_theme_force_rebuild.
+
+    :return: True if this is a child process, False if this is still the original/parent process.
+    """
+    log = logging.getLogger(__name__)
     log.info("%sEntering multi-theme build mode", utils.LOGGING_PREFIX)
-    for idx, theme in enumerate(themes):
-        if not theme.is_primary:
-            log.info("%sBuilding docs with theme %r into directory %r", utils.LOGGING_PREFIX, theme.name, theme.subdir)
-            app.emit("multi-theme-before-fork", config, theme.name, theme.subdir)
-            if utils.fork_and_wait(app):
-                # This is the child process.
-                multi_theme_instance.set_active(idx)
-                utils.modify_forked_sphinx_app(app, config, theme.subdir)
-                return
-            log.info("%sDone with theme %r", utils.LOGGING_PREFIX, theme.name)
-    log.info("%sExiting multi-theme build mode", utils.LOGGING_PREFIX)
+    jobserver: Optional[JobServer] = config[utils.CONFIG_NAME_INTERNAL_JOBSERVER]
+    if jobserver:
+        jobserver.release_held()  # This process is idle while waiting for children.
+    supervisor = Supervisor(
+        app,
+        max_parallel=resolve_max_parallel(config[utils.CONFIG_NAME_MAX_PARALLEL]),
+        durations_file=os.path.join(app.doctreedir, utils.DURATIONS_FILE_NAME),
+        jobserver=jobserver,
+        resources_file=os.path.join(app.doctreedir, utils.RESOURCES_FILE_NAME),
+        fail_fast=config[utils.CONFIG_NAME_ON_FAILURE] == utils.ON_FAILURE_FAIL_FAST,
+        min_free_memory=config[utils.CONFIG_NAME_MIN_FREE_MEMORY],
+    )
+    if config[utils.CONFIG_NAME_PRELOAD_THEMES]:
+        modules = utils.preload_themes([t.name for t in multi_theme_instance.themes])
+        log.info("%sPreloaded theme modules: %s", utils.LOGGING_PREFIX, ", ".join(modules) or "none")
+    force = force or config[utils.CONFIG_NAME_FORCE_REBUILD] or rebuild_requested(app)
+    sources = sources_fingerprint(app, config)
+    for idx in owned_themes(config, multi_theme_instance.themes, supervisor.schedule(multi_theme_instance.themes)):
+        theme = multi_theme_instance.themes[idx]
+        app.emit("multi-theme-before-fork", config, theme.name, theme.subdir)
+
+        # Skip themes built with exactly the same inputs before.
+        fingerprint = compute_fingerprint(config, multi_theme_instance, theme, sources)
+        fingerprint_file = fingerprint_path(app.outdir, theme)
+        if not force and is_up_to_date(fingerprint_file, fingerprint):
+            log.info(
+                "%sSkipping up-to-date theme directory %r (rebuild with -E, -a, or -D %s=1)",
+                utils.LOGGING_PREFIX,
+                theme.subdir,
+                utils.CONFIG_NAME_FORCE_REBUILD,
+            )
+            continue
+        if os.path.exists(fingerprint_file):
+            os.remove(fingerprint_file)  # Don't trust partial output if the build fails.
+
+        log.info("%sBuilding docs with theme %r into directory %r", utils.LOGGING_PREFIX, theme.name, theme.subdir)
+        if supervisor.fork(theme, theme_limits(config, theme.name)):
+            # This is the child process.
+            start_profiler(app, theme, "multi-theme-child-before-exit", "multi-theme-unsupported-builder-child-before-exit")
+            multi_theme_instance.set_active(idx)
+            utils.modify_forked_sphinx_app(app, config, theme.subdir)
+            priority = utils.SPHINX_CONNECT_PRIORITY_SAVE_FINGERPRINT
+            app.connect("build-finished", partial(save_fingerprint, fingerprint=fingerprint), priority=priority)
+            if app.builder:  # Forked after the read phase.
+                supervisor.child_ready(app)
+            else:
+                app.connect("builder-inited", supervisor.child_ready)
+            return True
+
+    app.connect("build-finished", save_shard_manifest, priority=utils.SPHINX_CONNECT_PRIORITY_SAVE_SHARD_MANIFEST)
+    app.connect("build-finished", share_search_index, priority=utils.SPHINX_CONNECT_PRIORITY_SHARE_SEARCH_INDEX)
+    app.connect("build-finished", share_artifacts, priority=utils.SPHINX_CONNECT_PRIORITY_SHARE_ARTIFACTS)
+    if config[utils.CONFIG_NAME_DEDUPLICATE]:
+        app.connect("build-finished", deduplicate_files, priority=utils.SPHINX_CONNECT_PRIORITY_DEDUPLICATE_FILES)
+
+    # Optionally build the primary theme while children are still running.
+    if supervisor.running and config[utils.CONFIG_NAME_OVERLAP_PRIMARY] and supervisor.overlap_primary():
+        log.info("%sBuilding primary theme while %d theme(s) build", utils.LOGGING_PREFIX, len(supervisor.running))
+        app.connect("build-finished", supervisor.build_finished, priority=utils.SPHINX_CONNECT_PRIORITY_WAIT_FOR_CHILDREN)
+        app.connect("multi-theme-before-linkcheck", lambda _: supervisor.wait())
+        supervisor.watch()
+    else:
+        supervisor.wait()
+        supervisor.finish()
+        log.info("%sExiting multi-theme build mode", utils.LOGGING_PREFIX)
+    if jobserver:
+        jobserver.limit_parallel(app)
+    start_profiler(app, multi_theme_instance.primary, "build-finished", priority=utils.SPHINX_CONNECT_PRIORITY_DUMP_PROFILE)
+    return False
 
 
 def flatten_html_theme(_: Sphinx, config: Config):
@@ -94,6 +244,21 @@ def flatten_html_theme(_: Sphinx, config: Config):
                 if value == multi_theme_instance:
                     html_context_keys.append((top_level_key, key))
                     config[top_level_key][key] = active_theme_name
+    config[utils.CONFIG_NAME_INTERNAL_HTML_CONTEXT_KEYS] = html_context_keys
+
+
+def add_page_context(app: Sphinx, _: str, __: str, context: Dict, ___):
+    """Expose the MultiTheme instance to HTML templates, e.g. {{ multi_theme.relative_prefix("theme_classic") }}.
+
+    :param app: Sphinx application.
+    :param _: Page name.
+    :param __: Template name.
+    :param context: Template context to modify.
+    :param ___: Doctree of the page.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if multi_theme_instance:
+        context["multi_theme"] = multi_theme_instance
 
 
 def unsupported_builder_noop(app: Sphinx):
@@ -129,7 +294,7 @@ def unsupported_builder_noop(app: Sphinx):
 
 
 def print_files(app: Sphinx, exc: Exception):
-    """Print outdir listing.
+    """Print outdir listing, streamed as directories are read, followed by a summary of each theme's files.
 
     :param app: Sphinx application.
     :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
@@ -140,17 +305,23 @@ def print_files(app: Sphinx, exc: Exception):
         return
     log = logging.getLogger(__name__)
     print(flush=True)  # https://github.com/readthedocs/readthedocs-sphinx-ext/blob/2.1.5/readthedocs_ext/readthedocs.py#L270
-    output = seedir(
-        app.outdir,
+    walker = TreeWalker(
         style=app.config[utils.CONFIG_NAME_PRINT_FILES_STYLE],
-        printout=False,
-        first="folders",
-        sort=True,
-        slash=os.sep,
+        max_depth=app.config[utils.CONFIG_NAME_PRINT_FILES_MAX_DEPTH],
+        max_entries=app.config[utils.CONFIG_NAME_PRINT_FILES_MAX_ENTRIES],
     )
-    for line in output.splitlines():
+    for line in walker.walk(app.outdir):
         log.info(line)
 
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    themes = [(t.name, t.subdir) for t in multi_theme_instance.themes] if multi_theme_instance else []
+    keep = app.config[utils.CONFIG_NAME_PRINT_FILES_LARGEST]
+    for summary in summarize(app.outdir, themes, keep):
+        mib = summary.size / 1024 / 1024
+        log.info("%sTheme %r: %d files, %.1f MiB", utils.LOGGING_PREFIX, summary.name, summary.files, mib)
+        for size, path in sorted(summary.largest, reverse=True):
+            log.info("%s    %10.1f KiB  %s", utils.LOGGING_PREFIX, size / 1024, os.path.join(summary.subdir, path))
+
 
 def setup(app: Sphinx) -> Dict[str, str]:
     """Called by Sphinx during phase 0 (initialization).
@@ -159,10 +330,34 @@ def setup(app: Sphinx) -> Dict[str, str]:
 
     :returns: Extension version.
     """
+    app.add_config_value(utils.CONFIG_NAME_DEDUPLICATE, False, "")
+    app.add_config_value(utils.CONFIG_NAME_FORCE_REBUILD, False, "")
+    app.add_config_value(utils.CONFIG_NAME_FORK_POINT, utils.FORK_POINT_CONFIG_INITED, "", ENUM(*utils.FORK_POINTS))
+    app.add_config_value(utils.CONFIG_NAME_INTERNAL_HTML_CONTEXT_KEYS, [], "")
     app.add_config_value(utils.CONFIG_NAME_INTERNAL_IS_CHILD, False, "")
+    app.add_config_value(utils.CONFIG_NAME_INTERNAL_JOBSERVER, None, "")
     app.add_config_value(utils.CONFIG_NAME_INTERNAL_THEMES, None, "html")
+    app.add_config_value(utils.CONFIG_NAME_JOB_SLOTS, None, "", [int, str])
+    app.add_config_value(utils.CONFIG_NAME_LINKCHECK, utils.LINKCHECK_ONCE, "", ENUM(*utils.LINKCHECK_MODES))
+    app.add_config_value(utils.CONFIG_NAME_LINKCHECK_CACHE, "", "")
+    app.add_config_value(utils.CONFIG_NAME_LINKCHECK_CACHE_TTL, {}, "", [dict])
+    app.add_config_value(utils.CONFIG_NAME_MAX_PARALLEL, 1, "", [int, str])
+    app.add_config_value(utils.CONFIG_NAME_MEMORY_LIMIT, None, "", [int, float, dict])
+    app.add_config_value(utils.CONFIG_NAME_MIN_FREE_MEMORY, None, "", [int, float])
+    app.add_config_value(utils.CONFIG_NAME_ON_FAILURE, utils.ON_FAILURE_KEEP_GOING, "", ENUM(*utils.ON_FAILURE_POLICIES))
+    app.add_config_value(utils.CONFIG_NAME_OUTPUT_MANIFEST, "", "")
+    app.add_config_value(utils.CONFIG_NAME_OVERLAP_PRIMARY, False, "")
+    app.add_config_value(utils.CONFIG_NAME_PRELOAD_THEMES, False, "")
     app.add_config_value(utils.CONFIG_NAME_PRINT_FILES, False, "")
-    app.add_config_value(utils.CONFIG_NAME_PRINT_FILES_STYLE, "emoji" if os.sep == "/" else "dash", "")
+    app.add_config_value(utils.CONFIG_NAME_PRINT_FILES_LARGEST, 3, "", [int])
+    app.add_config_value(utils.CONFIG_NAME_PRINT_FILES_MAX_DEPTH, None, "", [int])
+    app.add_config_value(utils.CONFIG_NAME_PRINT_FILES_MAX_ENTRIES, None, "", [int])
+    app.add_config_value(utils.CONFIG_NAME_PRINT_FILES_STYLE, "emoji" if os.sep == "/" else "dash", "", ENUM(*STYLES))
+    app.add_config_value(utils.CONFIG_NAME_PROFILE_DIR, "", "")
+    app.add_config_value(utils.CONFIG_NAME_SHARD, None, "", [str])
+    app.add_config_value(utils.CONFIG_NAME_SHARED_DOCTREES, False, "")
+    app.add_config_value(utils.CONFIG_NAME_SWITCHER, utils.SWITCHER_TOCTREE, "env", ENUM(*utils.SWITCHERS))
+    app.add_config_value(utils.CONFIG_NAME_TIMEOUT, None, "", [int, float, dict])
     app.add_directive("multi-theme-toctree", MultiThemeTocTreeDirective)
     app.add_event("multi-theme-after-fork-child")
     app.add_event("multi-theme-after-fork-parent-child-exited")
@@ -171,8 +366,17 @@ def setup(app: Sphinx) -> Dict[str, str]:
     app.add_event("multi-theme-child-before-exit")
     app.add_event("multi-theme-unsupported-builder-child-before-exit")
     app.add_node(MultiThemeTocTreeNode)
+    setup_daemon(app)
+    setup_linkcheck(app)
     app.connect("build-finished", print_files, priority=utils.SPHINX_CONNECT_PRIORITY_PRINT_FILES)
+    app.connect("build-finished", write_switcher_map)
+    app.connect("build-finished", write_output_manifest, priority=utils.SPHINX_CONNECT_PRIORITY_WRITE_OUTPUT_MANIFEST)
+    app.connect("html-page-context", add_page_context)
+    app.connect("builder-inited", add_script)
     app.connect("builder-inited", unsupported_builder_noop, priority=utils.SPHINX_CONNECT_PRIORITY_UNSUPPORTED_BUILDER_NOOP)
+    app.connect("config-inited", add_static_files)
     app.connect("config-inited", flatten_html_theme, priority=utils.SPHINX_CONNECT_PRIORITY_FLATTEN_HTML_THEME)
     app.connect("config-inited", fork_sphinx, priority=utils.SPHINX_CONNECT_PRIORITY_FORK_SPHINX)
-    return dict(parallel_read_safe=True, parallel_write_safe=True, version=__version__)
+    app.connect("env-updated", skip_artifacts)
+    app.connect("env-updated", skip_search_index)
+    return dict(env_version=utils.ENV_VERSION, parallel_read_safe=True, parallel_write_safe=True, version=__version__)
@@ -3,6 +3,8 @@ from typing import Optional
 
 from sphinx import addnodes
 
+from sphinx_multi_theme import utils
+
 
 class MultiThemeTocTreeNode(addnodes.toctree):
     """TocTree node for MultiThemeTocTreeDirective."""
@@ -10,7 +12,7 @@ class MultiThemeTocTreeNode(addnodes.toctree):
     def __init__(self, *args, **kwargs):
         """Initialize position counter."""
         super().__init__(*args, **kwargs)
-        self.ref_prefixes_pos = 0
+        self.ref_subdirs_pos = 0
 
     @property
     def docname(self) -> str:
@@ -18,19 +20,27 @@ class MultiThemeTocTreeNode(addnodes.toctree):
         env = self.document.settings.env  # noqa
         return getattr(env.app.builder, "current_docname", None) or self.attributes["parent"]
 
+    def get_ref_prefix(self, subdir: str) -> str:
+        """Return the relative path from the active theme's root directory to another theme's root directory.
+
+        :param subdir: Subdirectory of the other theme.
+        """
+        env = self.document.settings.env  # noqa
+        return env.config[utils.CONFIG_NAME_INTERNAL_THEMES].relative_prefix(subdir)
+
     def get_ref(self, key) -> Optional[str]:
         """Return the relative link to a theme or an empty string if key out of scope."""
-        if "ref_prefixes" not in self.attributes:
+        if "ref_subdirs" not in self.attributes:
             return None
         if key != "parent":
             if key == "entries":
                 # Reset position.
-                self.ref_prefixes_pos = 0
+                self.ref_subdirs_pos = 0
             return None
 
-        ref_prefixes = self.attributes["ref_prefixes"]
-        ref_prefix: str = ref_prefixes[self.ref_prefixes_pos]
-        self.ref_prefixes_pos += 1
+        ref_subdirs = self.attributes["ref_subdirs"]
+        ref_prefix = self.get_ref_prefix(ref_subdirs[self.ref_subdirs_pos])
+        self.ref_subdirs_pos += 1
 
         return self.docname if not ref_prefix else f"{ref_prefix}/{self.docname}"
 
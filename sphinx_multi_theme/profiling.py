@@ -0,0 +1,72 @@
+"""Profile each theme's build with cProfile, including forked children which external profilers can't follow."""
+import cProfile
+import os
+from typing import Optional
+
+from sphinx.application import Sphinx
+from sphinx.util import ensuredir, logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.theme import Theme
+
+
+class ThemeProfiler:
+    """Collect cProfile data for one theme's build in the current process and dump it to a .prof file."""
+
+    PRIMARY_FILE_NAME = "primary.prof"
+
+    def __init__(self, profile_dir: str, theme: Theme):
+        """Constructor.
+
+        :param profile_dir: Directory to write the profile to.
+        :param theme: Theme built by the current process, its subdir is used as the file name since names may repeat.
+        """
+        self.path = os.path.join(profile_dir, f"{theme.subdir}.prof" if theme.subdir else self.PRIMARY_FILE_NAME)
+        self.profile: Optional[cProfile.Profile] = None
+
+    def start(self) -> bool:
+        """Start profiling.
+
+        :return: False if another profiler is already active in this process (Python 3.12+ only allows one).
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            log = logging.getLogger(__name__)
+            log.warning("Not profiling theme build: %s", exc)
+            return False
+        self.profile = profile
+        return True
+
+    def dump(self, *_):
+        """Stop profiling and write the profile. Can be connected to Sphinx events."""
+        if self.profile is None:
+            return
+        self.profile.disable()
+        ensuredir(os.path.dirname(self.path))
+        self.profile.dump_stats(self.path)
+        self.profile = None
+        log = logging.getLogger(__name__)
+        log.info("%sSaved profile to %s", utils.LOGGING_PREFIX, self.path)
+
+
+def start_profiler(app: Sphinx, theme: Theme, *events: str, priority: int = 500) -> bool:
+    """Start profiling the current process if enabled in the Sphinx config.
+
+    :param app: Sphinx application.
+    :param theme: Theme built by the current process.
+    :param events: Sphinx events to stop profiling and write the profile on.
+    :param priority: Sphinx event priority.
+
+    :return: True if profiling started.
+    """
+    profile_dir = app.config[utils.CONFIG_NAME_PROFILE_DIR]
+    if not profile_dir:
+        return False
+    profiler = ThemeProfiler(os.path.join(app.confdir, profile_dir), theme)
+    if not profiler.start():
+        return False
+    for event in events:
+        app.connect(event, profiler.dump, priority=priority)
+    return True
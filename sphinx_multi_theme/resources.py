@@ -0,0 +1,112 @@
+"""Resource usage accounting of forked child processes."""
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+from sphinx.util import ensuredir
+
+TABLE_COLUMNS = (  # Header, width, attribute, format.
+    ("theme", 0, "name", "s"),
+    ("status", 6, "exit_status", "d"),
+    ("wall s", 8, "wall", ".2f"),
+    ("user s", 8, "user", ".2f"),
+    ("sys s", 7, "system", ".2f"),
+    ("max RSS MiB", 11, "max_rss_mib", ".1f"),
+    ("minflt", 8, "minor_faults", "d"),
+    ("majflt", 6, "major_faults", "d"),
+    ("inblock", 8, "block_in", "d"),
+    ("oublock", 8, "block_out", "d"),
+)
+
+
+@dataclass
+class ResourceUsage:  # pylint: disable=too-many-instance-attributes
+    """A 'struct' representing resources used by one child process, from os.wait4()."""
+
+    name: str  # Theme name.
+    subdir: str
+    exit_status: int
+    wall: float  # Seconds.
+    user: float  # CPU seconds in user mode.
+    system: float  # CPU seconds in kernel mode.
+    max_rss_mib: float  # Peak resident set size.
+    minor_faults: int  # Page faults serviced without I/O.
+    major_faults: int  # Page faults that required I/O.
+    block_in: int  # Filesystem input operations.
+    block_out: int  # Filesystem output operations.
+
+    @classmethod
+    def from_rusage(cls, name: str, subdir: str, exit_status: int, wall: float, rusage) -> "ResourceUsage":
+        """Constructor.
+
+        :param name: Theme name.
+        :param subdir: Theme subdirectory.
+        :param exit_status: Exit status of the child.
+        :param wall: Wall clock seconds from fork to reaping.
+        :param rusage: resource.struct_rusage from os.wait4().
+
+        :return: Instance.
+        """
+        rss_unit = 1 if sys.platform == "darwin" else 1024  # Bytes on macOS, KiB on Linux/BSD.
+        return cls(
+            name=name,
+            subdir=subdir,
+            exit_status=exit_status,
+            wall=wall,
+            user=rusage.ru_utime,
+            system=rusage.ru_stime,
+            max_rss_mib=rusage.ru_maxrss * rss_unit / 1024 / 1024,
+            minor_faults=rusage.ru_minflt,
+            major_faults=rusage.ru_majflt,
+            block_in=rusage.ru_inblock,
+            block_out=rusage.ru_oublock,
+        )
+
+
+def format_usage_table(usages: List[ResourceUsage]) -> List[str]:
+    """Format a plain text table with one row per child.
+
+    :param usages: Resource usage of each child.
+
+    :return: Lines including the header.
+    """
+    name_width = max([len(TABLE_COLUMNS[0][0])] + [len(u.name) for u in usages])
+    header = []
+    for title, width, _, __ in TABLE_COLUMNS:
+        header.append(title.ljust(name_width) if not width else title.rjust(max(width, len(title))))
+    lines = ["  ".join(header)]
+    for usage in usages:
+        row = []
+        for title, width, attribute, fmt in TABLE_COLUMNS:
+            value = format(getattr(usage, attribute), fmt)
+            row.append(value.ljust(name_width) if not width else value.rjust(max(width, len(title))))
+        lines.append("  ".join(row))
+    return lines
+
+
+def save_usage(path: str, usages: List[ResourceUsage]):
+    """Write resource usage as JSON for CI tooling.
+
+    :param path: JSON file path.
+    :param usages: Resource usage of each child.
+    """
+    ensuredir(os.path.dirname(path))
+    with open(path, "w", encoding="utf8") as handle:
+        json.dump([asdict(u) for u in usages], handle, indent=2)
+
+
+def load_peak_rss(path: str) -> Dict[str, float]:
+    """Read peak RSS of each theme recorded by the previous run.
+
+    :param path: JSON file path written by save_usage().
+
+    :return: MiB keyed by theme subdir. Empty if the file is missing or unreadable.
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            usages = json.load(handle)
+        return {u["subdir"]: float(u["max_rss_mib"]) for u in usages}
+    except (OSError, ValueError, TypeError, KeyError):
+        return {}
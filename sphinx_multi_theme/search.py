@@ -0,0 +1,70 @@
+"""Build the search index once in the original process instead of once per theme.
+
+The search index only depends on doctrees and config, not on the theme. Forked processes skip feeding documents to Sphinx's
+IndexBuilder and writing searchindex.js; the original process copies its own searchindex.js into their output directories
+after they finished. Search pages and scripts are still rendered by every theme.
+"""
+import filecmp
+import os
+import shutil
+from typing import Optional
+
+from sphinx.application import Sphinx
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.environment import BuildEnvironment
+from sphinx.util import logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.fingerprint import fingerprint_path, refresh_fingerprint
+from sphinx_multi_theme.theme import MultiTheme
+
+
+def noop(*_):
+    """Replacement for builder methods that index documents or write the index."""
+
+
+def skip_search_index(app: Sphinx, _: BuildEnvironment):
+    """Stop a forked process from building its own search index. Runs after forking, before the write phase.
+
+    :param app: Sphinx application.
+    :param _: Sphinx build environment.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if not app.config[utils.CONFIG_NAME_INTERNAL_IS_CHILD] or not multi_theme_instance:
+        return
+    if not isinstance(app.builder, StandaloneHTMLBuilder) or not app.builder.search:
+        return
+    if multi_theme_instance.active.own_search_index:
+        return
+    app.builder.index_page = noop
+    app.builder.dump_search_index = noop
+    log = logging.getLogger(__name__)
+    log.info("%sReusing the primary theme's search index", utils.LOGGING_PREFIX)
+
+
+def share_search_index(app: Sphinx, exc: Optional[Exception]):
+    """Copy the original process' search index into every secondary theme's output that skipped building one.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if exc or not multi_theme_instance or not isinstance(app.builder, StandaloneHTMLBuilder) or not app.builder.search:
+        return
+    src = os.path.join(app.outdir, app.builder.searchindex_filename)
+    if not os.path.isfile(src):
+        return
+    shared = 0
+    for theme in multi_theme_instance.themes[1:]:
+        subdir = os.path.join(app.outdir, theme.subdir)
+        if theme.own_search_index or not os.path.isdir(subdir):  # Opted out, or built by another shard.
+            continue
+        dst = os.path.join(subdir, app.builder.searchindex_filename)
+        if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False):
+            continue  # Keep the mtime so up-to-date themes stay up-to-date.
+        shutil.copyfile(src, f"{dst}.tmp")
+        os.replace(f"{dst}.tmp", dst)
+        refresh_fingerprint(fingerprint_path(app.outdir, theme))
+        shared += 1
+    log = logging.getLogger(__name__)
+    log.info("%sCopied search index into %d secondary themes", utils.LOGGING_PREFIX, shared)
@@ -0,0 +1,190 @@
+"""Split themes across machines (shards) and merge their output directories back into one.
+
+Every shard runs a full sphinx-build but only forks the secondary themes it owns. Themes are assigned round-robin by their
+position in MultiTheme.themes, the primary theme (built by every shard's original process) belongs to the first shard.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sphinx.application import Sphinx
+from sphinx.config import Config
+from sphinx.errors import SphinxError
+from sphinx.util import logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.theme import MultiTheme, Theme
+
+ENV_VAR_SHARD = "MULTI_THEME_SHARD"
+
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a shard selector.
+
+    :param value: e.g. "2/4" for the second of four shards. Empty or None disables sharding.
+
+    :return: Shard number (starting at 1) and number of shards, or None.
+    """
+    if not value:
+        return None
+    try:
+        number, total = (int(v) for v in str(value).split("/"))
+    except ValueError as exc:
+        raise SphinxError(f"Invalid shard {value!r}, expected e.g. 2/4") from exc
+    if not 1 <= number <= total:
+        raise SphinxError(f"Invalid shard {value!r}, expected e.g. 2/4")
+    return number, total
+
+
+def config_shard(config: Config) -> Optional[Tuple[int, int]]:
+    """Get the shard of this build, the environment variable overrides the Sphinx config.
+
+    :param config: Sphinx configuration.
+
+    :return: Shard number and number of shards, or None.
+    """
+    return parse_shard(os.environ.get(ENV_VAR_SHARD) or config[utils.CONFIG_NAME_SHARD])
+
+
+def shard_of(index: int, total: int) -> int:
+    """Determine which shard builds a theme.
+
+    :param index: Position of the theme in MultiTheme.themes.
+    :param total: Number of shards.
+
+    :return: Shard number starting at 1.
+    """
+    return index % total + 1
+
+
+def owned_themes(config: Config, themes: List[Theme], indexes: Iterable[int]) -> Iterator[int]:
+    """Filter out themes built by other shards, logging each skip.
+
+    :param config: Sphinx configuration.
+    :param themes: MultiTheme.themes.
+    :param indexes: Positions of secondary themes in build order.
+
+    :return: Positions of the themes this shard builds.
+    """
+    log = logging.getLogger(__name__)
+    shard = config_shard(config)
+    for index in indexes:
+        if shard and shard_of(index, shard[1]) != shard[0]:
+            owner = shard_of(index, shard[1])
+            log.info("%sSkipping theme %r, built by shard %d/%d", utils.LOGGING_PREFIX, themes[index].name, owner, shard[1])
+            continue
+        yield index
+
+
+def save_shard_manifest(app: Sphinx, exc: Optional[Exception]):
+    """Record which themes this shard built, so merging can verify nothing is missing or duplicated. Parent only.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    shard = config_shard(app.config)
+    if exc or not shard:
+        return
+    number, total = shard
+    multi_theme_instance: MultiTheme = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    subdirs = [t.subdir for t in multi_theme_instance.themes]
+    manifest = {
+        "shard": number,
+        "total": total,
+        "themes": subdirs,
+        "built": [s for i, s in enumerate(subdirs) if shard_of(i, total) == number],
+    }
+    with open(os.path.join(app.outdir, utils.SHARD_MANIFEST_FILE_NAME), "w", encoding="utf8") as handle:
+        json.dump(manifest, handle, indent=2)
+
+
+def read_shard_manifest(shard_dir: str) -> Dict[str, object]:
+    """Read and validate a shard's manifest.
+
+    :param shard_dir: Output directory of one shard.
+
+    :return: Manifest.
+    """
+    path = os.path.join(shard_dir, utils.SHARD_MANIFEST_FILE_NAME)
+    try:
+        with open(path, encoding="utf8") as handle:
+            manifest = json.load(handle)
+        if not isinstance(manifest["shard"], int) or not isinstance(manifest["total"], int):
+            raise ValueError("shard and total must be integers")
+        if not isinstance(manifest["themes"], list) or not isinstance(manifest["built"], list):
+            raise ValueError("themes and built must be lists")
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise SphinxError(f"Invalid or missing shard manifest {path}: {exc}") from exc
+    return manifest
+
+
+def plan_merge(shard_dirs: List[str]) -> Dict[str, str]:
+    """Check that the shards are complete and don't overlap.
+
+    :param shard_dirs: Output directories of all shards.
+
+    :return: Shard directory keyed by theme subdir ("" for the primary theme).
+    """
+    if not shard_dirs:
+        raise SphinxError("No shard directories given")
+    manifests = [(d, read_shard_manifest(d)) for d in shard_dirs]
+    first = manifests[0][1]
+    for shard_dir, manifest in manifests:
+        if (manifest["total"], manifest["themes"]) != (first["total"], first["themes"]):
+            raise SphinxError(f"Shard {shard_dir} is from a different build than {shard_dirs[0]}")
+
+    numbers = sorted(m["shard"] for _, m in manifests)
+    if numbers != list(range(1, first["total"] + 1)):
+        missing = sorted(set(range(1, first["total"] + 1)) - set(numbers))
+        duplicated = sorted({n for n in numbers if numbers.count(n) > 1})
+        raise SphinxError(f"Shards missing: {missing}, duplicated: {duplicated} (of {first['total']})")
+
+    owners: Dict[str, str] = {}
+    for shard_dir, manifest in manifests:
+        for subdir in manifest["built"]:
+            if subdir in owners:
+                raise SphinxError(f"Theme directory {subdir!r} built by both {owners[subdir]} and {shard_dir}")
+            if subdir and not os.path.isdir(os.path.join(shard_dir, subdir)):
+                raise SphinxError(f"Theme directory {subdir!r} missing from {shard_dir}")
+            owners[subdir] = shard_dir
+    missing_themes = [s for s in first["themes"] if s not in owners]
+    if missing_themes:
+        raise SphinxError(f"Theme directories not built by any shard: {missing_themes}")
+    return owners
+
+
+def copy_tree(src: str, dst: str, skip: List[str]):
+    """Copy a directory tree, skipping hidden directories (e.g. .doctrees) and bookkeeping files of this extension.
+
+    Symlinks (e.g. created by deduplication) are copied as regular files.
+
+    :param src: Source directory.
+    :param dst: Destination directory, created if missing. Existing files are overwritten.
+    :param skip: Top level entries of src to skip, e.g. theme subdirectories.
+    """
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        dirs[:] = [d for d in dirs if not d.startswith(".") and (rel != "." or d not in skip)]
+        os.makedirs(os.path.join(dst, rel), exist_ok=True)
+        for name in files:
+            if name in (utils.FINGERPRINT_FILE_NAME, utils.SHARD_MANIFEST_FILE_NAME):
+                continue
+            shutil.copy2(os.path.join(root, name), os.path.join(dst, rel, name))
+
+
+def merge(shard_dirs: List[str], outdir: str) -> Dict[str, str]:
+    """Combine the output directories of all shards into the normal primary plus theme subdirectories layout.
+
+    :param shard_dirs: Output directories of all shards.
+    :param outdir: Merged output directory.
+
+    :return: Shard directory keyed by theme subdir ("" for the primary theme).
+    """
+    owners = plan_merge(shard_dirs)
+    for subdir, shard_dir in owners.items():
+        if subdir:
+            copy_tree(os.path.join(shard_dir, subdir), os.path.join(outdir, subdir), [])
+        else:
+            copy_tree(shard_dir, outdir, [s for s in owners if s])
+    return owners
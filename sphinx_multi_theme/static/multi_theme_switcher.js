@@ -0,0 +1,43 @@
+/* Render multi-theme-toctree placeholders from the theme map defined by _static/multi_theme_switcher_map.js. */
+(function () {
+    "use strict";
+    var staticUrl = document.currentScript.src.replace(/[^/]*$/, "");
+    var themeRoot = new URL("../", staticUrl).href;
+
+    function render(data) {
+        var page = window.location.href.split("#")[0].split("?")[0];
+        if (page.indexOf(themeRoot) !== 0) {
+            return;
+        }
+        page = page.substring(themeRoot.length);
+        var primaryRoot = data.active ? new URL("../", themeRoot).href : themeRoot;
+
+        document.querySelectorAll(".multi-theme-switcher").forEach(function (wrapper) {
+            var themes = wrapper.hasAttribute("data-reversed") ? data.themes.slice().reverse() : data.themes;
+            var list = document.createElement("ul");
+            themes.forEach(function (theme) {
+                var item = document.createElement("li");
+                var link = document.createElement("a");
+                item.className = "toctree-l1";
+                link.className = "reference internal";
+                if (theme.subdir === data.active) {
+                    item.className += " current";
+                    link.className += " current";
+                    link.href = "#";
+                } else {
+                    link.href = primaryRoot + (theme.subdir ? theme.subdir + "/" : "") + page;
+                }
+                link.textContent = theme.text;
+                item.appendChild(link);
+                list.appendChild(item);
+            });
+            wrapper.appendChild(list);
+        });
+    }
+
+    if (!window.multiThemeSwitcherMap) {
+        console.error("multi-theme: theme map not loaded from " + staticUrl + "multi_theme_switcher_map.js");
+        return;
+    }
+    render(window.multiThemeSwitcherMap);
+})();
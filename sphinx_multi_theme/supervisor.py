@@ -0,0 +1,657 @@
+"""Fork child processes and reap them, optionally several at a time."""
+import ctypes
+import json
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from os import _exit as os_exit  # noqa
+from typing import Dict, List, Optional, Tuple, Union
+
+from sphinx.application import Sphinx
+from sphinx.errors import SphinxError
+from sphinx.util import ensuredir, logging
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.jobserver import JobServer
+from sphinx_multi_theme.limits import Limits, set_memory_limit
+from sphinx_multi_theme.logmux import LogMultiplexer, redirect_logs, Source
+from sphinx_multi_theme.memory import available_memory, process_rss
+from sphinx_multi_theme.resources import format_usage_table, load_peak_rss, ResourceUsage, save_usage
+from sphinx_multi_theme.theme import Theme
+
+PR_SET_PDEATHSIG = 1  # From linux/prctl.h.
+
+
+@dataclass
+class Child:  # pylint: disable=too-many-instance-attributes
+    """A 'struct' representing one running forked child process."""
+
+    pid: int
+    theme: Theme
+    started: float  # time.monotonic() right after forking.
+    exit_status: Optional[int] = None  # Set once the child has been reaped.
+    token: Optional[bytes] = None  # Jobserver token acquired for this child, None if it uses the parent's implicit slot.
+    log_source: Optional[Source] = None  # The child's log pipe.
+    limits: Limits = field(default_factory=Limits)
+    timer: Optional[threading.Timer] = None  # Enforces limits.timeout.
+    reason: str = ""  # Why the child failed, if known.
+
+
+class Supervisor:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """Keep track of forked child processes and wait for them with one loop.
+
+    With max_parallel set to 1 every child is waited on right after it's forked, which is the same as building serially.
+    """
+
+    POLL_INTERVAL = 0.05  # Seconds between polls if SIGCHLD can't be handled (e.g. not in the main thread).
+    WAKEUP_TIMEOUT = 5.0  # Seconds to block waiting for SIGCHLD before polling anyway, in case a signal was lost.
+    TERMINATE_TIMEOUT = 5.0  # Seconds to wait after SIGTERM before sending SIGKILL to cancelled children.
+
+    def __init__(
+        self,
+        app: Sphinx,
+        max_parallel: int = 1,
+        durations_file: str = "",
+        *,
+        jobserver: Optional[JobServer] = None,
+        resources_file: str = "",
+        fail_fast: bool = False,
+        min_free_memory: Optional[float] = None,
+    ):
+        """Constructor.
+
+        :param app: Sphinx application for emitting events.
+        :param max_parallel: Maximum number of child processes running at the same time.
+        :param durations_file: JSON file with build durations of previous runs, updated by finish().
+        :param jobserver: Acquire a job slot for every child from this jobserver.
+        :param resources_file: JSON file to write resource usage of every child to in finish().
+        :param fail_fast: Terminate all running children as soon as one fails instead of letting them finish.
+        :param min_free_memory: Only start another child while this many MiB would remain available. None disables.
+        """
+        if isinstance(min_free_memory, bool) or not isinstance(min_free_memory, (int, float, type(None))):
+            raise SphinxError(f"Invalid value for {utils.CONFIG_NAME_MIN_FREE_MEMORY}: {min_free_memory!r}")
+        self.app = app
+        self.max_parallel = max(max_parallel, 1)
+        self.durations_file = durations_file
+        self.resources_file = resources_file
+        self.fail_fast = fail_fast
+        self.min_free_memory = min_free_memory
+        self.predicted_rss = load_peak_rss(resources_file) if resources_file and min_free_memory is not None else {}
+        self.jobserver = jobserver
+        self.implicit_slot_lent = False  # True while a child uses the job slot implicitly held by this process.
+        self.parent_token: Optional[bytes] = None  # Acquired when the primary build overlaps with children.
+        self.predicted = load_durations(durations_file) if durations_file else {}
+        self.actual: Dict[str, float] = {}
+        self.running: Dict[int, Child] = {}
+        self.failed: List[Child] = []
+        self.cancelled: List[Child] = []
+        self.kill_deadline: Optional[float] = None  # Set once children are being terminated.
+        self.usages: List[ResourceUsage] = []
+        self.forked_at = 0.0  # Set in child processes only.
+        self.logs: Optional[LogMultiplexer] = None  # Created on the first fork.
+        self.wakeup: Optional[Tuple[int, int]] = None  # Pipe written to by the SIGCHLD handler while listening.
+        self.previous_handler = None  # SIGCHLD handler to restore in unlisten().
+        self.watching = False  # True between watch() and unwatch().
+
+    def schedule(self, themes: List[Theme]) -> List[int]:
+        """Order secondary themes, starting the longest ones first when building concurrently.
+
+        Themes without a recorded duration are assumed to be the longest and keep their relative order.
+
+        :param themes: All themes including the primary theme.
+
+        :return: Indexes of secondary themes in the order they should be built.
+        """
+        indexes = [i for i, t in enumerate(themes) if not t.is_primary]
+        if self.max_parallel == 1:
+            return indexes
+        return sorted(indexes, key=lambda i: -self.predicted.get(themes[i].subdir, float("inf")))
+
+    def fork(self, theme: Theme, limits: Optional[Limits] = None) -> bool:
+        """Fork the Python process, blocking first until a slot is available.
+
+        :param theme: The theme the child process will build.
+        :param limits: Wall clock and memory limits of the child process.
+
+        :return: True if this is the child process, False if this is still the original/parent process.
+        """
+        self.wait(self.max_parallel - 1, raise_failed=False)
+        self.wait_for_memory(theme)
+        token = self.acquire_slot()
+
+        if self.logs is None:
+            self.logs = LogMultiplexer(self.app._status, self.app._warning)  # noqa pylint: disable=protected-access
+        read_fd, write_fd = os.pipe()
+
+        self.app.emit("multi-theme-before-fork")
+        parent_pid = os.getpid()
+        with self.logs.lock:
+            pid = os.fork()  # pylint: disable=no-member
+        if pid < 0:
+            os.close(read_fd)
+            os.close(write_fd)
+            raise SphinxError(f"Fork failed ({pid})")
+        if pid == 0:  # This is the child process.
+            self.forked_at = time.monotonic()
+            self.running.clear()
+            self.watching = False
+            self.unlisten()
+            os.setpgid(0, 0)  # Own process group so Sphinx's parallel workers are terminated along with the child.
+            die_with_parent(parent_pid)
+            if limits and limits.memory:
+                set_memory_limit(limits.memory)
+            os.close(read_fd)
+            self.logs.forked()
+            self.logs = None
+            redirect_logs(self.app, write_fd)
+            if self.jobserver:
+                self.jobserver.forked()
+                self.jobserver.limit_parallel(self.app)
+            self.app.emit("multi-theme-after-fork-child")
+            return True
+
+        # This is the parent (original) process.
+        try:
+            os.setpgid(pid, pid)  # Also done in the child, whichever runs first.
+        except OSError:
+            pass
+        os.close(write_fd)
+        log_source = self.logs.add(read_fd, f"[{theme.name}] ")
+        child = Child(pid, theme, time.monotonic(), token=token, log_source=log_source, limits=limits or Limits())
+        if child.limits.timeout:
+            child.timer = threading.Timer(child.limits.timeout, self.timed_out, [child])
+            child.timer.daemon = True
+            child.timer.start()
+        self.running[pid] = child
+        self.app.emit("multi-theme-after-fork-parent-child-running", pid)
+        if self.max_parallel == 1:
+            self.wait(0, raise_failed=False)
+        return False
+
+    def wait(self, max_running: int = 0, raise_failed: bool = True):
+        """Reap child processes until no more than max_running are still running.
+
+        :param max_running: Return once this many or fewer children are running. 0 waits for all of them.
+        :param raise_failed: Raise if any child failed. Ignored with fail_fast, which always stops forking more children.
+
+        With fail_fast all remaining children are terminated and reaped before raising. Otherwise failures are collected
+        and raised together once the final wait is done. If interrupted (SIGINT) all children are terminated.
+        """
+        listening = self.listen()
+        try:
+            while len(self.running) > (0 if self.failed and self.fail_fast else max_running):
+                self.reap_one()
+        except KeyboardInterrupt:
+            if self.running:
+                log = logging.getLogger(__name__)
+                log.info("%sInterrupted, terminating %d theme build(s)", utils.LOGGING_PREFIX, len(self.running))
+                self.terminate()
+                while self.running:
+                    self.reap_one()
+            raise
+        finally:
+            if listening:
+                self.unlisten()
+
+        if not raise_failed and not self.fail_fast:
+            return
+        if len(self.failed) == 1:
+            child = self.failed[0]
+            reason = f" ({child.reason})" if child.reason else ""
+            raise SphinxError(f"Child process {child.pid} failed with status {child.exit_status}{reason}")
+        if self.failed:
+            failures = ", ".join(
+                f"{c.theme.name!r} (pid {c.pid}, status {c.exit_status}{', ' + c.reason if c.reason else ''})"
+                for c in self.failed
+            )
+            raise SphinxError(f"{len(self.failed)} child processes failed: {failures}")
+
+    def reap_one(self):
+        """Wait for one child to exit, or until SIGCHLD arrives if more than one child is running.
+
+        Cancelled children still running TERMINATE_TIMEOUT seconds after terminate() are killed.
+        """
+        if self.kill_deadline is not None and time.monotonic() >= self.kill_deadline:
+            log = logging.getLogger(__name__)
+            log.info("%sKilling %d theme build(s) ignoring SIGTERM", utils.LOGGING_PREFIX, len(self.running))
+            for pid in self.running:
+                signal_child(pid, signal.SIGKILL)
+            self.kill_deadline = float("inf")
+        if len(self.running) == 1 and self.kill_deadline is None:
+            pid, status, rusage = os.wait4(next(iter(self.running)), 0)
+        else:
+            pid, status, rusage = self.poll()
+            if not pid:
+                self.sleep()
+                return
+        self.reaped(pid, status, rusage)
+
+    def terminate(self):
+        """Cancel all running children with SIGTERM, followed by SIGKILL if they don't exit in time. Reap them afterwards.
+
+        Safe to call from signal handlers.
+        """
+        if self.kill_deadline is None:
+            self.kill_deadline = time.monotonic() + self.TERMINATE_TIMEOUT
+        for pid in self.running:
+            signal_child(pid, signal.SIGTERM)
+
+    def timed_out(self, child: Child):
+        """Terminate a child that exceeded its wall clock limit, SIGKILL follows after TERMINATE_TIMEOUT. Runs in a timer.
+
+        :param child: The child process.
+        """
+        if child.exit_status is not None:
+            return
+        child.reason = f"exceeded timeout of {child.limits.timeout:g} seconds"
+        log = logging.getLogger(__name__)
+        log.info("%sTheme %r %s, terminating", utils.LOGGING_PREFIX, child.theme.name, child.reason)
+        signal_child(child.pid, signal.SIGTERM)
+        child.timer = threading.Timer(self.TERMINATE_TIMEOUT, self.kill, [child])
+        child.timer.daemon = True
+        child.timer.start()
+
+    @staticmethod
+    def kill(child: Child):
+        """Kill a child that didn't exit after SIGTERM. Runs in a timer.
+
+        :param child: The child process.
+        """
+        if child.exit_status is None:
+            signal_child(child.pid, signal.SIGKILL)
+
+    def check_failed(self):
+        """Terminate all children if one of them failed, without reaping it. Called by the SIGCHLD handler after watch().
+
+        This lets fail_fast cancel siblings while the parent is busy building the primary theme.
+        """
+        for pid in list(self.running):
+            try:
+                result = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                continue
+            if result and not (result.si_code == os.CLD_EXITED and result.si_status == 0):
+                self.terminate()
+                return
+
+    def watch(self) -> bool:
+        """Cancel siblings of failed children while the parent builds the primary theme, until unwatch is called.
+
+        :return: True if a SIGCHLD handler was installed.
+        """
+        if not self.fail_fast or not hasattr(os, "waitid") or not self.listen():
+            return False
+        self.watching = True
+        self.check_failed()  # In case a child failed before the handler was installed.
+        return True
+
+    def unwatch(self):
+        """Restore the previous SIGCHLD handler if watch() installed one."""
+        if self.watching:
+            self.watching = False
+            self.unlisten()
+
+    def on_sigchld(self, *_):
+        """Wake up sleep() and, after watch(), cancel siblings of failed children. SIGCHLD handler."""
+        if self.wakeup:
+            try:
+                os.write(self.wakeup[1], b"\0")
+            except OSError:
+                pass  # Pipe full, sleep() will wake up anyway.
+        if self.watching:
+            self.check_failed()
+
+    def listen(self) -> bool:
+        """Install the SIGCHLD handler so sleep() blocks until a child exits instead of polling.
+
+        :return: True if installed by this call, False if already listening or SIGCHLD can't be handled here.
+        """
+        if self.wakeup or not hasattr(signal, "SIGCHLD") or threading.current_thread() is not threading.main_thread():
+            return False
+        self.wakeup = os.pipe()
+        for fd in self.wakeup:
+            os.set_blocking(fd, False)
+        self.previous_handler = signal.signal(signal.SIGCHLD, self.on_sigchld)
+        return True
+
+    def unlisten(self):
+        """Restore the previous SIGCHLD handler."""
+        if not self.wakeup:
+            return
+        signal.signal(signal.SIGCHLD, self.previous_handler or signal.SIG_DFL)
+        self.previous_handler = None
+        for fd in self.wakeup:
+            os.close(fd)
+        self.wakeup = None
+
+    def sleep(self, fds: Tuple[int, ...] = ()):
+        """Block until a child may have exited, one of fds is readable, or cancelled children are due to be killed.
+
+        :param fds: Additional file descriptors to wait for, e.g. the jobserver.
+        """
+        timeout = self.WAKEUP_TIMEOUT if self.wakeup else self.POLL_INTERVAL
+        if self.kill_deadline is not None:
+            timeout = max(min(timeout, self.kill_deadline - time.monotonic()), 0)
+        fds += (self.wakeup[0],) if self.wakeup else ()
+        if fds:
+            select.select(fds, [], [], timeout)
+        else:
+            time.sleep(timeout)
+        if self.wakeup:
+            try:
+                while os.read(self.wakeup[0], 512):
+                    pass
+            except OSError:
+                pass  # Drained.
+
+    def predict_rss(self, theme: Theme) -> float:
+        """Predict the peak RSS of a theme's child process.
+
+        :param theme: The theme.
+
+        :return: Bytes, from the previous run, or else the largest child so far, or else the current size of this process.
+        """
+        if theme.subdir in self.predicted_rss:
+            return self.predicted_rss[theme.subdir] * 1024 * 1024
+        if self.usages:
+            return max(u.max_rss_mib for u in self.usages) * 1024 * 1024
+        return process_rss(os.getpid()) or 0
+
+    def memory_shortfall(self, theme: Theme) -> float:
+        """Check if there is enough memory to start another child while the running children grow to their peak RSS.
+
+        :param theme: The theme the next child would build.
+
+        :return: Missing bytes, 0 if the child may start.
+        """
+        if self.min_free_memory is None or not self.running:
+            return 0  # Always allow one child so the build degrades to serial instead of stalling.
+        available = available_memory()
+        if available is None:
+            return 0
+        needed = self.min_free_memory * 1024 * 1024 + self.predict_rss(theme)
+        for child in self.running.values():
+            needed += max(self.predict_rss(child.theme) - (process_rss(child.pid) or 0), 0)
+        return max(needed - available, 0)
+
+    def wait_for_memory(self, theme: Theme):
+        """Reap children until there is enough memory to start another one.
+
+        :param theme: The theme the next child would build.
+        """
+        shortfall = self.memory_shortfall(theme)
+        if shortfall:
+            log = logging.getLogger(__name__)
+            log.info(
+                "%sWaiting for memory before building theme %r (%.0f MiB short)",
+                utils.LOGGING_PREFIX,
+                theme.name,
+                shortfall / 1024 / 1024,
+            )
+        while shortfall:
+            self.wait(len(self.running) - 1, raise_failed=False)
+            shortfall = self.memory_shortfall(theme)
+
+    def acquire_slot(self) -> Optional[bytes]:
+        """Wait for a job slot for the next child, reaping children in the meantime since they free up slots.
+
+        :return: Jobserver token, or None if the child can use this process's implicit slot (or there is no jobserver).
+        """
+        if not self.jobserver:
+            return None
+        listening = self.listen()
+        try:
+            while True:
+                if not self.implicit_slot_lent:
+                    self.implicit_slot_lent = True
+                    return None
+                token = self.jobserver.try_acquire()
+                if token:
+                    return token
+                pid, status, rusage = self.poll()
+                if pid:
+                    self.reaped(pid, status, rusage)
+                    if self.failed and self.fail_fast:
+                        self.wait(0)
+                else:
+                    self.sleep((self.jobserver.read_fd,))
+        finally:
+            if listening:
+                self.unlisten()
+
+    def overlap_primary(self) -> bool:
+        """Try to get a job slot for the parent to build the primary theme while children are running.
+
+        :return: True if the parent may build now, False if it should wait for children to finish first.
+        """
+        if not self.jobserver or not self.implicit_slot_lent:
+            return True
+        self.parent_token = self.jobserver.try_acquire()
+        return self.parent_token is not None
+
+    def child_ready(self, app: Sphinx):
+        """Log how long the child process took from forking until its builder was ready. Can be connected to Sphinx events.
+
+        :param app: Sphinx application.
+        """
+        log = logging.getLogger(__name__)
+        theme = app.config[utils.CONFIG_NAME_INTERNAL_THEMES].active
+        elapsed = time.monotonic() - self.forked_at
+        log.info("%sTheme %r ready %.3f seconds after forking", utils.LOGGING_PREFIX, theme.name, elapsed)
+
+    def poll(self) -> Tuple[int, int, object]:
+        """Check all running children without blocking.
+
+        :return: Pid, wait status, and resource usage of the first exited child, or (0, 0, None) if none have exited yet.
+        """
+        for pid in self.running:
+            result = os.wait4(pid, os.WNOHANG)
+            if result[0]:
+                return result
+        return 0, 0, None
+
+    def reaped(self, pid: int, status: int, rusage=None):
+        """Handle a child process that has exited.
+
+        :param pid: Child process ID.
+        :param status: Wait status from os.wait4().
+        :param rusage: resource.struct_rusage from os.wait4().
+        """
+        log = logging.getLogger(__name__)
+        child = self.running.pop(pid)
+        child.exit_status = utils.decode_wait_status(status)
+        if child.timer:
+            child.timer.cancel()
+        elapsed = time.monotonic() - child.started
+        if rusage is not None:
+            self.usages.append(
+                ResourceUsage.from_rusage(child.theme.name, child.theme.subdir, child.exit_status, elapsed, rusage)
+            )
+        if self.jobserver:
+            if child.token:
+                self.jobserver.release(child.token)
+            else:
+                self.implicit_slot_lent = False
+        if child.log_source:
+            self.logs.drain(child.log_source)
+        self.app.emit("multi-theme-after-fork-parent-child-exited", pid, child.exit_status)
+        cancelled = self.kill_deadline is not None and child.exit_status in (-signal.SIGTERM, -signal.SIGKILL)
+        if cancelled and not child.reason:
+            log.info("%sCancelled building theme %r", utils.LOGGING_PREFIX, child.theme.name)
+            self.cancelled.append(child)
+            return
+        if child.exit_status != 0:
+            child.reason = child.reason or describe_failure(child)
+            if child.reason:
+                log.info("%sFailed building theme %r (%s)", utils.LOGGING_PREFIX, child.theme.name, child.reason)
+            else:
+                log.info("%sFailed building theme %r", utils.LOGGING_PREFIX, child.theme.name)
+            self.failed.append(child)
+            if self.fail_fast and self.running:
+                log.info("%sTerminating %d theme build(s)", utils.LOGGING_PREFIX, len(self.running))
+                self.terminate()
+            return
+        self.actual[child.theme.subdir] = elapsed
+        log.info("%sDone with theme %r (%.2f seconds)", utils.LOGGING_PREFIX, child.theme.name, elapsed)
+
+    def build_finished(self, _: Sphinx, exc: Optional[Exception]):
+        """Wait for children still running while the parent built the primary theme.
+
+        :param _: Sphinx application.
+        :param exc: Exception raised during the primary build, if any.
+        """
+        log = logging.getLogger(__name__)
+        if self.running:
+            log.info("%sWaiting for %d theme(s) still building", utils.LOGGING_PREFIX, len(self.running))
+        try:
+            self.wait(0)
+        except SphinxError:
+            if exc:
+                return  # Let Sphinx report the original exception; the child already logged its own.
+            raise
+        finally:
+            self.unwatch()
+            if self.parent_token:
+                self.jobserver.release(self.parent_token)
+                self.parent_token = None
+        self.finish()
+        log.info("%sExiting multi-theme build mode", utils.LOGGING_PREFIX)
+
+    def finish(self):
+        """Log predicted versus actual durations and save them for the next run. Call after all children exited.
+
+        Also logs and saves resource usage of every child.
+        """
+        log = logging.getLogger(__name__)
+        if self.logs:
+            self.logs.stop()
+        if self.usages:
+            log.info("%sTheme resource usage:", utils.LOGGING_PREFIX)
+            for line in format_usage_table(self.usages):
+                log.info("%s    %s", utils.LOGGING_PREFIX, line)
+            if self.resources_file:
+                save_usage(self.resources_file, self.usages)
+        if not self.actual:
+            return
+
+        log.info("%sTheme build durations (predicted / actual):", utils.LOGGING_PREFIX)
+        for subdir, actual in self.actual.items():
+            predicted = self.predicted.get(subdir)
+            predicted_str = "unknown" if predicted is None else f"{predicted:.2f}s"
+            log.info("%s    %s: %s / %.2fs", utils.LOGGING_PREFIX, subdir, predicted_str, actual)
+
+        if self.durations_file:
+            save_durations(self.durations_file, dict(self.predicted, **self.actual))
+
+
+def describe_failure(child: Child) -> str:
+    """Explain why a child failed based on its exit status.
+
+    :param child: A reaped child process.
+
+    :return: Reason, or an empty string if the build simply failed.
+    """
+    if child.exit_status == utils.EXIT_STATUS_MEMORY_ERROR:
+        if child.limits.memory:
+            return f"exceeded memory limit of {child.limits.memory:g} MiB"
+        return "ran out of memory"
+    if child.exit_status is not None and child.exit_status < 0:
+        try:
+            return f"killed by {signal.Signals(-child.exit_status).name}"
+        except ValueError:
+            return f"killed by signal {-child.exit_status}"
+    return ""
+
+
+def signal_child(pid: int, signum: int):
+    """Send a signal to a child process and its process group (Sphinx's parallel workers).
+
+    :param pid: Child process ID, also its process group ID.
+    :param signum: Signal number.
+    """
+    try:
+        os.killpg(pid, signum)
+    except OSError:
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass  # Already exited.
+
+
+def die_with_parent(parent_pid: int):
+    """Make sure the current (child) process doesn't outlive the parent, e.g. when the parent is killed with SIGKILL.
+
+    Uses prctl(PR_SET_PDEATHSIG) on Linux, otherwise a background thread polling the parent process ID.
+
+    :param parent_pid: Process ID of the parent.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM, 0, 0, 0) == 0:
+                if os.getppid() != parent_pid:
+                    os_exit(1)  # Parent died before prctl().
+                return
+        except (AttributeError, OSError):
+            pass
+    thread = threading.Thread(target=watch_parent, args=(parent_pid,), name="multi-theme-watch-parent", daemon=True)
+    thread.start()
+
+
+def watch_parent(parent_pid: int, interval: float = 1.0):
+    """Terminate the current process once its parent exited. Runs in a background thread.
+
+    :param parent_pid: Process ID of the parent.
+    :param interval: Seconds between checks.
+    """
+    while os.getppid() == parent_pid:
+        time.sleep(interval)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def resolve_max_parallel(value: Optional[Union[int, str]], name: str = utils.CONFIG_NAME_MAX_PARALLEL) -> int:
+    """Convert the multi_theme_max_parallel (or similar) config value to a positive integer.
+
+    :param value: Config value, either an integer or "auto" for the number of CPUs.
+    :param name: Config name for error messages.
+
+    :return: Maximum number of child processes to run at the same time.
+    """
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError) as exc:
+        raise SphinxError(f"Invalid value for {name}: {value!r}") from exc
+
+
+def load_durations(path: str) -> Dict[str, float]:
+    """Read theme build durations recorded by previous runs.
+
+    :param path: JSON file path.
+
+    :return: Seconds keyed by theme subdir. Empty if the file is missing or unreadable.
+    """
+    try:
+        with open(path, encoding="utf8") as handle:
+            durations = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(durations, dict):
+        return {}
+    return {k: float(v) for k, v in durations.items() if isinstance(v, (int, float))}
+
+
+def save_durations(path: str, durations: Dict[str, float]):
+    """Write theme build durations for future runs.
+
+    :param path: JSON file path.
+    :param durations: Seconds keyed by theme subdir.
+    """
+    ensuredir(os.path.dirname(path))
+    with open(path, "w", encoding="utf8") as handle:
+        json.dump(durations, handle, indent=2, sort_keys=True)
@@ -0,0 +1,95 @@
+"""Render the theme switcher in the browser instead of resolving a toctree into every page of every theme.
+
+Each theme's output gets one small script defining a map of all themes and a static script that fills placeholders left by
+the multi-theme-toctree directive (or the multi_theme_switcher.html sidebar template) with links to the current page.
+"""
+import json
+import os
+from html import escape
+from typing import Dict, List, Optional
+
+from docutils import nodes
+from sphinx.application import Sphinx
+from sphinx.config import Config
+
+from sphinx_multi_theme import utils
+from sphinx_multi_theme.theme import MultiTheme
+
+MAP_GLOBAL = "multiThemeSwitcherMap"
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+def is_enabled(config: Config) -> bool:
+    """Check if the theme switcher is rendered client-side.
+
+    :param config: Sphinx configuration.
+
+    :return: True if enabled.
+    """
+    return config[utils.CONFIG_NAME_SWITCHER] == utils.SWITCHER_SCRIPT
+
+
+def placeholder(caption: Optional[str] = None, is_reversed: bool = False) -> nodes.raw:
+    """Create the HTML element the script renders the theme list into.
+
+    :param caption: Optional caption, same markup as toctree captions.
+    :param is_reversed: List themes in reverse order.
+
+    :return: Raw HTML node, ignored by non-HTML builders.
+    """
+    attributes = ' data-reversed=""' if is_reversed else ""
+    caption_html = f'<p class="caption"><span class="caption-text">{escape(caption)}</span></p>' if caption else ""
+    html = f'<div class="multi-theme-switcher toctree-wrapper"{attributes}>{caption_html}</div>'
+    return nodes.raw("", html, format="html")
+
+
+def switcher_map(multi_theme: MultiTheme) -> Dict[str, object]:
+    """Describe all themes for the script.
+
+    :param multi_theme: MultiTheme instance.
+
+    :return: JSON serializable map.
+    """
+    themes: List[Dict[str, str]] = [
+        {"name": t.name, "text": t.display_name or t.name, "subdir": t.subdir} for t in multi_theme.themes
+    ]
+    return {"active": multi_theme.active.subdir, "themes": themes}
+
+
+def add_static_files(_: Sphinx, config: Config):
+    """Make the script and the sidebar template available to every theme.
+
+    :param _: Sphinx application.
+    :param config: Sphinx configuration.
+    """
+    if not is_enabled(config):
+        return
+    config["html_static_path"] = list(config["html_static_path"]) + [STATIC_DIR]
+    config["templates_path"] = list(config["templates_path"]) + [TEMPLATES_DIR]
+
+
+def add_script(app: Sphinx):
+    """Include the theme map and the script in every page. Deferred scripts run in order so the map is defined first.
+
+    :param app: Sphinx application.
+    """
+    if is_enabled(app.config) and app.builder.format == "html":
+        app.add_js_file(utils.SWITCHER_MAP_JS_FILE_NAME, defer="defer")
+        app.add_js_file(utils.SWITCHER_JS_FILE_NAME, defer="defer")
+
+
+def write_switcher_map(app: Sphinx, exc: Optional[Exception]):
+    """Write the theme map into the output of the theme being built. Runs in the parent and in every child.
+
+    The map is a script setting a global instead of JSON fetched by the script, browsers refuse fetch() over file:// URLs.
+
+    :param app: Sphinx application.
+    :param exc: Exception raised during Sphinx build process, may be unrelated to this library.
+    """
+    multi_theme_instance: Optional[MultiTheme] = app.config[utils.CONFIG_NAME_INTERNAL_THEMES]
+    if exc or not is_enabled(app.config) or app.builder.format != "html" or not multi_theme_instance:
+        return
+    path = os.path.join(app.outdir, "_static", utils.SWITCHER_MAP_JS_FILE_NAME)
+    with open(path, "w", encoding="utf8") as handle:
+        handle.write(f"window.{MAP_GLOBAL} = {json.dumps(switcher_map(multi_theme_instance))};\n")
@@ -1,6 +1,6 @@
 """Theme and MultiTheme classes that can be directly used in conf.py."""
 from dataclasses import dataclass, field
-from typing import Dict, Iterator, List, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from sphinx.errors import SphinxError
 
@@ -12,6 +12,8 @@ class Theme:
     name: str  # e.g. "sphinx_rtd_theme"
     display_name: str = ""  # Pretty name shown in the toctree, e.g. "Read the Docs"
     subdir: str = ""  # Subdirectory basename including prefix, e.g. "theme_rtd"
+    own_search_index: bool = False  # Index documents in this theme's build instead of copying the primary theme's index.
+    own_artifacts: bool = False  # Write images, downloads, sources, and objects.inv instead of linking the primary's.
     is_active: bool = field(default=False, init=False)  # If this is the current theme Sphinx is building in this process.
 
     @property
@@ -38,8 +40,13 @@ class MultiTheme:
         for theme in themes:
             themes_.append(theme if hasattr(theme, "subdir") else Theme(theme))
         self.themes = themes_
+        self.active_index = 0
+        self.by_name: Dict[str, Theme] = {}
+        self.by_subdir: Dict[str, Theme] = {}
+        self.prefixes: Dict[str, Dict[str, str]] = {}
         self.set_active(0)
         self.set_subdir_attrs()
+        self.reindex()
 
     def __len__(self) -> int:
         """Return length of self.themes."""
@@ -50,7 +57,7 @@ class MultiTheme:
         try:
             return self.themes[item]
         except TypeError:
-            return {t.name: t for t in self.themes}[item]
+            return self.by_name[item]
 
     def __iter__(self) -> Iterator[Theme]:
         """Yield themes."""
@@ -79,26 +86,47 @@ class MultiTheme:
             if idx == idx2:
                 continue
             theme.is_active = False
+        self.active_index = idx % len(self.themes)
         return active_theme
 
     @property
     def active(self) -> Theme:
         """Return the active theme."""
-        themes = [t for t in self.themes if t.is_active]
-        return themes[0]
+        return self.themes[self.active_index]
 
     @property
     def primary(self) -> Theme:
         """Return the primary theme."""
-        themes = [t for t in self.themes if t.is_primary]
-        return themes[0]
+        return self.themes[0]
 
     def truncate(self) -> List[Theme]:
         """Remove all secondary themes, only keep the primary theme."""
         removed_themes = self.themes[1:]
         self.themes[:] = self.themes[:1]
+        self.reindex()
         return removed_themes
 
+    def reindex(self):
+        """Rebuild lookups by name and subdir and the relative prefixes between all themes.
+
+        Called automatically, only needed after modifying self.themes or a theme's subdir directly.
+        """
+        self.by_name = {t.name: t for t in self.themes}  # Last one wins for duplicate names.
+        self.by_subdir = {t.subdir: t for t in self.themes}
+        self.prefixes = {f.subdir: {t.subdir: relative_prefix(f.subdir, t.subdir) for t in self.themes} for f in self.themes}
+        if self.active_index >= len(self.themes):
+            self.set_active(0)
+
+    def relative_prefix(self, to_subdir: str, from_subdir: Optional[str] = None) -> str:
+        """Return the relative path from one theme's root directory to another theme's root directory.
+
+        :param to_subdir: Subdirectory of the theme being linked to.
+        :param from_subdir: Subdirectory of the theme linking, defaults to the active theme.
+
+        :return: Empty string for the same theme, otherwise a prefix without a trailing slash (e.g. "../theme_classic").
+        """
+        return self.prefixes[self.active.subdir if from_subdir is None else from_subdir][to_subdir]
+
     def set_subdir_attrs(self):
         """Set subdir attribute for every theme except the first one."""
         primary_theme = self.themes[0]
@@ -121,3 +149,20 @@ class MultiTheme:
                     subdir = f"{subdir}{i}"
                 theme.subdir = subdir
             visited[theme.subdir] = theme
+
+
+def relative_prefix(from_subdir: str, to_subdir: str) -> str:
+    """Compute the relative path between the root directories of two themes.
+
+    :param from_subdir: Subdirectory of the theme linking, empty string for the primary theme.
+    :param to_subdir: Subdirectory of the theme being linked to.
+
+    :return: Empty string, subdir, "..", or "../subdir".
+    """
+    if to_subdir == from_subdir:
+        return ""
+    if not from_subdir:
+        return to_subdir
+    if not to_subdir:
+        return ".."
+    return f"../{to_subdir}"
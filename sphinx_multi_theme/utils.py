@@ -1,52 +1,162 @@
 """Avoid circular imports and other misc code."""
+import importlib
 import os
+import shutil
 import sys
+import tempfile
 import traceback
 from os import _exit as os_exit  # noqa
-from os import waitpid
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from sphinx.application import Sphinx
 from sphinx.config import Config
-from sphinx.errors import SphinxError
 from sphinx.util import ensuredir, logging
 
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # Python < 3.8.
+    entry_points = None
+
+CONFIG_NAME_DEDUPLICATE = "multi_theme_deduplicate"
+CONFIG_NAME_FORCE_REBUILD = "multi_theme_force_rebuild"
+CONFIG_NAME_FORK_POINT = "multi_theme_fork_point"
+CONFIG_NAME_INTERNAL_HTML_CONTEXT_KEYS = "multi_theme__INTERNAL__html_context_keys"
 CONFIG_NAME_INTERNAL_IS_CHILD = "multi_theme__INTERNAL__is_child"
+CONFIG_NAME_INTERNAL_JOBSERVER = "multi_theme__INTERNAL__jobserver"
 CONFIG_NAME_INTERNAL_THEMES = "multi_theme__INTERNAL__MultiTheme"
+CONFIG_NAME_JOB_SLOTS = "multi_theme_job_slots"
+CONFIG_NAME_LINKCHECK = "multi_theme_linkcheck"
+CONFIG_NAME_LINKCHECK_CACHE = "multi_theme_linkcheck_cache"
+CONFIG_NAME_LINKCHECK_CACHE_TTL = "multi_theme_linkcheck_cache_ttl"
+CONFIG_NAME_MAX_PARALLEL = "multi_theme_max_parallel"
+CONFIG_NAME_MEMORY_LIMIT = "multi_theme_memory_limit"
+CONFIG_NAME_MIN_FREE_MEMORY = "multi_theme_min_free_memory"
+CONFIG_NAME_ON_FAILURE = "multi_theme_on_failure"
+CONFIG_NAME_OUTPUT_MANIFEST = "multi_theme_output_manifest"
+CONFIG_NAME_OVERLAP_PRIMARY = "multi_theme_overlap_primary"
+CONFIG_NAME_PRELOAD_THEMES = "multi_theme_preload_themes"
 CONFIG_NAME_PRINT_FILES = "multi_theme_print_files"
+CONFIG_NAME_PRINT_FILES_LARGEST = "multi_theme_print_files_largest"
+CONFIG_NAME_PRINT_FILES_MAX_DEPTH = "multi_theme_print_files_max_depth"
+CONFIG_NAME_PRINT_FILES_MAX_ENTRIES = "multi_theme_print_files_max_entries"
 CONFIG_NAME_PRINT_FILES_STYLE = "multi_theme_print_files_style"
+CONFIG_NAME_PROFILE_DIR = "multi_theme_profile_dir"
+CONFIG_NAME_SHARD = "multi_theme_shard"
+CONFIG_NAME_SHARED_DOCTREES = "multi_theme_shared_doctrees"
+CONFIG_NAME_SWITCHER = "multi_theme_switcher"
+CONFIG_NAME_TIMEOUT = "multi_theme_timeout"
+DEDUPLICATED_FILE_NAME = "multi_theme_deduplicated.json"
+DURATIONS_FILE_NAME = "multi_theme_durations.json"
+ENV_VERSION = 1  # Bump when pickled nodes change so Sphinx discards environments from older versions.
+EXIT_STATUS_MEMORY_ERROR = 3  # Exit status of children whose build raised MemoryError.
+FINGERPRINT_FILE_NAME = ".multi_theme_fingerprint"
+FORK_POINT_CONFIG_INITED = "config-inited"
+FORK_POINT_ENV_UPDATED = "env-updated"
+FORK_POINTS = (FORK_POINT_CONFIG_INITED, FORK_POINT_ENV_UPDATED)
+LINKCHECK_LINKS_FILE_NAME = "multi_theme_links.json"
+LINKCHECK_ONCE = "once"
+LINKCHECK_PER_THEME = "per-theme"
+LINKCHECK_MODES = (LINKCHECK_ONCE, LINKCHECK_PER_THEME)
 LOGGING_PREFIX = "🍴 "
+ON_FAILURE_FAIL_FAST = "fail-fast"
+ON_FAILURE_KEEP_GOING = "keep-going"
+ON_FAILURE_POLICIES = (ON_FAILURE_FAIL_FAST, ON_FAILURE_KEEP_GOING)
+PRELOAD_MODULES = ["jinja2.ext"]  # Imported lazily by Sphinx's template bridge in every child.
+RESOURCES_FILE_NAME = "multi_theme_resources.json"
+SHARD_MANIFEST_FILE_NAME = ".multi_theme_shard.json"
+SHARED_ARTIFACTS_FILE_NAME = "multi_theme_shared.json"
 SPHINX_CONNECT_PRIORITY_FLATTEN_HTML_THEME = 1
 SPHINX_CONNECT_PRIORITY_FORK_SPHINX = SPHINX_CONNECT_PRIORITY_FLATTEN_HTML_THEME - 1
 SPHINX_CONNECT_PRIORITY_PRINT_FILES = 999
+SPHINX_CONNECT_PRIORITY_WRITE_OUTPUT_MANIFEST = SPHINX_CONNECT_PRIORITY_PRINT_FILES - 1  # After all files are final.
+SPHINX_CONNECT_PRIORITY_SAVE_SHARD_MANIFEST = SPHINX_CONNECT_PRIORITY_WRITE_OUTPUT_MANIFEST - 1
+SPHINX_CONNECT_PRIORITY_DEDUPLICATE_FILES = SPHINX_CONNECT_PRIORITY_SAVE_SHARD_MANIFEST - 1
+SPHINX_CONNECT_PRIORITY_SHARE_ARTIFACTS = SPHINX_CONNECT_PRIORITY_DEDUPLICATE_FILES - 1
+SPHINX_CONNECT_PRIORITY_SHARE_SEARCH_INDEX = SPHINX_CONNECT_PRIORITY_SHARE_ARTIFACTS - 1
+SPHINX_CONNECT_PRIORITY_WAIT_FOR_CHILDREN = SPHINX_CONNECT_PRIORITY_SHARE_SEARCH_INDEX - 1
+SPHINX_CONNECT_PRIORITY_DUMP_PROFILE = SPHINX_CONNECT_PRIORITY_WAIT_FOR_CHILDREN - 1
 SPHINX_CONNECT_PRIORITY_TERMINATE_FORKED_BUILD = SPHINX_CONNECT_PRIORITY_PRINT_FILES + 1
+SPHINX_CONNECT_PRIORITY_RELEASE_JOB_SLOTS = SPHINX_CONNECT_PRIORITY_TERMINATE_FORKED_BUILD - 1
+SPHINX_CONNECT_PRIORITY_SAVE_FINGERPRINT = SPHINX_CONNECT_PRIORITY_TERMINATE_FORKED_BUILD - 1
+SPHINX_CONNECT_PRIORITY_REMOVE_SCRATCH_DOCTREEDIR = SPHINX_CONNECT_PRIORITY_TERMINATE_FORKED_BUILD - 1
 SPHINX_CONNECT_PRIORITY_UNSUPPORTED_BUILDER_NOOP = 1
 SUPPORTED_BUILDERS = ["html", "linkcheck"]
+SWITCHER_JS_FILE_NAME = "multi_theme_switcher.js"
+SWITCHER_MAP_JS_FILE_NAME = "multi_theme_switcher_map.js"
+SWITCHER_SCRIPT = "script"
+SWITCHER_TOCTREE = "toctree"
+SWITCHERS = (SWITCHER_TOCTREE, SWITCHER_SCRIPT)
+
+
+def decode_wait_status(status: int) -> int:
+    """Convert a wait status from os.waitpid() into an exit status.
+
+    :param status: Wait status.
+
+    :return: Exit code of the process, or the negative signal number if it was killed by a signal.
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def theme_entry_points() -> Dict[str, object]:
+    """Find themes installed as Python packages.
+
+    :return: Entry points keyed by theme name.
+    """
+    if entry_points is None:
+        import pkg_resources  # pylint: disable=import-outside-toplevel
+
+        found = pkg_resources.iter_entry_points("sphinx.html_themes")
+    else:
+        try:
+            found = entry_points(group="sphinx.html_themes")
+        except TypeError:  # Python < 3.10.
+            found = entry_points().get("sphinx.html_themes", [])
+    return {e.name: e for e in found}
 
 
-def fork_and_wait(app: Sphinx) -> bool:
-    """Fork the Python process and wait for the child process to finish.
+def entry_point_module(entry_point) -> str:
+    """Get the module name of an entry point from importlib.metadata or pkg_resources.
 
-    :param app: Sphinx app instance for emitting events.
+    :param entry_point: Entry point.
 
-    :return: True if this is the child process, False if this is still the original/parent process.
+    :return: Module name.
     """
-    app.emit("multi-theme-before-fork")
-    pid = os.fork()  # pylint: disable=no-member
-    if pid < 0:
-        raise SphinxError(f"Fork failed ({pid})")
-    if pid == 0:  # This is the child process.
-        app.emit("multi-theme-after-fork-child")
-        return True
-
-    # This is the parent (original) process. Wait (block) for child to finish.
-    app.emit("multi-theme-after-fork-parent-child-running", pid)
-    exit_status = waitpid(pid, 0)[1] // 256  # https://code-maven.com/python-fork-and-wait
-    app.emit("multi-theme-after-fork-parent-child-exited", pid, exit_status)
-    if exit_status != 0:
-        raise SphinxError(f"Child process {pid} failed with status {exit_status}")
+    return getattr(entry_point, "module_name", None) or entry_point.value.split(":")[0]
+
+
+def preload_themes(names: List[str]) -> List[str]:
+    """Import Python packages of themes installed via entry points so forked children inherit them already loaded.
+
+    Theme extensions are only imported here, their setup() functions still run in the child building that theme.
+
+    :param names: Theme names.
+
+    :return: Imported module names.
+    """
+    found = theme_entry_points()
+    modules = [entry_point_module(found[n]) for n in names if n in found]
+    for module in PRELOAD_MODULES + modules:
+        importlib.import_module(module)
+    return modules
+
 
+def is_memory_error(exc: Optional[BaseException]) -> bool:
+    """Check if an exception was caused by running out of memory, including wrapped exceptions.
+
+    :param exc: Exception raised during the build.
+
+    :return: True if MemoryError is in the exception's chain.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, MemoryError):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
     return False
 
 
@@ -64,7 +174,9 @@ def terminate_forked_build(app: Sphinx, exc: Optional[Exception]):
     sys.stdout.flush()
     sys.stderr.flush()
 
-    exit_status = 1 if exc else 0
+    exit_status = 0
+    if exc:
+        exit_status = EXIT_STATUS_MEMORY_ERROR if is_memory_error(exc) else 1
     app.emit("multi-theme-child-before-exit", exit_status, exc)
     os_exit(exit_status)
 
@@ -106,6 +218,54 @@ def log_dir_change(label: str, old_dir: Path, new_dir: Path, depth: int):
     log.info("%sChanging %s from '%s' to '%s'", LOGGING_PREFIX, label, rel_old, rel_new)
 
 
+def remove_scratch_doctreedir(app: Sphinx, _: Optional[Exception]):
+    """Remove the child's temporary doctreedir used when doctrees are shared.
+
+    :param app: Sphinx app instance.
+    :param _: Exception during build if it failed.
+    """
+    shutil.rmtree(app.builder.doctreedir, ignore_errors=True)
+
+
+def modify_forked_sphinx_builder(app: Sphinx, config: Config):
+    """Point an already initialized builder to the new directories and load the active theme.
+
+    The build environment (and its doctreedir) is left alone so the child writes using doctrees read by the parent.
+
+    :param app: Sphinx app instance with the modified outdir and doctreedir.
+    :param config: Sphinx configuration.
+    """
+    builder = app.builder
+    builder.outdir = app.outdir
+    if config[CONFIG_NAME_SHARED_DOCTREES]:
+        # Nothing the child writes to a doctreedir is read again, pickle the environment to a throwaway directory.
+        builder.doctreedir = tempfile.mkdtemp(prefix="multi_theme_")
+        app.connect("build-finished", remove_scratch_doctreedir, priority=SPHINX_CONNECT_PRIORITY_REMOVE_SCRATCH_DOCTREEDIR)
+    else:
+        builder.doctreedir = app.doctreedir
+        ensuredir(app.doctreedir)
+
+    # Same as flatten_html_theme() but for the now active theme.
+    active_theme_name = config[CONFIG_NAME_INTERNAL_THEMES].active.name
+    config["html_theme"] = active_theme_name
+    for top_level_key, key in config[CONFIG_NAME_INTERNAL_HTML_CONTEXT_KEYS]:
+        config[top_level_key][key] = active_theme_name
+
+    # Reload theme dependent parts of HTML builders.
+    if hasattr(builder, "init_templates"):
+        inited = {listener.id for listener in app.events.listeners["builder-inited"]}
+        builder.init_templates()  # Loads the theme, which may set up the theme's own extension.
+        builder.init_highlighter()
+        builder.init_css_files()
+        builder.init_js_files()
+        builder.build_info = builder.create_build_info()
+
+        # builder-inited already fired for the primary theme, only run handlers connected while loading the new theme.
+        for listener in sorted(app.events.listeners["builder-inited"], key=lambda item: item.priority):
+            if listener.id not in inited:
+                listener.handler(app)
+
+
 def modify_forked_sphinx_app(app: Sphinx, config: Config, subdir: str):
     """Make changes to the new Sphinx app after forking.
 
@@ -123,9 +283,17 @@ def modify_forked_sphinx_app(app: Sphinx, config: Config, subdir: str):
     app.outdir = new_outdir
 
     # Set the doctree directory.
-    new_doctreedir, is_external = determine_new_doctreedir(Path(old_doctreedir), Path(old_outdir), Path(new_outdir))
-    log_dir_change("doctreedir", Path(old_doctreedir), new_doctreedir, 3 if is_external else 2)
-    app.doctreedir = str(new_doctreedir)
+    if app.builder and config[CONFIG_NAME_SHARED_DOCTREES]:
+        log = logging.getLogger(__name__)
+        log.info("%sSharing doctreedir '%s'", LOGGING_PREFIX, old_doctreedir)
+    else:
+        new_doctreedir, is_external = determine_new_doctreedir(Path(old_doctreedir), Path(old_outdir), Path(new_outdir))
+        log_dir_change("doctreedir", Path(old_doctreedir), new_doctreedir, 3 if is_external else 2)
+        app.doctreedir = str(new_doctreedir)
+
+    # Forked after the read phase, the builder already exists and has the primary theme loaded.
+    if app.builder:
+        modify_forked_sphinx_builder(app, config)
 
     # Set flag.
     config[CONFIG_NAME_INTERNAL_IS_CHILD] = True
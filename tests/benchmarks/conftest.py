@@ -0,0 +1,60 @@
+"""pytest conftest."""
+import json
+import platform
+from typing import Dict, List
+
+import pytest
+import sphinx
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.terminal import TerminalReporter
+
+from sphinx_multi_theme import __version__
+from tests.benchmarks.project import ProjectSpec
+
+RESULTS: List[Dict[str, object]] = []
+
+
+def pytest_addoption(parser: Parser):
+    """Options for the size of generated projects and where to save results."""
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-pages", type=int, default=50, help="pages per generated project")
+    group.addoption("--bench-depth", type=int, default=3, help="toctree depth of generated projects")
+    group.addoption("--bench-images", type=int, default=10, help="unique images per generated project")
+    group.addoption("--bench-modules", type=int, default=5, help="autodoc modules per generated project")
+    group.addoption("--bench-json", default="", help="write results to this JSON file")
+
+
+@pytest.fixture(name="spec")
+def _spec(pytestconfig: Config) -> ProjectSpec:
+    """Size of generated projects from command line options."""
+    return ProjectSpec(*(pytestconfig.getoption(f"--bench-{n}") for n in ("pages", "depth", "images", "modules")))
+
+
+@pytest.fixture(name="results")
+def _results() -> List[Dict[str, object]]:
+    """Results of all benchmarks in this session."""
+    return RESULTS
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter, config: Config):
+    """Print a table of results and write them to the JSON file if requested."""
+    if not RESULTS:
+        return
+    terminalreporter.section("multi-theme benchmarks")
+    terminalreporter.write_line(
+        f"{'mode':<20} {'themes':>6} {'wall s':>8} {'max RSS MiB':>11} {'output MiB':>10} {'ready s':>7}"
+    )
+    for result in RESULTS:
+        ready = "-" if result["ready_seconds"] is None else f"{result['ready_seconds']:.2f}"
+        terminalreporter.write_line(
+            f"{result['mode']:<20} {result['themes']:>6} {result['wall']:>8.2f} {result['max_rss_mib']:>11.1f}"
+            f" {result['output_bytes'] / 1024 / 1024:>10.1f} {ready:>7}"
+        )
+
+    path = config.getoption("--bench-json")
+    if path:
+        versions = {"python": platform.python_version(), "sphinx": sphinx.__version__, "sphinx_multi_theme": __version__}
+        with open(path, "w", encoding="utf8") as handle:
+            json.dump({"versions": versions, "results": RESULTS}, handle, indent=2)
+        terminalreporter.write_line(f"Results written to {path}")
@@ -0,0 +1,138 @@
+"""Generate synthetic Sphinx projects for benchmarks."""
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+THEMES = ["classic", "alabaster", "traditional", "nature", "haiku", "pyramid", "scrolls", "agogo"]
+
+
+@dataclass
+class ProjectSpec:
+    """A 'struct' representing the size of a generated project."""
+
+    pages: int  # Number of pages excluding index pages.
+    depth: int  # Toctree depth.
+    images: int  # Number of unique images, referenced round-robin by pages.
+    modules: int  # Number of Python modules documented with autodoc, referenced round-robin by pages.
+
+
+def png(seed: int, size: int = 64) -> bytes:
+    """Create a small but unique PNG image.
+
+    :param seed: Makes every image's pixels (and therefore its hash) different.
+    :param size: Width and height in pixels.
+
+    :return: PNG file contents.
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\0" + bytes((seed + x * y) % 256 for x in range(size * 3)) for y in range(size))
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)  # 8-bit RGB.
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def module_source(idx: int, functions: int = 10) -> str:
+    """Create a Python module with documented functions and a class for autodoc.
+
+    :param idx: Module number.
+    :param functions: Number of functions.
+
+    :return: Python source code.
+    """
+    lines = [f'"""Benchmark module {idx}."""', ""]
+    for func in range(functions):
+        lines += [
+            "",
+            f"def function_{func}(value: int, name: str = 'x') -> str:",
+            f'    """Function {func} of module {idx}.',
+            "",
+            "    :param value: A number.",
+            "    :param name: A name.",
+            "",
+            "    :return: Something.",
+            '    """',
+            "    return name * value",
+            "",
+        ]
+    lines += ["", f"class Class{idx}:", f'    """Class of module {idx}."""', "", "    attribute = 1", ""]
+    return "\n".join(lines)
+
+
+def page_source(title: str, idx: int, images: int, modules: int, children: List[str]) -> str:
+    """Create an RST page.
+
+    :param title: Page title.
+    :param idx: Page number, selects which images and modules are referenced.
+    :param images: Total number of images in the project.
+    :param modules: Total number of autodoc modules in the project.
+    :param children: Documents for the page's toctree.
+
+    :return: RST source.
+    """
+    lines = ["=" * len(title), title, "=" * len(title), ""]
+    if children:
+        lines += [".. toctree::", ""] + [f"    {c}" for c in children] + [""]
+    for section in range(3):
+        heading = f"Section {section}"
+        lines += [heading, "-" * len(heading), ""]
+        lines += ["Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt. " * 4]
+        lines += ["", ".. code-block:: python", "", f"    print({idx}, {section})", ""]
+    if images:
+        lines += [f".. image:: /_images/image_{idx % images}.png", ""]
+    if modules:
+        lines += [f".. automodule:: bench_module_{idx % modules}", "    :members:", ""]
+    return "\n".join(lines)
+
+
+def generate_project(srcdir: Path, spec: ProjectSpec, themes: int, conf: Dict[str, object]):
+    """Write a synthetic Sphinx project.
+
+    Pages are split evenly over depth levels of nested directories, each level's index page has a toctree listing the pages
+    of its level and the next level's index page.
+
+    :param srcdir: Sphinx source directory, created if missing.
+    :param spec: Size of the project.
+    :param themes: Number of themes (the first is the primary theme).
+    :param conf: Additional conf.py values.
+    """
+    (srcdir / "_images").mkdir(parents=True, exist_ok=True)
+    (srcdir / "_modules").mkdir(exist_ok=True)
+    for idx in range(spec.images):
+        (srcdir / "_images" / f"image_{idx}.png").write_bytes(png(idx))
+    for idx in range(spec.modules):
+        (srcdir / "_modules" / f"bench_module_{idx}.py").write_text(module_source(idx), encoding="utf8")
+
+    conf_lines = [
+        '"""Generated benchmark project."""',
+        "import os",
+        "import sys",
+        "",
+        "from sphinx_multi_theme.theme import MultiTheme",
+        "",
+        'sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "_modules"))',
+        'exclude_patterns = ["_build", "_modules"]',
+        'extensions = ["sphinx.ext.autodoc", "sphinx_multi_theme.multi_theme"]',
+        'master_doc = "index"',
+        f"html_theme = MultiTheme({THEMES[:themes]!r})",
+    ]
+    conf_lines += [f"{name} = {value!r}" for name, value in conf.items()]
+    (srcdir / "conf.py").write_text("\n".join(conf_lines) + "\n", encoding="utf8")
+
+    depth = max(spec.depth, 1)
+    idx = 0
+    level_dir = srcdir
+    for level in range(depth):
+        names = [f"page_{idx + i:04}" for i in range(spec.pages // depth + (1 if level < spec.pages % depth else 0))]
+        children = names + (["level/index"] if level < depth - 1 else [])
+        level_dir.mkdir(exist_ok=True)
+        index_rst = page_source(f"Level {level}", idx, spec.images, spec.modules, children)
+        (level_dir / "index.rst").write_text(index_rst, encoding="utf8")
+        for name in names:
+            page_rst = page_source(name, idx, spec.images, spec.modules, [])
+            (level_dir / f"{name}.rst").write_text(page_rst, encoding="utf8")
+            idx += 1
+        level_dir = level_dir / "level"
@@ -0,0 +1,75 @@
+"""Benchmarks."""
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from sphinx_multi_theme.utils import decode_wait_status
+from tests.benchmarks.project import generate_project, ProjectSpec
+
+MODES = {  # Extra sphinx-build arguments and conf.py values.
+    "serial": ([], {}),
+    "sphinx-parallel": (["-j", "auto"], {}),
+    "concurrent": ([], {"multi_theme_max_parallel": "auto"}),
+    "concurrent-preload": ([], {"multi_theme_max_parallel": "auto", "multi_theme_preload_themes": True}),
+    "concurrent-overlap": ([], {"multi_theme_max_parallel": "auto", "multi_theme_overlap_primary": True}),
+    "shared-env": (
+        [],
+        {"multi_theme_max_parallel": "auto", "multi_theme_fork_point": "env-updated", "multi_theme_shared_doctrees": True},
+    ),
+}
+
+
+def ready_seconds(log: str) -> Optional[float]:
+    """Slowest time from forking until a theme's builder was ready, to compare with and without preloading."""
+    seconds = [float(s) for s in re.findall(r"Theme '[^']+' ready ([\d.]+) seconds after forking", log)]
+    return max(seconds) if seconds else None
+
+
+def output_bytes(outdir: Path) -> int:
+    """Total size of all files in the output directory excluding doctrees."""
+    total = 0
+    for root, dirs, files in os.walk(outdir):
+        dirs[:] = [d for d in dirs if d != ".doctrees"]
+        total += sum(os.lstat(os.path.join(root, f)).st_size for f in files)
+    return total
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="Unsupported platform: no os.wait4()")
+@pytest.mark.parametrize("mode", list(MODES))
+@pytest.mark.parametrize("themes", [1, 2, 4, 8])
+def test_scaling(tmp_path: Path, spec: ProjectSpec, results: List[Dict[str, object]], themes: int, mode: str):
+    """Build a generated project from scratch and record wall time, peak RSS, output size, and fork to ready time."""
+    srcdir = tmp_path / "docs"
+    outdir = srcdir / "_build" / "html"
+    generate_project(srcdir, spec, themes, MODES[mode][1])
+
+    cmd = [sys.executable, "-m", "sphinx", "-T", *MODES[mode][0], str(srcdir), str(outdir)]
+    start = time.monotonic()
+    log = tmp_path / "build.log"
+    with log.open("wb") as handle:
+        proc = subprocess.Popen(cmd, cwd=srcdir, stdout=handle)  # pylint: disable=consider-using-with
+        _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.monotonic() - start
+    proc.returncode = decode_wait_status(status)
+    assert proc.returncode == 0
+
+    assert (outdir / "index.html").is_file()
+    assert len(list(outdir.glob("theme_*/index.html"))) == themes - 1
+    results.append(
+        {
+            "mode": mode,
+            "themes": themes,
+            **asdict(spec),
+            "wall": wall,
+            "max_rss_mib": rusage.ru_maxrss / 1024 if sys.platform != "darwin" else rusage.ru_maxrss / 1024 / 1024,
+            "output_bytes": output_bytes(outdir),
+            "ready_seconds": ready_seconds(log.read_text(encoding="utf8")),
+        }
+    )
@@ -0,0 +1,71 @@
+"""Tests."""
+import json
+import os
+from pathlib import Path
+
+from sphinx_multi_theme.deduplicate import deduplicate, find_duplicates, link_file, unshare
+
+
+def test_find_duplicates(tmp_path: Path):
+    """Test."""
+    files = {
+        "_static/a.js": "same",
+        "theme_x/_static/a.js": "same",
+        "theme_y/_static/a.js": "same",
+        "theme_y/_static/b.js": "diff",  # Same size different contents.
+        "empty1.txt": "",
+        "empty2.txt": "",
+    }
+    for name, contents in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(contents, encoding="utf8")
+
+    groups = find_duplicates([str(tmp_path / n) for n in files])
+
+    assert [[os.path.relpath(p, tmp_path) for p in g] for g in groups] == [
+        ["_static/a.js", "theme_x/_static/a.js", "theme_y/_static/a.js"]
+    ]
+
+
+def test_link_file_symlink_fallback(tmp_path: Path, monkeypatch):
+    """Test."""
+    (tmp_path / "src.txt").write_text("data", encoding="utf8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "dst.txt").write_text("data", encoding="utf8")
+
+    def raise_oserror(*_):
+        raise OSError("Not supported")
+
+    monkeypatch.setattr(os, "link", raise_oserror)
+    monkeypatch.setattr("sphinx_multi_theme.deduplicate.reflink", raise_oserror)
+
+    assert link_file(str(tmp_path / "src.txt"), str(tmp_path / "sub" / "dst.txt")) == "symlink"
+    assert os.readlink(tmp_path / "sub" / "dst.txt") == os.path.join("..", "src.txt")
+    assert not list((tmp_path / "sub").glob("*.multi_theme_tmp"))
+
+
+def test_deduplicate_unshare(tmp_path: Path):
+    """Test."""
+    outdir = tmp_path / "html"
+    for name in ("_static/a.js", "theme_x/_static/a.js", "theme_y/_static/a.js", ".doctrees/a.js"):
+        (outdir / name).parent.mkdir(parents=True, exist_ok=True)
+        (outdir / name).write_text("x" * 100, encoding="utf8")
+    os.utime(outdir / "theme_x/_static/a.js", ns=(1_000_000_000, 1_000_000_000))
+
+    linked, saved = deduplicate(str(outdir))
+
+    assert saved == 200
+    assert sorted(linked) == ["theme_x/_static/a.js", "theme_y/_static/a.js"]
+    assert linked["theme_x/_static/a.js"] == 1_000_000_000
+    assert os.path.samefile(outdir / "_static/a.js", outdir / "theme_x/_static/a.js")
+    assert not os.path.samefile(outdir / "_static/a.js", outdir / ".doctrees/a.js")
+
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps(linked), encoding="utf8")
+    assert unshare(str(outdir), str(manifest)) == 2
+
+    assert not manifest.exists()
+    assert not os.path.samefile(outdir / "_static/a.js", outdir / "theme_x/_static/a.js")
+    assert (outdir / "theme_x/_static/a.js").stat().st_mtime_ns == 1_000_000_000
+    assert (outdir / "theme_y/_static/a.js").read_text(encoding="utf8") == "x" * 100
+    assert unshare(str(outdir), str(manifest)) == 0
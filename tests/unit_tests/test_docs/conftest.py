@@ -1,7 +1,6 @@
 """pytest conftest."""
 import os
 import sys
-from io import StringIO
 from pathlib import Path
 from types import ModuleType
 from typing import Dict, Tuple
@@ -22,51 +21,19 @@ pytest_plugins = "sphinx.testing.fixtures"  # pylint: disable=invalid-name
 def fork_exit_save_child_data(monkeypatch: MonkeyPatch):
     """Create a temporary Sphinx extension in memory via a faux Python module with Sphinx hooks.
 
-    Hook functions take care of merging child logs into the parent process to expose them to tests. Functions also take care
-    of saving test coverage only covered in child processes.
+    Hook functions take care of saving test coverage only covered in child processes. Child logs are already streamed into
+    the parent's Sphinx logs by sphinx_multi_theme.
     """
-    status_log_file_name = "_sphinx_child_log_status.log"
-    warning_log_file_name = "_sphinx_child_log_warning.log"
 
-    def truncate_logs_after_child_is_born(app: Sphinx):
-        app._status.seek(0)  # noqa pylint: disable=protected-access
-        app._status.truncate()  # noqa pylint: disable=protected-access
-        app._warning.seek(0)  # noqa pylint: disable=protected-access
-        app._warning.truncate()  # noqa pylint: disable=protected-access
-
-    def dump_logs_save_cov_before_child_is_killed(app: Sphinx, *_):
-        # Save code coverage.
+    def save_cov_before_child_is_killed(*_):
         cov = coverage.Coverage.current()
         if cov:
             cov.stop()
             cov.save()
-        # Save Sphinx log statements.
-        status: StringIO = app._status  # noqa pylint: disable=protected-access
-        warning: StringIO = app._warning  # noqa pylint: disable=protected-access
-        status_file = os.path.join(os.path.dirname(app.outdir), status_log_file_name)
-        warning_file = os.path.join(os.path.dirname(app.outdir), warning_log_file_name)
-        with open(status_file, "w", encoding="utf8") as handle:
-            handle.write(status.getvalue())
-        with open(warning_file, "w", encoding="utf8") as handle:
-            handle.write(warning.getvalue())
-
-    def merge_dumped_child_sphinx_logs_into_parent_sphinx_logs(app: Sphinx, *_):
-        status: StringIO = app._status  # noqa pylint: disable=protected-access
-        warning: StringIO = app._warning  # noqa pylint: disable=protected-access
-        status_file = os.path.join(app.outdir, status_log_file_name)
-        warning_file = os.path.join(app.outdir, warning_log_file_name)
-        with open(status_file, "r", encoding="utf8") as handle:
-            status.write(handle.read())
-        with open(warning_file, "r", encoding="utf8") as handle:
-            warning.write(handle.read())
-        os.unlink(status_file)
-        os.unlink(warning_file)
 
     def setup(app: Sphinx):
-        app.connect("multi-theme-after-fork-child", truncate_logs_after_child_is_born)
-        app.connect("multi-theme-child-before-exit", dump_logs_save_cov_before_child_is_killed)
-        app.connect("multi-theme-unsupported-builder-child-before-exit", dump_logs_save_cov_before_child_is_killed)
-        app.connect("multi-theme-after-fork-parent-child-exited", merge_dumped_child_sphinx_logs_into_parent_sphinx_logs)
+        app.connect("multi-theme-child-before-exit", save_cov_before_child_is_killed)
+        app.connect("multi-theme-unsupported-builder-child-before-exit", save_cov_before_child_is_killed)
 
     conftest_fork_exit_save_child_data = ModuleType("conftest_fork_exit_save_child_data")
     conftest_fork_exit_save_child_data.setup = setup
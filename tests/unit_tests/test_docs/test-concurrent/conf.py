@@ -0,0 +1,75 @@
+"""Sphinx test configuration."""
+import os
+import signal
+import time
+
+from sphinx.application import Sphinx
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme.supervisor import Supervisor
+from sphinx_multi_theme.theme import MultiTheme, Theme
+from sphinx_multi_theme.utils import CONFIG_NAME_INTERNAL_THEMES
+
+
+exclude_patterns = ["_build"]
+extensions = ["sphinx_multi_theme.multi_theme"]
+master_doc = "index"
+nitpicky = True
+own_artifacts = os.environ.get("TEST_OWN_ARTIFACTS", "").split(",")
+own_search_index = os.environ.get("TEST_OWN_SEARCH_INDEX", "").split(",")
+html_theme = MultiTheme(
+    [
+        Theme(n, own_search_index=n in own_search_index, own_artifacts=n in own_artifacts)
+        for n in ("classic", "traditional", "alabaster", "nature", "haiku")
+    ]
+)
+multi_theme_max_parallel = os.environ.get("TEST_MAX_PARALLEL", "1")
+if multi_theme_max_parallel.isdigit():
+    multi_theme_max_parallel = int(multi_theme_max_parallel)
+multi_theme_overlap_primary = os.environ.get("TEST_OVERLAP_PRIMARY") == "TRUE"
+multi_theme_preload_themes = os.environ.get("TEST_PRELOAD_THEMES") == "TRUE"
+multi_theme_deduplicate = os.environ.get("TEST_DEDUPLICATE") == "TRUE"
+multi_theme_force_rebuild = os.environ.get("TEST_FORCE_REBUILD") == "TRUE"
+multi_theme_job_slots = int(os.environ["TEST_JOB_SLOTS"]) if os.environ.get("TEST_JOB_SLOTS") else None
+multi_theme_profile_dir = os.environ.get("TEST_PROFILE_DIR", "")
+multi_theme_output_manifest = os.environ.get("TEST_OUTPUT_MANIFEST", "")
+multi_theme_on_failure = os.environ.get("TEST_ON_FAILURE", "keep-going")
+multi_theme_timeout = float(os.environ["TEST_TIMEOUT"]) if os.environ.get("TEST_TIMEOUT") else None
+if os.environ.get("TEST_HOG_THEME"):
+    multi_theme_memory_limit = {os.environ["TEST_HOG_THEME"]: int(os.environ["TEST_MEMORY_LIMIT"])}
+multi_theme_min_free_memory = int(os.environ["TEST_MIN_FREE_MEMORY"]) if os.environ.get("TEST_MIN_FREE_MEMORY") else None
+Supervisor.TERMINATE_TIMEOUT = float(os.environ.get("TEST_TERMINATE_TIMEOUT", Supervisor.TERMINATE_TIMEOUT))
+
+
+def setup(app: Sphinx):
+    """Cause failures or hangs in children and set per-theme titles."""
+
+    def callback_env_before_read_docs(*_):
+        name = app.config[CONFIG_NAME_INTERNAL_THEMES].active.name
+        pid_dir = os.environ.get("TEST_PID_DIR")
+        hang_themes = [t for t in os.environ.get("TEST_HANG_THEMES", "").split(",") if t]
+        if name in hang_themes and os.environ.get("TEST_IGNORE_SIGTERM") == "TRUE":
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        if pid_dir:
+            with open(os.path.join(pid_dir, f"{name}.tmp"), "w", encoding="utf8") as handle:
+                handle.write(str(os.getpid()))
+            os.rename(os.path.join(pid_dir, f"{name}.tmp"), os.path.join(pid_dir, name))
+        if name in os.environ.get("TEST_FAIL_THEME", "").split(","):
+            deadline = time.monotonic() + 30
+            while pid_dir and time.monotonic() < deadline:  # Fail once all hanging themes are running.
+                if all(os.path.exists(os.path.join(pid_dir, t)) for t in hang_themes):
+                    break
+                time.sleep(0.05)
+            raise SphinxError("TEST_FAIL_THEME")
+        if name in hang_themes:
+            time.sleep(60)
+        if name == os.environ.get("TEST_HOG_THEME"):
+            app.config.hog = bytearray(int(os.environ["TEST_MEMORY_LIMIT"]) * 1024 * 1024)
+
+    def callback_before_fork(_, *args):
+        if args:  # Also emitted without arguments right before os.fork().
+            config, name, _ = args
+            config.html_title = os.environ.get(f"TEST_TITLE_{name.upper()}", "Python")
+
+    app.connect("env-before-read-docs", callback_env_before_read_docs)
+    app.connect("multi-theme-before-fork", callback_before_fork)
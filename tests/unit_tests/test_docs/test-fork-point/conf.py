@@ -0,0 +1,36 @@
+"""Sphinx test configuration."""
+import os
+import sys
+
+from sphinx.application import Sphinx
+from sphinx.util import logging
+
+from sphinx_multi_theme.theme import MultiTheme, Theme
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))  # Installs multi_theme_test_theme via its dist-info.
+
+exclude_patterns = ["_build"]
+extensions = ["sphinx_multi_theme.multi_theme"]
+if os.environ.get("TEST_IN_SUBPROCESS") != "TRUE":
+    extensions.append("conftest_fork_exit_save_child_data")
+master_doc = "index"
+nitpicky = True
+THEMES = [Theme("classic", "Classic"), Theme("traditional", "Traditional"), Theme("alabaster", "Alabaster"), Theme("nature")]
+THEMES.append(Theme("multi_theme_test_theme"))
+html_theme = MultiTheme(THEMES[: int(os.environ.get("TEST_NUM_THEMES", "3"))])
+html_context = {"html_theme": html_theme}
+multi_theme_fork_point = os.environ.get("TEST_FORK_POINT", "env-updated")
+multi_theme_shared_doctrees = os.environ.get("TEST_SHARED_DOCTREES") == "TRUE"
+
+
+def setup(app: Sphinx):
+    """Log the theme used to render each page."""
+
+    def callback(app_: Sphinx, pagename: str, *_):
+        log = logging.getLogger(__name__)
+        config = app_.config
+        log.info("callback(): pagename=%r, html_theme=%r, context=%r", pagename, config["html_theme"], config.html_context)
+
+    app.connect("html-page-context", callback)
+    if os.environ.get("TEST_OUTDATED"):  # Like extensions generating documents.
+        app.connect("env-get-outdated", lambda *_: [os.environ["TEST_OUTDATED"]])
@@ -0,0 +1,21 @@
+"""Theme package with its own Sphinx extension, set up when the theme is loaded like most themes installed from PyPI."""
+import os
+
+from sphinx.application import Sphinx
+
+
+def add_script(app: Sphinx):
+    """Add the theme's script to every page.
+
+    :param app: Sphinx application.
+    """
+    app.add_js_file("multi_theme_test_theme.js")
+
+
+def setup(app: Sphinx):
+    """Called by Sphinx when the theme is loaded through its entry point.
+
+    :param app: Sphinx application.
+    """
+    app.add_html_theme("multi_theme_test_theme", os.path.dirname(os.path.abspath(__file__)))
+    app.connect("builder-inited", add_script)
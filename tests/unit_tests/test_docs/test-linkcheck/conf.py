@@ -0,0 +1,32 @@
+"""Sphinx test configuration."""
+import os
+
+from sphinx.application import Sphinx
+
+from sphinx_multi_theme.theme import MultiTheme
+from sphinx_multi_theme.utils import CONFIG_NAME_INTERNAL_THEMES
+
+exclude_patterns = ["_build"]
+extensions = ["sphinx_multi_theme.multi_theme"]
+master_doc = "index"
+nitpicky = True
+html_theme = MultiTheme(["classic", "traditional", "alabaster"])
+multi_theme_linkcheck = os.environ.get("TEST_LINKCHECK", "once")
+multi_theme_linkcheck_cache = os.environ.get("TEST_LINKCHECK_CACHE", "")
+multi_theme_max_parallel = 2
+multi_theme_overlap_primary = os.environ.get("TEST_OVERLAP_PRIMARY") == "TRUE"
+rst_epilog = f"""
+.. _shared: {os.environ["TEST_LINKCHECK_URL"]}/shared
+.. _broken: {os.environ["TEST_LINKCHECK_URL"]}/broken
+"""
+
+
+def setup(app: Sphinx):
+    """Add a link only found in one theme."""
+
+    def callback_source_read(_, docname: str, source: list):
+        name = app.config[CONFIG_NAME_INTERNAL_THEMES].active.name
+        if docname == "index":
+            source[0] += f"\n\nTheme link: {os.environ['TEST_LINKCHECK_URL']}/theme/{name}\n"
+
+    app.connect("source-read", callback_source_read)
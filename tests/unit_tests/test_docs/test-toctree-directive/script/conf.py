@@ -0,0 +1,15 @@
+"""Sphinx test configuration."""
+from sphinx_multi_theme.theme import MultiTheme, Theme
+
+exclude_patterns = ["_build"]
+extensions = ["sphinx_multi_theme.multi_theme", "conftest_fork_exit_save_child_data"]
+master_doc = "index"
+nitpicky = True
+html_theme = MultiTheme(
+    [
+        Theme("alabaster", "Primary"),
+        Theme("classic", "Secondary", subdir="theme_secondary"),
+    ]
+)
+html_sidebars = {"**": ["multi_theme_switcher.html", "searchbox.html"]}
+multi_theme_switcher = "script"
@@ -0,0 +1,578 @@
+"""Tests."""
+
+import json
+import os
+import pstats
+import re
+import shutil
+import signal
+import sys
+import time
+from pathlib import Path
+from subprocess import CalledProcessError, check_output, PIPE, Popen, STDOUT
+from typing import Dict, List, Tuple
+
+import pytest
+from bs4 import BeautifulSoup
+
+from sphinx_multi_theme.supervisor import resolve_max_parallel
+
+THEMES = ("traditional", "alabaster", "nature", "haiku")
+
+
+def build(srcdir: Path, outdir: Path, *args: str, **env_vars: str) -> str:
+    """Run sphinx-build in a subprocess and return its output."""
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", *args, srcdir, outdir]
+    env = dict(os.environ, **env_vars)
+    output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
+    return output.decode("utf8")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.parametrize("max_parallel", ["1", "3", "auto"])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test(app_params: Tuple[Dict, Dict], max_parallel: str, overlap: bool):
+    """Test."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL=max_parallel, TEST_OVERLAP_PRIMARY=str(overlap).upper())
+
+    # Each theme must be in its own directory.
+    html = BeautifulSoup((outdir / "index.html").read_text(encoding="utf8"), "html.parser")
+    assert "_static/classic.css" in [link["href"] for link in html.find_all("link", rel="stylesheet")]
+    for theme in THEMES:
+        html = BeautifulSoup((outdir / f"theme_{theme}" / "index.html").read_text(encoding="utf8"), "html.parser")
+        assert f"_static/{theme}.css" in [link["href"] for link in html.find_all("link", rel="stylesheet")]
+        assert (outdir / f"theme_{theme}" / ".doctrees" / "environment.pickle").is_file()
+
+    # Check logs.
+    assert logs.count("Entering multi-theme build mode") == 1
+    assert len(re.findall(r"Done with theme '\w+' \([\d.]+ seconds\)", logs)) == len(THEMES)
+    assert logs.count("Child process completed") == len(THEMES)
+    assert logs.count("Exiting multi-theme build mode") == 1
+    if overlap and resolve_max_parallel(max_parallel) > 1:
+        assert logs.count("Building primary theme while") == 1
+    else:
+        assert logs.count("Building primary theme while") == 0
+        assert logs.index("Exiting multi-theme build mode") < logs.index("The HTML pages are in _build/html.")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_failure(app_params: Tuple[Dict, Dict], overlap: bool):
+    """Verify siblings of a failed child are waited on."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    with pytest.raises(CalledProcessError) as exc:
+        build(srcdir, outdir, TEST_MAX_PARALLEL="4", TEST_OVERLAP_PRIMARY=str(overlap).upper(), TEST_FAIL_THEME="alabaster")
+    logs = exc.value.output.decode("utf8")
+
+    assert logs.count("Failed building theme 'alabaster'") == 1
+    assert len(re.findall(r"SphinxError: Child process \d+ failed with status 1$", logs, re.MULTILINE)) == 1
+    for theme in THEMES:
+        if theme != "alabaster":
+            assert (outdir / f"theme_{theme}" / "index.html").is_file()
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("max_parallel", ["1", "4"])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_keep_going(app_params: Tuple[Dict, Dict], max_parallel: str):
+    """Verify every failure is reported together, also when failures happen before later themes are started."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    with pytest.raises(CalledProcessError) as exc:
+        build(srcdir, outdir, TEST_MAX_PARALLEL=max_parallel, TEST_FAIL_THEME="traditional,haiku")
+    logs = exc.value.output.decode("utf8")
+
+    assert logs.count("Failed building theme 'traditional'") == 1  # First theme, before any other one is started.
+    assert logs.count("Failed building theme 'haiku'") == 1
+    failures = re.findall(r"SphinxError: 2 child processes failed: (.+)$", logs, re.MULTILINE)
+    assert len(failures) == 1
+    assert sorted(re.findall(r"'(\w+)' \(pid \d+, status 1\)", failures[0])) == ["haiku", "traditional"]
+    for theme in ("alabaster", "nature"):
+        assert (outdir / f"theme_{theme}" / "index.html").is_file()
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("ignore_sigterm", [False, True])
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_fail_fast(app_params: Tuple[Dict, Dict], tmp_path: Path, overlap: bool, ignore_sigterm: bool):
+    """Verify running siblings are terminated as soon as one child fails."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    hang_themes = ["traditional", "nature", "haiku"]
+
+    start = time.monotonic()
+    with pytest.raises(CalledProcessError) as exc:
+        build(
+            srcdir,
+            outdir,
+            TEST_MAX_PARALLEL="4",
+            TEST_OVERLAP_PRIMARY=str(overlap).upper(),
+            TEST_ON_FAILURE="fail-fast",
+            TEST_FAIL_THEME="alabaster",
+            TEST_HANG_THEMES=",".join(hang_themes),
+            TEST_IGNORE_SIGTERM=str(ignore_sigterm).upper(),
+            TEST_TERMINATE_TIMEOUT="1",
+            TEST_PID_DIR=str(tmp_path),
+        )
+    assert time.monotonic() - start < 30  # Hanging themes sleep for 60 seconds.
+    logs = exc.value.output.decode("utf8")
+
+    assert logs.count("Failed building theme 'alabaster'") == 1
+    assert sorted(re.findall(r"Cancelled building theme '(\w+)'", logs)) == sorted(hang_themes)
+    assert logs.count("Killing 3 theme build(s) ignoring SIGTERM") == (1 if ignore_sigterm else 0)
+    assert len(re.findall(r"SphinxError: Child process \d+ failed with status 1$", logs, re.MULTILINE)) == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_timeout(app_params: Tuple[Dict, Dict]):
+    """Verify a hanging theme is terminated after its timeout."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    start = time.monotonic()
+    with pytest.raises(CalledProcessError) as exc:
+        build(srcdir, outdir, TEST_MAX_PARALLEL="4", TEST_HANG_THEMES="nature", TEST_TIMEOUT="2")
+    assert time.monotonic() - start < 30  # Hanging themes sleep for 60 seconds.
+    logs = exc.value.output.decode("utf8")
+
+    assert logs.count("Theme 'nature' exceeded timeout of 2 seconds, terminating") == 1
+    assert logs.count("Failed building theme 'nature' (exceeded timeout of 2 seconds)") == 1
+    expected = r"SphinxError: Child process \d+ failed with status -15 \(exceeded timeout of 2 seconds\)$"
+    assert len(re.findall(expected, logs, re.MULTILINE)) == 1
+    for theme in ("traditional", "alabaster", "haiku"):
+        assert (outdir / f"theme_{theme}" / "index.html").is_file()
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.skipif(sys.platform == "darwin", reason="RLIMIT_AS not enforced on macOS")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_memory_limit(app_params: Tuple[Dict, Dict]):
+    """Verify a theme allocating more than its memory limit fails and the reason is reported."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    with pytest.raises(CalledProcessError) as exc:
+        build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_HOG_THEME="haiku", TEST_MEMORY_LIMIT="1024")
+    logs = exc.value.output.decode("utf8")
+
+    assert logs.count("Failed building theme 'haiku' (exceeded memory limit of 1024 MiB)") == 1
+    expected = r"SphinxError: Child process \d+ failed with status 3 \(exceeded memory limit of 1024 MiB\)$"
+    assert len(re.findall(expected, logs, re.MULTILINE)) == 1
+    for theme in ("traditional", "alabaster", "nature"):
+        assert (outdir / f"theme_{theme}" / "index.html").is_file()
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.skipif(not os.path.isfile("/proc/meminfo"), reason="Requires /proc/meminfo")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_min_free_memory(app_params: Tuple[Dict, Dict]):
+    """Verify children are started one at a time if there isn't enough memory for more."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="4", TEST_MIN_FREE_MEMORY=str(1024 * 1024 * 1024))  # 1 PiB.
+
+    assert len(re.findall(r"Waiting for memory before building theme '\w+' \(\d+ MiB short\)", logs)) == len(THEMES) - 1
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / "index.html").is_file()
+    running, peak = 0, 0
+    for line in logs.splitlines():
+        if "Changing outdir from" in line:
+            running += 1
+        elif re.search(r"Done with theme '\w+'", line):
+            running -= 1
+        peak = max(peak, running)
+    assert peak == 1
+
+
+def wait_for_pid_files(pid_dir: Path, names: List[str], timeout: float = 30) -> List[int]:
+    """Wait until children wrote their process IDs."""
+    deadline = time.monotonic() + timeout
+    while not all((pid_dir / n).is_file() for n in names):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return [int((pid_dir / n).read_text(encoding="utf8")) for n in names]
+
+
+def is_running(pid: int) -> bool:
+    """Check if a process exists and isn't a zombie (which may never be reaped inside containers)."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf8") as handle:
+            return handle.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="Requires /proc")
+@pytest.mark.parametrize("signum", [signal.SIGINT, signal.SIGKILL])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_parent_signal(app_params: Tuple[Dict, Dict], tmp_path: Path, signum: int):
+    """Verify children are terminated when the parent is interrupted (SIGINT) or dies (SIGKILL)."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+    env = dict(os.environ, TEST_MAX_PARALLEL="4", TEST_HANG_THEMES=",".join(THEMES), TEST_PID_DIR=str(tmp_path))
+
+    with Popen(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir) as proc:
+        pids = wait_for_pid_files(tmp_path, list(THEMES))
+        proc.send_signal(signum)
+        output = proc.communicate(timeout=30)[0].decode("utf8")
+    assert proc.returncode != 0
+
+    deadline = time.monotonic() + 10
+    while any(is_running(p) for p in pids):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    if signum == signal.SIGINT:
+        assert output.count("Interrupted, terminating 4 theme build(s)") == 1
+        assert sorted(re.findall(r"Cancelled building theme '(\w+)'", output)) == sorted(THEMES)
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_durations(app_params: Tuple[Dict, Dict]):
+    """Verify themes that took longest in the previous run are started first."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    durations_file = outdir / ".doctrees" / "multi_theme_durations.json"
+    durations_file.parent.mkdir(parents=True)
+    durations_file.write_text('{"theme_traditional": 1, "theme_nature": 9, "theme_haiku": 5}', encoding="utf8")
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2")
+
+    started = re.findall(r"Building docs with theme '(\w+)'", logs)
+    assert started == ["alabaster", "nature", "haiku", "traditional"]
+    assert logs.count("Theme build durations (predicted / actual):") == 1
+    assert logs.count("theme_alabaster: unknown / ") == 1
+    assert len(re.findall(r"theme_nature: 9\.00s / [\d.]+s$", logs, re.MULTILINE)) == 1
+
+    durations = json.loads(durations_file.read_text(encoding="utf8"))
+    assert sorted(durations) == ["theme_alabaster", "theme_haiku", "theme_nature", "theme_traditional"]
+    assert durations["theme_nature"] != 9
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_resources(app_params: Tuple[Dict, Dict]):
+    """Verify resource usage of every child is logged and saved."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2")
+
+    assert logs.count("Theme resource usage:") == 1
+    assert len(re.findall(r"^\S*🍴     theme +status +wall s +user s +sys s +max RSS MiB ", logs, re.MULTILINE)) == 1
+    for theme in THEMES:
+        assert len(re.findall(rf"^\S*🍴     {theme} +0 +[\d.]+ +[\d.]+ +[\d.]+ +[\d.]+ ", logs, re.MULTILINE)) == 1
+
+    resources = json.loads((outdir / ".doctrees" / "multi_theme_resources.json").read_text(encoding="utf8"))
+    assert sorted(r["subdir"] for r in resources) == [f"theme_{t}" for t in sorted(THEMES)]
+    for usage in resources:
+        assert usage["exit_status"] == 0
+        assert usage["max_rss_mib"] > 0
+        assert usage["user"] + usage["system"] > 0
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_job_slots(app_params: Tuple[Dict, Dict], overlap: bool):
+    """Verify children and the parent share the internal jobserver's slots."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    logs = build(
+        srcdir, outdir, TEST_MAX_PARALLEL="4", TEST_OVERLAP_PRIMARY=str(overlap).upper(), TEST_JOB_SLOTS="2", MAKEFLAGS=""
+    )
+
+    assert logs.count("Created jobserver with 2 job slots") == 1
+    assert len(re.findall(r"Done with theme '\w+' \([\d.]+ seconds\)", logs)) == len(THEMES)
+    assert logs.count("Exiting multi-theme build mode") == 1
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / "index.html").is_file()
+
+    # With only two slots and every child holding one at most two themes may be building at the same time.
+    running, peak = 0, 0
+    for line in logs.splitlines():
+        if "Changing outdir from" in line or "Building primary theme while" in line:
+            running += 1
+        elif re.search(r"Done with theme '\w+'|The HTML pages are in _build/html\.$", line):
+            running -= 1
+        peak = max(peak, running)
+    assert peak <= 2
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_make_jobserver(app_params: Tuple[Dict, Dict]):
+    """Verify the GNU make jobserver is used when sphinx-build runs from a make recipe."""
+    if not shutil.which("make"):
+        pytest.skip("make not installed")
+    srcdir = Path(app_params[1]["srcdir"])
+    makefile = srcdir / "Makefile"
+    makefile.write_text(f"html:\n\t+{sys.executable} -m sphinx -T -n -W -j 4 . _build/html\n", encoding="utf8")
+
+    env = dict(os.environ, TEST_MAX_PARALLEL="4")
+    env.pop("MAKEFLAGS", None)
+    output = check_output(["make", "-j3", "html"], env=env, stderr=STDOUT, cwd=srcdir)
+    logs = output.decode("utf8")
+
+    assert logs.count("Using GNU make jobserver") == 1
+    assert re.search(r"Using [1-3] of 4 parallel jobs", logs)
+    assert len(re.findall(r"Done with theme '\w+' \([\d.]+ seconds\)", logs)) == len(THEMES)
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("preload", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_preload_themes(app_params: Tuple[Dict, Dict], preload: bool):
+    """Verify theme packages are imported before forking and child startup times are logged."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_PRELOAD_THEMES=str(preload).upper())
+
+    assert logs.count("Preloaded theme modules: alabaster") == (1 if preload else 0)
+    ready = re.findall(r"Theme '(\w+)' ready [\d.]+ seconds after forking", logs)
+    assert sorted(ready) == sorted(THEMES)
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_profile_dir(app_params: Tuple[Dict, Dict], overlap: bool):
+    """Verify every theme's build is profiled, including the primary theme."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    profile_dir = srcdir / "_build" / "profiles"
+
+    logs = build(
+        srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_OVERLAP_PRIMARY=str(overlap).upper(), TEST_PROFILE_DIR="_build/profiles"
+    )
+
+    expected = ["primary.prof"] + [f"theme_{t}.prof" for t in THEMES]
+    assert sorted(p.name for p in profile_dir.iterdir()) == sorted(expected)
+    assert logs.count("Saved profile to ") == len(THEMES) + 1
+    for name, module, func_name in [("theme_alabaster", "application.py", "build"), ("primary", "__init__.py", "write")]:
+        stats = pstats.Stats(str(profile_dir / f"{name}.prof")).stats
+        assert any(os.path.basename(f[0]) == module and f[2] == func_name for f in stats)
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_skip_up_to_date(app_params: Tuple[Dict, Dict]):
+    """Verify themes are only rebuilt when their fingerprint changes."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    def built_and_skipped(**env_vars: str) -> Tuple[list, list]:
+        logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", **env_vars)
+        built = re.findall(r"Building docs with theme '(\w+)'", logs)
+        return built, re.findall(r"Skipping up-to-date theme directory 'theme_(\w+)'", logs)
+
+    built, skipped = built_and_skipped()
+    assert sorted(built) == sorted(THEMES)
+    assert not skipped
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / ".multi_theme_fingerprint").is_file()
+
+    # Nothing changed.
+    built, skipped = built_and_skipped()
+    assert not built
+    assert sorted(skipped) == sorted(THEMES)
+    assert "(rebuild with -E, -a, or -D multi_theme_force_rebuild=1)" in build(srcdir, outdir)
+
+    # Rebuilding everything from the command line.
+    for flag, reason in (("-E", "fresh environment requested (-E)"), ("-a", "writing all files requested (-a)")):
+        logs = build(srcdir, outdir, flag, TEST_MAX_PARALLEL="2")
+        assert logs.count(f"Not skipping up-to-date themes, {reason}") == 1
+        assert sorted(re.findall(r"Building docs with theme '(\w+)'", logs)) == sorted(THEMES)
+
+    # Config change affecting only one theme.
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature")
+    assert built == ["nature"]
+    assert sorted(skipped) == sorted(set(THEMES) - {"nature"})
+
+    # Forced.
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature", TEST_FORCE_REBUILD="TRUE")
+    assert sorted(built) == sorted(THEMES)
+    assert not skipped
+
+    # Source file changed.
+    (srcdir / "index.rst").write_text((srcdir / "index.rst").read_text(encoding="utf8") + "\nMore.\n", encoding="utf8")
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature")
+    assert sorted(built) == sorted(THEMES)
+    assert not skipped
+
+    # File outside the source directory included by a document (like autodoc'd modules).
+    outside = srcdir.parent / f"{srcdir.name}-include.txt"
+    outside.write_text("Included.\n", encoding="utf8")
+    index_rst = srcdir / "index.rst"
+    index_rst.write_text(index_rst.read_text(encoding="utf8") + f"\n.. include:: ../{outside.name}\n", encoding="utf8")
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature")
+    assert sorted(built) == sorted(THEMES)
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature")
+    assert not built
+    outside.write_text("Included and changed.\n", encoding="utf8")
+    built, skipped = built_and_skipped(TEST_TITLE_NATURE="Nature")
+    assert sorted(built) == sorted(THEMES)
+    assert not skipped
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_deduplicate(app_params: Tuple[Dict, Dict]):
+    """Verify identical files across themes are linked and unlinked again before the next build."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    manifest = outdir / ".doctrees" / "multi_theme_deduplicated.json"
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_DEDUPLICATE="TRUE")
+
+    assert re.search(r"Deduplicated files, saved [\d.]+ MiB \(\d+ bytes\)", logs)
+    assert logs.index("Deduplicated files") > logs.index("Exiting multi-theme build mode")
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / "_static" / "jquery.js").samefile(outdir / "_static" / "jquery.js")
+        assert not (outdir / f"theme_{theme}" / "index.html").samefile(outdir / "index.html")
+    assert "theme_nature/_static/jquery.js" in json.loads(manifest.read_text(encoding="utf8"))
+
+    # Rebuild with all themes skipped, links must be undone first.
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2")
+
+    assert re.search(r"Restored \d+ deduplicated files", logs)
+    assert logs.count("Skipping up-to-date theme") == len(THEMES)
+    assert not manifest.exists()
+    for theme in THEMES:
+        assert not (outdir / f"theme_{theme}" / "_static" / "jquery.js").samefile(outdir / "_static" / "jquery.js")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_shard(app_params: Tuple[Dict, Dict]):
+    """Verify merged shards have the same files as building all themes on one machine."""
+    srcdir = Path(app_params[1]["srcdir"])
+    build(srcdir, srcdir / "_build" / "full")
+    full = sorted(str(p.relative_to(srcdir / "_build" / "full")) for p in (srcdir / "_build" / "full").rglob("[!.]*"))
+
+    shards = []
+    for number in (1, 2, 3):
+        shards.append(str(srcdir / "_build" / f"shard{number}"))
+        logs = build(srcdir, Path(shards[-1]), MULTI_THEME_SHARD=f"{number}/3")
+        assert logs.count("Child process completed") == len([t for i, t in enumerate(THEMES, 1) if i % 3 + 1 == number])
+        assert logs.count("built by shard") == len(THEMES) - logs.count("Child process completed")
+
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx_multi_theme", "merge", str(outdir)]
+    output = check_output(cmd + shards, stderr=STDOUT).decode("utf8")
+    assert output.count("Merged") == len(THEMES) + 1
+    assert sorted(str(p.relative_to(outdir)) for p in outdir.rglob("[!.]*") if ".doctrees" not in p.parts) == [
+        p for p in full if ".doctrees" not in Path(p).parts
+    ]
+
+    # Missing and duplicated shards.
+    with pytest.raises(CalledProcessError) as exc:
+        check_output(cmd + shards[:2] + shards[:1], stderr=STDOUT)
+    assert "Shards missing: [3], duplicated: [1] (of 3)" in exc.value.output.decode("utf8")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_output_manifest(app_params: Tuple[Dict, Dict]):
+    """Verify the manifest covers every theme's files, including shared and deduplicated ones."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    shared = ["searchindex.js", "objects.inv", "_images/logo.svg", "_sources/index.rst.txt", "_sources/other.rst.txt"]
+
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_DEDUPLICATE="TRUE", TEST_OUTPUT_MANIFEST="_build/files.ndjson")
+
+    lines = (srcdir / "_build" / "files.ndjson").read_text(encoding="utf8").splitlines()
+    entries = {e["path"]: e for e in (json.loads(line) for line in lines)}
+    assert re.search(rf"Wrote output manifest of {len(entries)} files to ", logs)
+    assert logs.index("Wrote output manifest") > logs.index("Exiting multi-theme build mode")
+    for message in ("Copied search index", "Linked ", "Deduplicated "):
+        assert logs.index("Wrote output manifest") > logs.index(message)
+    assert entries["index.html"]["theme"] == "classic"
+    for theme in THEMES:
+        assert entries[f"theme_{theme}/index.html"]["theme"] == theme
+        assert entries[f"theme_{theme}/_static/jquery.js"]["sha256"] == entries["_static/jquery.js"]["sha256"]
+        for rel in shared:
+            assert entries[f"theme_{theme}/{rel}"]["sha256"] == entries[rel]["sha256"]
+    for path, entry in entries.items():  # Stats taken after deduplication relinked files.
+        assert (entry["size"], entry["mtime"]) == ((outdir / path).stat().st_size, (outdir / path).stat().st_mtime)
+    assert not [p for p in entries if ".doctrees" in p or p.endswith(".multi_theme_fingerprint")]
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_search_index(app_params: Tuple[Dict, Dict], overlap: bool):
+    """Verify children reuse the primary theme's search index unless their theme opted out."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+
+    logs = build(
+        srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_OVERLAP_PRIMARY=str(overlap).upper(), TEST_OWN_SEARCH_INDEX="nature"
+    )
+
+    assert logs.count("Reusing the primary theme's search index") == len(THEMES) - 1
+    assert "[nature] 🍴 Reusing the primary theme's search index" not in logs
+    assert logs.count("Copied search index into 3 secondary themes") == 1
+    assert logs.index("Copied search index") > logs.index("Exiting multi-theme build mode")
+    primary = (outdir / "searchindex.js").read_text(encoding="utf8")
+    assert "other" in primary
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / "searchindex.js").read_text(encoding="utf8") == primary
+        assert not (outdir / f"theme_{theme}" / "searchindex.js.tmp").exists()
+
+    # Copying the index must not make themes look changed on the next build.
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_OWN_SEARCH_INDEX="nature")
+    assert logs.count("Skipping up-to-date theme") == len(THEMES)
+    assert logs.count("Copied search index into 0 secondary themes") == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("deduplicate", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test_artifacts(app_params: Tuple[Dict, Dict], deduplicate: bool):
+    """Verify children link images, downloads, sources, and objects.inv written by the parent unless they opted out."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    shared = ["objects.inv", "_images/logo.svg", "_sources/index.rst.txt", "_sources/other.rst.txt"]
+
+    env_vars = {"TEST_MAX_PARALLEL": "2", "TEST_OWN_ARTIFACTS": "haiku", "TEST_DEDUPLICATE": str(deduplicate).upper()}
+    logs = build(srcdir, outdir, **env_vars)
+
+    shared.append(str(next(outdir.glob("_downloads/*/data.txt")).relative_to(outdir)))
+    assert logs.count("Reusing the primary theme's images, downloads, sources, and inventory") == len(THEMES) - 1
+    assert logs.count(f"Linked {len(shared) * (len(THEMES) - 1)} shared files into 3 secondary themes") == 1
+    for theme in THEMES:
+        html = (outdir / f"theme_{theme}" / "other.html").read_text(encoding="utf8")
+        assert 'src="_images/logo.svg"' in html
+        assert "_downloads/" in html
+        for rel in shared:
+            assert (outdir / f"theme_{theme}" / rel).read_bytes() == (outdir / rel).read_bytes()
+            assert (outdir / f"theme_{theme}" / rel).samefile(outdir / rel) is (theme != "haiku" or deduplicate)
+
+    # Rebuilding must skip every theme and link the files again after copying them so Sphinx can't write through links.
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_OWN_ARTIFACTS="haiku")
+    assert logs.count("Skipping up-to-date theme") == len(THEMES)
+    assert logs.count(f"Restored {len(shared) * (len(THEMES) - 1)} shared files") == 1
+    assert logs.count(f"Linked {len(shared) * (len(THEMES) - 1)} shared files into 3 secondary themes") == 1
+    assert (outdir / "theme_nature" / "objects.inv").samefile(outdir / "objects.inv")
+
+    # Opting out later must write the theme's own files instead of writing through links into other themes.
+    logs = build(srcdir, outdir, TEST_MAX_PARALLEL="2", TEST_OWN_ARTIFACTS="haiku,nature")
+    assert logs.count(f"Linked {len(shared) * 2} shared files into 2 secondary themes") == 1
+    for rel in shared:
+        assert not (outdir / "theme_nature" / rel).samefile(outdir / rel)
+        assert os.stat(outdir / rel).st_nlink == 3  # Primary theme, traditional, and alabaster.
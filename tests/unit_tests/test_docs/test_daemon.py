@@ -0,0 +1,108 @@
+"""Tests."""
+
+import json
+import os
+import socket
+import stat
+import sys
+import time
+from pathlib import Path
+from subprocess import PIPE, Popen, run, STDOUT
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+from sphinx_multi_theme.daemon import send_request
+
+THEMES = ("traditional", "alabaster", "nature", "haiku")
+
+
+def wait_for_socket(socket_path: str, daemon: Popen, log: Path):
+    """Wait until the daemon is warmed up and listening."""
+    deadline = time.monotonic() + 30
+    while not os.path.exists(socket_path):
+        assert daemon.poll() is None, log.read_text(encoding="utf8")
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def send_raw(socket_path: str, request: bytes, read: bool = True) -> Dict:
+    """Send a request as is, optionally disconnecting without reading the response."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=no-member
+    client.connect(socket_path)
+    with client, client.makefile("rwb") as stream:
+        stream.write(request)
+        stream.flush()
+        return json.loads(stream.readline().decode("utf8")) if read else {}
+
+
+def report_cold_and_warm(socket_path: str, sphinx_args: List[str], env: Dict[str, str], record_property: Callable):
+    """Time the same build in a fresh sphinx-build process and forked from the daemon, and report both."""
+    start = time.monotonic()
+    run([sys.executable, "-m", "sphinx", *sphinx_args], env=env, stdout=PIPE, stderr=STDOUT, check=True)
+    cold = time.monotonic() - start
+    start = time.monotonic()
+    assert send_request(socket_path, "build")["status"] == 0
+    warm = time.monotonic() - start
+    record_property("cold_seconds", cold)
+    record_property("warm_seconds", warm)
+    print(f"Incremental build: cold sphinx-build {cold:.2f}s, warm daemon {warm:.2f}s")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="concurrent")
+def test(app_params: Tuple[Dict, Dict], tmp_path: Path, record_property: Callable):
+    """Verify builds requested from the daemon report every theme and pass the exit status through."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    socket_path = str(tmp_path / "daemon.sock")
+    env = dict(os.environ, TEST_MAX_PARALLEL="2")
+    sphinx_args = ["-T", "-n", "-W", str(srcdir), str(outdir)]
+
+    cmd = [sys.executable, "-m", "sphinx_multi_theme", "serve-builds", socket_path, "--", *sphinx_args]
+    log = tmp_path / "daemon.log"
+    with log.open("wb") as handle, Popen(cmd, env=env, stdout=handle, stderr=STDOUT, cwd=srcdir) as daemon:
+        try:
+            wait_for_socket(socket_path, daemon, log)
+            assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+            assert send_request(socket_path, "ping")["pid"] == daemon.pid
+            assert "Unknown command" in send_request(socket_path, "rebuild")["error"]
+            response = send_raw(socket_path, b'{"command": "build", "args": 5}\n')
+            assert response["error"] == "Invalid request: args must be a list, not int"
+
+            # First build.
+            response = send_request(socket_path, "build")
+            assert response["status"] == 0
+            assert sorted(t["name"] for t in response["themes"]) == sorted(THEMES + ("classic",))
+            assert all(t["status"] == "built" and t["exit_status"] == 0 for t in response["themes"])
+            assert [t["name"] for t in response["themes"] if not t["subdir"]] == ["classic"]
+            assert (outdir / "theme_haiku" / "index.html").is_file()
+
+            # Incremental build, forked from the daemon (its output goes to the daemon's log).
+            response = send_request(socket_path, "build")
+            assert response["status"] == 0
+            assert sorted(t["name"] for t in response["themes"] if t["status"] == "skipped") == sorted(THEMES)
+            assert log.read_text(encoding="utf8").count("Skipping up-to-date theme") == len(THEMES)
+
+            # Cold versus warm incremental build, reported instead of compared since timings are noisy on busy machines.
+            report_cold_and_warm(socket_path, sphinx_args, env, record_property)
+
+            # Clients disconnecting before the response don't stop the daemon.
+            send_raw(socket_path, b'{"command": "build"}\n', read=False)
+            assert send_request(socket_path, "ping")["pid"] == daemon.pid
+            assert "Could not answer build request" in log.read_text(encoding="utf8")
+
+            # Failed themes, with extra arguments appended to the daemon's.
+            (srcdir / "broken.rst").write_text("Broken\n======\n\n:ref:`missing`\n", encoding="utf8")
+            response = send_request(socket_path, "build", ["-E"])
+            assert response["status"] != 0
+            assert "failed" in {t["status"] for t in response["themes"]}
+            client = [sys.executable, "-m", "sphinx_multi_theme", "request-build", socket_path, "--", "-E"]
+            assert run(client, stdout=PIPE, stderr=STDOUT, check=False).returncode == response["status"]
+
+            send_request(socket_path, "stop")
+            assert daemon.wait(timeout=30) == 0
+            assert not os.path.exists(socket_path)
+        finally:
+            if daemon.poll() is None:
+                daemon.kill()
@@ -46,9 +46,11 @@ def test_exit_code(app_params: Tuple[Dict, Dict], fail: bool):
     logs = output.decode("utf8").strip()
     lines = logs.splitlines()
     if fail:
-        assert lines.count("Sphinx error:") == 2  # One in child logs another in the parent logs.
-        assert lines.count("TEST_EXIT_STATUS_CAUSE_EXC") == 1  # Only in the child.
-        assert len(re.findall(r"SphinxError: Child process \d+ failed with status 2$", logs, re.MULTILINE)) == 1  # Parent.
+        assert lines.count("Sphinx error:") == 3  # One in each child's logs another in the parent logs.
+        assert lines.count("TEST_EXIT_STATUS_CAUSE_EXC") == 2  # Only in the children, both built despite the failure.
+        failures = re.findall(r"SphinxError: 2 child processes failed: (.+)$", logs, re.MULTILINE)  # Parent.
+        assert len(failures) == 1
+        assert sorted(re.findall(r"'(\w+)' \(pid \d+, status 2\)", failures[0])) == ["alabaster", "traditional"]
         assert not os.path.isfile(os.path.join(outdir, "index.html"))
     else:
         assert lines.count("Sphinx error:") == 0
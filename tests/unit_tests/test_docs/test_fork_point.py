@@ -0,0 +1,183 @@
+"""Tests."""
+import os
+import re
+import sys
+from io import StringIO
+from pathlib import Path
+from subprocess import check_output, STDOUT
+from typing import Dict, Tuple
+
+import pytest
+from bs4 import BeautifulSoup
+from sphinx.testing.util import SphinxTestApp
+
+from sphinx_multi_theme.utils import ENV_VERSION
+
+THEMES = {"": "classic", "theme_traditional": "traditional", "theme_alabaster": "alabaster"}
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test(sphinx_app: SphinxTestApp, outdir: Path, status: StringIO):
+    """Test."""
+    for subdir, theme in THEMES.items():
+        # Stylesheets.
+        html = BeautifulSoup((outdir / subdir / "other.html").read_text(encoding="utf8"), "html.parser")
+        stylesheets = [link["href"] for link in html.find_all("link", rel="stylesheet")]
+        assert f"_static/{theme}.css" in stylesheets
+
+        # Links to other themes.
+        html = BeautifulSoup((outdir / subdir / "index.html").read_text(encoding="utf8"), "html.parser")
+        wrapper = html.find_all("div", ["toctree-wrapper"])[1]
+        hrefs = [a["href"] for a in wrapper.find_all("a")]
+        if not subdir:
+            assert hrefs == ["#", "theme_traditional/index.html", "theme_alabaster/index.html"]
+        elif subdir == "theme_traditional":
+            assert hrefs == ["../index.html", "#", "../theme_alabaster/index.html"]
+        else:
+            assert hrefs == ["../index.html", "../theme_traditional/index.html", "#"]
+
+        # Children only keep a pickled environment, doctrees are read from the parent's doctreedir.
+        doctreedir = Path(sphinx_app.doctreedir) / subdir
+        doctrees = sorted(p.name for p in doctreedir.iterdir() if p.is_file())
+        if subdir:
+            assert doctrees == ["environment.pickle"]
+        else:
+            assert doctrees == [
+                "environment.pickle",
+                "index.doctree",
+                "multi_theme_durations.json",
+                "multi_theme_resources.json",
+                "multi_theme_shared.json",
+                "other.doctree",
+            ]
+
+    assert sphinx_app.env.version["sphinx_multi_theme.multi_theme"] == ENV_VERSION
+
+    logs = re.sub(r"\x1b\[[0-9;]+m", "", status.getvalue())
+    assert logs.count("Deferring multi-theme build mode until after reading sources") == 1
+    assert logs.count("reading sources... [100%] other") == 1
+    assert logs.count("writing output... [100%] other") == 3
+    for theme in THEMES.values():
+        expected = f"callback(): pagename='other', html_theme='{theme}', context={{'html_theme': '{theme}'}}"
+        assert logs.count(expected) == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test_same_output(app_params: Tuple[Dict, Dict]):
+    """Verify forking after reading sources writes the same HTML as forking during config-inited."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outputs = {}
+    for fork_point in ("config-inited", "env-updated"):
+        outdir = srcdir / "_build" / fork_point
+        cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+        env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE", TEST_FORK_POINT=fork_point)
+        check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
+        outputs[fork_point] = {p.relative_to(outdir): p.read_bytes() for p in outdir.glob("**/*.html")}
+
+    assert len(outputs["config-inited"]) == 12
+    assert outputs["config-inited"] == outputs["env-updated"]
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("fork_point", ["config-inited", "env-updated"])
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test_theme_extension(app_params: Tuple[Dict, Dict], fork_point: str):
+    """Verify a secondary theme's own extension sets up the forked builder, also when forked after reading sources."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+    env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE", TEST_FORK_POINT=fork_point, TEST_NUM_THEMES="5")
+    check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
+
+    for subdir in ("", "theme_nature", "theme_multi_theme_test_theme"):
+        html = BeautifulSoup((outdir / subdir / "index.html").read_text(encoding="utf8"), "html.parser")
+        scripts = [script["src"] for script in html.find_all("script", src=True)]
+        assert "_static/documentation_options.js" in scripts
+        assert ("_static/multi_theme_test_theme.js" in scripts) is (subdir == "theme_multi_theme_test_theme")
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", testroot="fork-point")
+def test_incremental(app_params: Tuple[Dict, Dict]):
+    """Verify a deleted theme directory is written again even though no sources changed."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+    env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE")
+    check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
+
+    for path in (outdir / "theme_alabaster").glob("*.html"):
+        path.unlink()
+    output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir).decode("utf8")
+
+    assert (outdir / "theme_alabaster" / "index.html").is_file()
+    assert (outdir / "theme_alabaster" / "other.html").is_file()
+    assert output.count("reading sources...") == 0
+    assert output.count("The HTML pages are in _build/html/theme_alabaster.") == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test_skip_up_to_date(app_params: Tuple[Dict, Dict]):
+    """Verify themes are not skipped when documents were read for reasons fingerprints don't cover."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+    env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE")
+    check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
+
+    output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir).decode("utf8")
+    assert output.count("Skipping up-to-date theme") == 2
+
+    output = check_output(cmd, env=dict(env, TEST_OUTDATED="other"), stderr=STDOUT, cwd=srcdir).decode("utf8")
+    assert output.count("Not skipping up-to-date themes, 1 documents were read") == 1
+    assert output.count("Skipping up-to-date theme") == 0
+    assert output.count("Building docs with theme") == 2
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("shared", [False, True])
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test_shared_doctrees(app_params: Tuple[Dict, Dict], shared: bool):
+    """Verify total doctree bytes stop scaling with the number of themes when doctrees are shared."""
+    srcdir = Path(app_params[1]["srcdir"])
+    with (srcdir / "index.rst").open("a", encoding="utf8") as index_rst:
+        index_rst.write("\n.. toctree::\n\n")
+        for idx in range(30):
+            doc_rst = srcdir / f"doc{idx:03}.rst"
+            doc_rst.write_text(f"======\nDoc{idx:03}\n======\n\n" + "Generated paragraph.\n\n" * 50, encoding="utf8")
+            index_rst.write(f"    doc{idx:03}\n")
+
+    doctree_bytes = {}
+    for num_themes in (2, 4):
+        outdir = srcdir / "_build" / str(num_themes)
+        cmd = [sys.executable, "-m", "sphinx", "-T", "-n", "-W", srcdir, outdir]
+        env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE", TEST_NUM_THEMES=str(num_themes))
+        if shared:
+            env["TEST_SHARED_DOCTREES"] = "TRUE"
+        output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir).decode("utf8")
+        assert output.count("Sharing doctreedir") == (num_themes - 1 if shared else 0)
+        doctrees = [p for p in outdir.glob("**/.doctrees/**/*") if p.is_file() and p.suffix != ".json"]  # Not bookkeeping.
+        doctree_bytes[num_themes] = sum(p.stat().st_size for p in doctrees)
+
+    if shared:
+        assert doctree_bytes[4] < doctree_bytes[2] * 1.01
+    else:
+        assert doctree_bytes[4] > doctree_bytes[2] * 1.1  # One pickled environment per theme.
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="fork-point")
+def test_shared_doctrees_ignored(app_params: Tuple[Dict, Dict]):
+    """Verify shared doctrees are not used when forking before reading sources."""
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "html"
+    cmd = [sys.executable, "-m", "sphinx", "-T", "-n", srcdir, outdir]
+    env = dict(os.environ, TEST_IN_SUBPROCESS="TRUE", TEST_FORK_POINT="config-inited", TEST_SHARED_DOCTREES="TRUE")
+    output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir).decode("utf8")
+
+    expected = "WARNING: Ignoring multi_theme_shared_doctrees, only supported with multi_theme_fork_point = 'env-updated'"
+    assert output.count(expected) == 1
+    assert (outdir / "theme_alabaster" / ".doctrees" / "index.doctree").is_file()
@@ -0,0 +1,141 @@
+"""Tests."""
+
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from subprocess import PIPE, run, STDOUT
+from typing import Dict, Iterator, Tuple
+
+import pytest
+
+THEMES = ("traditional", "alabaster")  # Secondary themes, classic is the primary theme.
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answer every link with 200 except /broken, and count requests per path."""
+
+    requests: Counter = Counter()
+
+    def do_HEAD(self):  # noqa: N802 pylint: disable=invalid-name
+        """Respond to HEAD requests."""
+        self.requests[self.path] += 1
+        self.send_response(404 if self.path == "/broken" else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD  # noqa: N815
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
+
+
+@pytest.fixture(name="server")
+def fixture_server() -> Iterator[Tuple[str, Counter]]:
+    """Local HTTP server standing in for external links."""
+    Handler.requests = Counter()
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", Handler.requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("overlap", [False, True])
+@pytest.mark.sphinx("linkcheck", freshenv=True, testroot="linkcheck")
+def test_once(app_params: Tuple[Dict, Dict], server: Tuple[str, Counter], overlap: bool):
+    """Each unique link is checked once and reported once for all themes."""
+    url, requests = server
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "linkcheck"
+
+    env = dict(os.environ, TEST_LINKCHECK_URL=url, TEST_OVERLAP_PRIMARY=str(overlap).upper())
+    cmd = [sys.executable, "-m", "sphinx", "-b", "linkcheck", "-T", "-n", srcdir, outdir]
+    result = run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False)
+    logs = result.stdout.decode("utf8")
+    assert result.returncode == 1, logs  # Broken link.
+
+    assert logs.count("Checking 5 links once for 3 themes (2 only found in secondary themes)") == 1
+    assert requests["/shared"] == 1
+    assert requests["/theme/classic"] == 1
+    for theme in THEMES:
+        assert requests[f"/theme/{theme}"] == 1
+        assert not (outdir / f"theme_{theme}" / "output.txt").exists()
+        assert (outdir / f"theme_{theme}" / "multi_theme_links.json").is_file()  # Reused when skipped.
+
+    output = (outdir / "output.txt").read_text(encoding="utf8")
+    assert output.count("[broken]") == 1
+    assert "/theme/alabaster" not in output  # Only failures are written to output.txt.
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("linkcheck", freshenv=True, testroot="linkcheck")
+def test_skip_up_to_date(app_params: Tuple[Dict, Dict], server: Tuple[str, Counter]):
+    """Links of secondary themes skipped as up-to-date are still checked."""
+    url, requests = server
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "linkcheck"
+
+    env = dict(os.environ, TEST_LINKCHECK_URL=url)
+    cmd = [sys.executable, "-m", "sphinx", "-b", "linkcheck", "-T", "-n", srcdir, outdir]
+    run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False)
+    requests.clear()
+    logs = run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False).stdout.decode("utf8")
+
+    assert logs.count("Skipping up-to-date theme") == len(THEMES)
+    assert logs.count("Checking 5 links once for 3 themes (2 only found in secondary themes)") == 1
+    for theme in THEMES:
+        assert requests[f"/theme/{theme}"] == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("linkcheck", freshenv=True, testroot="linkcheck")
+def test_per_theme(app_params: Tuple[Dict, Dict], server: Tuple[str, Counter]):
+    """Opt out: every theme checks and reports its own links."""
+    url, requests = server
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "linkcheck"
+
+    env = dict(os.environ, TEST_LINKCHECK_URL=url, TEST_LINKCHECK="per-theme")
+    cmd = [sys.executable, "-m", "sphinx", "-b", "linkcheck", "-T", "-n", srcdir, outdir]
+    result = run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False)
+    logs = result.stdout.decode("utf8")
+
+    assert "links once" not in logs
+    assert requests["/shared"] == len(THEMES) + 1
+    for theme in THEMES:
+        assert (outdir / f"theme_{theme}" / "output.txt").read_text(encoding="utf8").count("[broken]") == 1
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.parametrize("mode", ["once", "per-theme"])
+@pytest.mark.sphinx("linkcheck", freshenv=True, testroot="linkcheck")
+def test_cache(app_params: Tuple[Dict, Dict], server: Tuple[str, Counter], mode: str):
+    """Working links are only checked by the first build, broken links are checked every time."""
+    url, requests = server
+    srcdir = Path(app_params[1]["srcdir"])
+    outdir = srcdir / "_build" / "linkcheck"
+    cache = srcdir / "_cache" / "links.sqlite"
+
+    env = dict(os.environ, TEST_LINKCHECK_URL=url, TEST_LINKCHECK=mode, TEST_LINKCHECK_CACHE="_cache/links.sqlite")
+    cmd = [sys.executable, "-m", "sphinx", "-b", "linkcheck", "-E", "-T", "-n", srcdir, outdir]
+    logs_first = run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False).stdout.decode("utf8")
+    assert cache.is_file()
+    first = Counter(requests)
+    requests.clear()
+    logs_second = run(cmd, env=env, stdout=PIPE, stderr=STDOUT, cwd=srcdir, check=False).stdout.decode("utf8")
+
+    # Forked processes checking links per theme share one cache but may all miss it during the first build.
+    assert first["/shared"] >= 1
+    assert set(requests) == {"/broken"}
+    if mode == "once":
+        assert logs_first.count("Linkcheck cache: 0 hits, 5 misses") == 1
+        assert logs_second.count("Linkcheck cache: 4 hits, 1 misses") == 1
+    else:
+        assert logs_second.count("Linkcheck cache: 2 hits, 1 misses") == len(THEMES) + 1
+    output = (outdir / "output.txt").read_text(encoding="utf8")
+    assert output.count("[broken]") == 1
@@ -42,11 +42,11 @@ def test_logs(status: StringIO):
     assert logs.count("Exiting multi-theme build mode") == 1
 
     # Test is_child flag.
-    matches = re.findall(r"(\w+ multi-theme|^callback.+$)", logs, re.MULTILINE)
+    matches = re.findall(r"(\w+ multi-theme|^(?:\[\w+\] )?callback.+$)", logs, re.MULTILINE)
     expected = [
         "Entering multi-theme",
-        "callback(): html_theme='traditional', is_child=True",
-        "callback(): html_theme='alabaster', is_child=True",
+        "[traditional] callback(): html_theme='traditional', is_child=True",
+        "[alabaster] callback(): html_theme='alabaster', is_child=True",
         "Exiting multi-theme",
         "callback(): html_theme='classic', is_child=False",
     ]
@@ -102,7 +102,7 @@ def test_dir_change(tmp_path: Path, app_params: Tuple[Dict, Dict], relative_src:
         cmd += ["." if relative_src else srcdir, outdir.relative_to(srcdir) if relative_out else outdir]
         output = check_output(cmd, env=env, stderr=STDOUT, cwd=srcdir)
         logs = output.decode("utf8").strip()
-        return logs.splitlines()
+        return [re.sub(r"^\[\w+\] ", "", line) for line in logs.splitlines()]  # Remove child theme name prefixes.
 
     # Immediate parent (no -d).
     lines = run()
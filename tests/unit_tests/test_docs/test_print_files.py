@@ -1,5 +1,6 @@
 """Tests."""
 import os
+import re
 import sys
 from io import StringIO
 from subprocess import CalledProcessError, check_output, STDOUT
@@ -24,9 +25,12 @@ def test(sphinx_app: SphinxTestApp, status: StringIO, testroot: str):
     if testroot.endswith("off"):
         assert lines.count(f"|-_static{os.sep}") == 0
         assert lines.count("|-index.html") == 0
+        assert not re.search(r"Theme 'classic': \d+ files", logs)
     else:
         assert lines.count(f"|-_static{os.sep}") == 1
         assert lines.count("|-index.html") == 1
+        assert re.search(r"Theme 'classic': \d+ files, [\d.]+ MiB", logs)
+        assert len(re.findall(r"^🍴     +[\d.]+ KiB  \S+$", logs, re.MULTILINE)) == 3
 
 
 @pytest.mark.parametrize("fail", [False, True])
@@ -10,7 +10,7 @@ from _pytest.monkeypatch import MonkeyPatch
 from sphinx.testing.util import SphinxTestApp
 
 from sphinx_multi_theme.theme import MultiTheme
-from sphinx_multi_theme.utils import CONFIG_NAME_INTERNAL_THEMES
+from sphinx_multi_theme.utils import CONFIG_NAME_INTERNAL_THEMES, ENV_VERSION
 
 EXPECTED_NUM_FILES = 23
 IGNORE = DEFAULT_IGNORES + [".buildinfo"]
@@ -80,6 +80,11 @@ def test(sphinx_app: SphinxTestApp, outdir: Path, warning: StringIO, testroot: s
         idx = None
     if idx is not None:
         outdir_off = Path(*(parts[:idx] + ("off",) + parts[idx + 1 :]))  # noqa
+        # The only expected difference: the extension's env version is recorded in the search index.
+        searchindex = outdir / "searchindex.js"
+        content = searchindex.read_text(encoding="utf8")
+        assert f'"sphinx_multi_theme.multi_theme":{ENV_VERSION},' in content
+        searchindex.write_text(content.replace(f'"sphinx_multi_theme.multi_theme":{ENV_VERSION},', ""), encoding="utf8")
         assert directory_compare(outdir, outdir_off) == EXPECTED_NUM_FILES
 
     # Check warnings.
@@ -1,4 +1,5 @@
 """Tests."""
+import json
 import os
 import sys
 from io import StringIO
@@ -144,8 +145,7 @@ def test_linkcheck(app_params: Tuple[Dict, Dict]):
 
     output_primary = outdir / "output.txt"
     assert output_primary.stat().st_size == 0
-    output_secondary = outdir / "theme_secondary" / "output.txt"
-    assert output_secondary.stat().st_size == 0
+    assert not (outdir / "theme_secondary" / "output.txt").exists()  # Links of all themes are checked once.
 
 
 @pytest.mark.usefixtures("skip_if_no_fork")
@@ -173,3 +173,34 @@ def test_incomplete(warning: StringIO):
     warnings = warning.getvalue().strip()
     assert "Sphinx config value for `html_theme` not a MultiTheme instance" in warnings
     assert "Extension not fully initialized: no multi-themes specified" in warnings
+
+
+@pytest.mark.usefixtures("skip_if_no_fork")
+@pytest.mark.sphinx("html", freshenv=True, testroot="toctree-directive/script")
+def test_script(outdir: Path):
+    """Verify pages only contain placeholders and each theme's output has the theme map."""
+    for subdir, active in (("", ""), ("theme_secondary", "theme_secondary")):
+        theme_outdir = outdir / subdir
+        map_js = (theme_outdir / "_static" / "multi_theme_switcher_map.js").read_text(encoding="utf8")
+        assert map_js.startswith("window.multiThemeSwitcherMap = ")
+        assert json.loads(map_js.split(" = ", 1)[1].rstrip(";\n")) == {
+            "active": active,
+            "themes": [
+                {"name": "alabaster", "text": "Primary", "subdir": ""},
+                {"name": "classic", "text": "Secondary", "subdir": "theme_secondary"},
+            ],
+        }
+        assert (theme_outdir / "_static" / "multi_theme_switcher.js").is_file()
+
+        for page, static in (("index.html", "_static"), ("other.html", "_static"), ("sub/page.html", "../_static")):
+            html = BeautifulSoup((theme_outdir / page).read_text(encoding="utf8"), "html.parser")
+            scripts = [s["src"] for s in html.find_all("script", defer=True)]
+            assert scripts[-2:] == [f"{static}/multi_theme_switcher_map.js", f"{static}/multi_theme_switcher.js"]
+            assert not html.find("a", string="Secondary")
+            placeholders = html.find_all("div", ["multi-theme-switcher"])
+            assert len(placeholders) == (2 if page == "index.html" else 1)  # Directive and sidebar template.
+            assert not placeholders[-1].contents
+
+        html = BeautifulSoup((theme_outdir / "index.html").read_text(encoding="utf8"), "html.parser")
+        directive = html.find("div", attrs={"class": "multi-theme-switcher", "data-reversed": True})
+        assert directive.find("span", ["caption-text"]).text == "MultiTheme"
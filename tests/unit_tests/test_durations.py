@@ -0,0 +1,39 @@
+"""Tests."""
+from pathlib import Path
+
+from sphinx_multi_theme.supervisor import load_durations, save_durations, Supervisor
+from sphinx_multi_theme.theme import MultiTheme
+
+
+def test_load_save(tmp_path: Path):
+    """Test."""
+    path = tmp_path / "a" / "durations.json"
+    assert load_durations(str(path)) == {}
+
+    save_durations(str(path), {"theme_b": 1.5, "theme_c": 3})
+    assert load_durations(str(path)) == {"theme_b": 1.5, "theme_c": 3.0}
+
+    path.write_text('{"theme_b": "invalid", "theme_c": 2}', encoding="utf8")
+    assert load_durations(str(path)) == {"theme_c": 2.0}
+
+    path.write_text("[1, 2]", encoding="utf8")
+    assert load_durations(str(path)) == {}
+
+    path.write_text("{", encoding="utf8")
+    assert load_durations(str(path)) == {}
+
+
+def test_schedule(tmp_path: Path):
+    """Test."""
+    themes = MultiTheme(["a", "b", "c", "d", "e"]).themes
+    path = tmp_path / "durations.json"
+    save_durations(str(path), {"theme_b": 1.0, "theme_c": 5.0, "theme_d": 3.0})
+
+    # Serial builds keep the user's order.
+    assert Supervisor(None, 1, str(path)).schedule(themes) == [1, 2, 3, 4]
+
+    # Unknown durations first, then longest first.
+    assert Supervisor(None, 2, str(path)).schedule(themes) == [4, 2, 3, 1]
+
+    # No history.
+    assert Supervisor(None, 2).schedule(themes) == [1, 2, 3, 4]
@@ -0,0 +1,27 @@
+"""Tests."""
+from pathlib import Path
+
+from sphinx.util.matching import Matcher
+
+from sphinx_multi_theme.fingerprint import iter_file_stats
+
+
+def test(tmp_path: Path):
+    """Test."""
+    for name in (
+        "index.rst",
+        "sub/other.rst",
+        ".git/HEAD",
+        "_build/html/index.html",
+        "excluded/file.rst",
+        "out/x.html",
+        "sub/.multi_theme_fingerprint",
+        "sub/__pycache__/conf.cpython-39.pyc",
+    ):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(name, encoding="utf8")
+
+    stats = list(iter_file_stats(str(tmp_path), Matcher(["_build", "excluded"]), str(tmp_path / "out")))
+
+    assert [s[0] for s in stats] == ["index.rst", "sub/other.rst"]
+    assert stats[0][2] == len("index.rst")
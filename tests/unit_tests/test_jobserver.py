@@ -0,0 +1,96 @@
+"""Tests."""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from sphinx_multi_theme.jobserver import JobServer, parse_makeflags
+
+
+@pytest.mark.parametrize(
+    "makeflags,expected",
+    [
+        ("", None),
+        ("-j4", None),
+        (" -j4 --jobserver-auth=3,4", (3, 4)),
+        ("-j4 --jobserver-fds=5,6 -j", (5, 6)),
+        ("-j4 --jobserver-auth=fifo:/tmp/GMfifo1", "/tmp/GMfifo1"),
+        ("--jobserver-auth=-2,-2", None),
+        ("--jobserver-auth=invalid", None),
+    ],
+)
+def test_parse_makeflags(makeflags: str, expected):
+    """Test."""
+    assert parse_makeflags(makeflags) == expected
+
+
+def test_acquire_release(monkeypatch: pytest.MonkeyPatch):
+    """Test."""
+    monkeypatch.setenv("MAKEFLAGS", "")
+    jobserver = JobServer.create(3)
+    assert os.environ["MAKEFLAGS"].startswith("-j3 --jobserver-auth=")
+
+    tokens = [jobserver.try_acquire(), jobserver.try_acquire()]
+    assert tokens == [JobServer.TOKEN, JobServer.TOKEN]
+    assert jobserver.try_acquire() is None
+
+    jobserver.release(tokens.pop())
+    assert jobserver.try_acquire() == JobServer.TOKEN
+
+    # Connect like a child process would.
+    other = JobServer.from_makeflags(os.environ["MAKEFLAGS"])
+    assert other.try_acquire() is None
+    jobserver.release()
+    assert other.try_acquire() == JobServer.TOKEN
+
+
+def test_limit_parallel(monkeypatch: pytest.MonkeyPatch):
+    """Test."""
+    monkeypatch.setenv("MAKEFLAGS", "")
+    app = SimpleNamespace(parallel=4)
+    jobserver = JobServer.create(3, app.parallel)
+
+    jobserver.limit_parallel(app)
+    assert app.parallel == 3
+    assert len(jobserver.held) == 2
+    assert jobserver.try_acquire() is None
+
+    jobserver.release_held()
+    assert not jobserver.held
+    token = jobserver.try_acquire()
+    jobserver.limit_parallel(app)
+    assert app.parallel == 2
+
+    jobserver.release(token)
+    jobserver.forked()
+    assert not jobserver.held
+
+
+@pytest.mark.parametrize("makeflags", [None, "-k"])
+def test_close(monkeypatch: pytest.MonkeyPatch, makeflags: str):
+    """Test."""
+    if makeflags is None:
+        monkeypatch.delenv("MAKEFLAGS", raising=False)
+    else:
+        monkeypatch.setenv("MAKEFLAGS", makeflags)
+    jobserver = JobServer.create(3)
+    assert "--jobserver-auth=" in os.environ["MAKEFLAGS"]
+    fds = list(jobserver.owned_fds)
+    assert jobserver.read_fd in fds and jobserver.write_fd in fds
+
+    jobserver.close()
+    assert os.environ.get("MAKEFLAGS") == makeflags
+    for fd in fds:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+    # Jobservers provided by make are left alone.
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setenv("MAKEFLAGS", f"-j2 --jobserver-auth={read_fd},{write_fd}")
+    jobserver = JobServer.from_makeflags(os.environ["MAKEFLAGS"])
+    jobserver.close()
+    assert os.environ["MAKEFLAGS"] == f"-j2 --jobserver-auth={read_fd},{write_fd}"
+    os.fstat(read_fd)
+    os.fstat(write_fd)
+    os.close(read_fd)
+    os.close(write_fd)
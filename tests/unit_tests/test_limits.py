@@ -0,0 +1,55 @@
+"""Tests."""
+import os
+import sys
+
+import pytest
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme.limits import resolve_limit, set_memory_limit
+from sphinx_multi_theme.utils import decode_wait_status, is_memory_error
+
+
+def test_resolve_limit():
+    """Test."""
+    assert resolve_limit(None, "a", "name") is None
+    assert resolve_limit(10, "a", "name") == 10
+    assert resolve_limit(2.5, "a", "name") == 2.5
+    assert resolve_limit({"a": 5}, "a", "name") == 5
+    assert resolve_limit({"a": 5}, "b", "name") is None
+    assert resolve_limit({"a": 5, "*": 1}, "b", "name") == 1
+
+    for invalid in (0, -1, "10", True, {"a": "x"}):
+        with pytest.raises(SphinxError) as exc:
+            resolve_limit(invalid, "a", "multi_theme_timeout")
+        assert exc.value.args[0].startswith("Invalid value for multi_theme_timeout: ")
+
+
+def test_is_memory_error():
+    """Test."""
+    assert not is_memory_error(None)
+    assert not is_memory_error(RuntimeError())
+    assert is_memory_error(MemoryError())
+
+    try:
+        try:
+            raise MemoryError()
+        except MemoryError as inner:
+            raise RuntimeError("wrapped") from inner
+    except RuntimeError as exc:
+        assert is_memory_error(exc)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or sys.platform == "darwin", reason="RLIMIT_AS not enforced")
+def test_set_memory_limit():
+    """Test in a forked child so the limit doesn't affect pytest."""
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            set_memory_limit(512)
+            bytearray(1024 * 1024 * 1024)
+        except MemoryError:
+            status = 3
+        finally:
+            os._exit(status)  # noqa pylint: disable=protected-access
+    assert decode_wait_status(os.waitpid(pid, 0)[1]) == 3
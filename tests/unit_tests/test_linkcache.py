@@ -0,0 +1,89 @@
+"""Tests."""
+import os
+import time
+from pathlib import Path
+
+import pytest
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme import linkcache
+from sphinx_multi_theme.linkcache import LinkCache, resolve_ttls, split_uri
+
+
+def test_resolve_ttls():
+    """Test."""
+    assert resolve_ttls(None) == linkcache.DEFAULT_TTLS
+    assert resolve_ttls({"broken": 60})["broken"] == 60
+    assert resolve_ttls({"broken": 60})["ok"] == linkcache.DEFAULT_TTLS["ok"]
+    for value in ({"working": 60}, {"ok": -1}, {"ok": True}, {"ok": "1d"}):
+        with pytest.raises(SphinxError):
+            resolve_ttls(value)
+
+
+def test_split_uri():
+    """Test."""
+    assert split_uri("https://example.com/a") == ("https://example.com/a", "")
+    assert split_uri("https://example.com/a#b") == ("https://example.com/a", "b")
+
+
+def test_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test."""
+    path = str(tmp_path / "sub" / "links.sqlite")
+    ttls = {"broken": 10, "ok": 100, "redirect": 0}
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    cache = LinkCache(path, ttls)
+    assert cache.get("https://a") is None
+    cache.put("https://a", "working", "", 0)
+    cache.put("https://a#x", "broken", "404 Client Error", 404)
+    cache.put("https://r", "redirected", "https://r/new", 301)  # TTL 0.
+    cache.put("mailto:a@b", "unchecked", "", 0)
+    assert cache.get("https://a") is None  # Not saved yet.
+    cache.save()
+    cache.close()
+
+    cache = LinkCache(path, ttls)
+    assert cache.get("https://a") == ("working", "", 0)
+    assert cache.get("https://a#x") == ("broken", "404 Client Error", 404)
+    assert cache.get("https://a#y") is None
+    assert cache.get("https://r") is None
+    assert cache.get("mailto:a@b") is None
+    now[0] += 50
+    assert cache.get("https://a") == ("working", "", 0)
+    assert cache.get("https://a#x") is None  # Expired.
+    assert (cache.hits, cache.misses) == (3, 4)
+
+    now[0] += 100
+    cache.save()  # Drops entries older than the longest TTL.
+    assert cache.connection.execute("SELECT COUNT(*) FROM links").fetchone()[0] == 0
+    cache.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork().")
+def test_concurrent_writers(tmp_path: Path):
+    """Forked processes saving to the same cache must not lose each other's results."""
+    path = str(tmp_path / "links.sqlite")
+    LinkCache(path, linkcache.DEFAULT_TTLS).close()
+    pids = []
+    for i in range(4):
+        pid = os.fork()  # pylint: disable=no-member
+        if pid == 0:
+            status = 1
+            try:
+                cache = LinkCache(path, linkcache.DEFAULT_TTLS)
+                for j in range(50):
+                    cache.put(f"https://example.com/{i}/{j}", "working", "", 0)
+                    cache.put("https://example.com/shared", "working", "", 0)
+                cache.save()
+                cache.close()
+                status = 0
+            finally:
+                os._exit(status)  # noqa pylint: disable=protected-access
+        pids.append(pid)
+    for pid in pids:
+        assert os.waitpid(pid, 0)[1] == 0
+
+    cache = LinkCache(path, linkcache.DEFAULT_TTLS)
+    assert cache.connection.execute("SELECT COUNT(*) FROM links").fetchone()[0] == 4 * 50 + 1
+    cache.close()
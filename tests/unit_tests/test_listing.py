@@ -0,0 +1,91 @@
+"""Tests."""
+import os
+from pathlib import Path
+
+import pytest
+
+from sphinx_multi_theme.listing import summarize, TreeWalker
+
+
+@pytest.fixture(name="outdir")
+def fixture_outdir(tmp_path: Path) -> Path:
+    """Create an output directory with a theme subdirectory."""
+    outdir = tmp_path / "html"
+    for name, size in (
+        ("_static/css/b.css", 300),
+        ("_static/a.js", 20),
+        ("theme_a/index.html", 10),
+        ("theme_a/_static/big.js", 1000),
+        ("theme_a/.doctrees/index.doctree", 5000),
+        (".doctrees/environment.pickle", 5000),
+        (".buildinfo", 1),
+        ("index.html", 100),
+    ):
+        (outdir / name).parent.mkdir(parents=True, exist_ok=True)
+        (outdir / name).write_bytes(b"x" * size)
+    return outdir
+
+
+def test_walk(outdir: Path):
+    """Test."""
+    expected = [
+        "📁 html/",
+        "├─📁 .doctrees/",
+        "│ └─📄 environment.pickle",
+        "├─📁 _static/",
+        "│ ├─📁 css/",
+        "│ │ └─📄 b.css",
+        "│ └─📄 a.js",
+        "├─📁 theme_a/",
+        "│ ├─📁 .doctrees/",
+        "│ │ └─📄 index.doctree",
+        "│ ├─📁 _static/",
+        "│ │ └─📄 big.js",
+        "│ └─📄 index.html",
+        "├─📄 .buildinfo",
+        "└─📄 index.html",
+    ]
+    assert list(TreeWalker("emoji").walk(str(outdir))) == [line.replace("/", os.sep) for line in expected]
+
+    lines = list(TreeWalker("dash").walk(str(outdir) + os.sep))
+    assert lines[:3] == [f"html{os.sep}", f"|-.doctrees{os.sep}", "| |-environment.pickle"]
+
+
+def test_walk_limits(outdir: Path):
+    """Test."""
+    expected = [
+        "html/",
+        "├─.doctrees/",
+        "├─_static/",
+        "├─theme_a/",
+        "└─... 2 more",
+    ]
+    lines = list(TreeWalker("lines", max_depth=1, max_entries=3).walk(str(outdir)))
+    assert lines == [line.replace("/", os.sep) for line in expected]
+
+    expected = ["html/", "├─.doctrees/", "│ └─environment.pickle", "└─... 4 more"]
+    lines = list(TreeWalker("lines", max_depth=2, max_entries=1).walk(str(outdir)))
+    assert lines == [line.replace("/", os.sep) for line in expected]
+
+
+def test_walk_streams(tmp_path: Path):
+    """Verify directories are read lazily."""
+    (tmp_path / "a").mkdir()
+    lines = TreeWalker("dash").walk(str(tmp_path / "a"))
+    assert next(lines) == f"a{os.sep}"
+    (tmp_path / "a" / "late.txt").write_text("", encoding="utf8")
+    assert list(lines) == ["|-late.txt"]
+
+
+def test_summarize(outdir: Path):
+    """Test."""
+    primary, theme_a = summarize(str(outdir), [("classic", ""), ("alabaster", "theme_a")], keep=2)
+
+    assert (primary.name, primary.files, primary.size) == ("classic", 4, 421)
+    assert sorted(primary.largest, reverse=True) == [(300, os.path.join("_static", "css", "b.css")), (100, "index.html")]
+    assert (theme_a.name, theme_a.subdir, theme_a.files, theme_a.size) == ("alabaster", "theme_a", 2, 1010)
+    assert sorted(theme_a.largest, reverse=True) == [(1000, os.path.join("_static", "big.js")), (10, "index.html")]
+
+    primary, theme_a = summarize(str(outdir), [("classic", ""), ("alabaster", "theme_a")], keep=0)
+    assert primary.files == 4
+    assert not primary.largest
@@ -0,0 +1,36 @@
+"""Tests."""
+import os
+from io import StringIO
+
+from sphinx_multi_theme.logmux import LogMultiplexer, PipeStream, STREAM_STATUS, STREAM_WARNING
+
+
+def test():
+    """Test."""
+    status, warning = StringIO(), StringIO()
+    logs = LogMultiplexer(status, warning)
+    read_fd1, write_fd1 = os.pipe()
+    read_fd2, write_fd2 = os.pipe()
+    source1 = logs.add(read_fd1, "[one] ")
+    source2 = logs.add(read_fd2, "[two] ")
+
+    PipeStream(write_fd1, STREAM_STATUS).write("reading sources... ")
+    PipeStream(write_fd2, STREAM_WARNING).write("WARNING: first\nWARNING: sec")
+    PipeStream(write_fd1, STREAM_STATUS).write("done\nlast line without newline")
+    os.write(write_fd2, b"not json\n")
+    PipeStream(write_fd2, STREAM_WARNING).write("ond\n")
+    os.close(write_fd1)
+    os.close(write_fd2)
+    logs.drain(source1)
+    logs.drain(source2)
+    logs.stop()
+
+    assert source1.closed.is_set()
+    assert sorted(status.getvalue().splitlines()) == [  # Lines of different children may interleave.
+        "[one] last line without newline",
+        "[one] reading sources... done",
+        "[two] not json",
+    ]
+    assert warning.getvalue() == "[two] WARNING: first\n[two] WARNING: second\n"
+    assert not logs.sources
+    assert logs.thread is None
@@ -0,0 +1,67 @@
+"""Tests."""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from sphinx_multi_theme import manifest
+from sphinx_multi_theme.manifest import iter_manifest, write_manifest
+
+
+@pytest.fixture(name="outdir")
+def fixture_outdir(tmp_path: Path) -> Path:
+    """Create an output directory with a theme subdirectory."""
+    outdir = tmp_path / "html"
+    for name in (
+        "index.html",
+        "_static/a.js",
+        "theme_a/index.html",
+        "theme_a/.multi_theme_fingerprint",
+        "theme_a/.doctrees/index.doctree",
+        ".doctrees/environment.pickle",
+        "manifest.json",
+    ):
+        (outdir / name).parent.mkdir(parents=True, exist_ok=True)
+        (outdir / name).write_text(name, encoding="utf8")
+    if hasattr(os, "symlink"):
+        (outdir / "theme_a" / "_static").mkdir()
+        (outdir / "theme_a" / "_static" / "a.js").symlink_to(outdir / "_static" / "a.js")
+    return outdir
+
+
+@pytest.mark.parametrize("workers", [1, 32])
+def test_iter_manifest(monkeypatch: pytest.MonkeyPatch, outdir: Path, workers: int):
+    """Test."""
+    monkeypatch.setattr(manifest, "HASH_WORKERS", workers)
+    entries = list(iter_manifest(str(outdir), [("classic", ""), ("alabaster", "theme_a")], str(outdir / "manifest.json")))
+
+    paths = ["index.html", "_static/a.js", "theme_a/index.html"]
+    if hasattr(os, "symlink"):
+        paths.append("theme_a/_static/a.js")
+    assert [e["path"] for e in entries] == paths
+    assert [e["theme"] for e in entries] == ["classic", "classic"] + ["alabaster"] * (len(paths) - 2)
+
+    entry = entries[0]
+    assert entry["size"] == len("index.html")
+    assert entry["mtime"] == os.stat(outdir / "index.html").st_mtime
+    assert entry["sha256"] == hashlib.sha256(b"index.html").hexdigest()
+    if hasattr(os, "symlink"):
+        assert entries[3]["sha256"] == entries[1]["sha256"]
+
+
+def test_write_manifest(tmp_path: Path):
+    """Test."""
+    entries = [{"path": "a", "size": 1}, {"path": "b", "size": 2}]
+
+    assert write_manifest(str(tmp_path / "out" / "manifest.json"), iter(entries)) == 2
+    assert json.loads((tmp_path / "out" / "manifest.json").read_text(encoding="utf8")) == entries
+
+    assert write_manifest(str(tmp_path / "manifest.ndjson"), iter(entries)) == 2
+    lines = (tmp_path / "manifest.ndjson").read_text(encoding="utf8").splitlines()
+    assert [json.loads(line) for line in lines] == entries
+
+    assert write_manifest(str(tmp_path / "empty.json"), iter([])) == 0
+    assert json.loads((tmp_path / "empty.json").read_text(encoding="utf8")) == []
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["empty.json", "manifest.ndjson", "out"]
@@ -0,0 +1,91 @@
+"""Tests."""
+import os
+from pathlib import Path
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme.memory import cgroup_available, meminfo_available, process_rss
+from sphinx_multi_theme.supervisor import Child, Supervisor
+from sphinx_multi_theme.theme import MultiTheme
+
+MIB = 1024 * 1024
+
+
+def test_meminfo_available(tmp_path: Path):
+    """Test."""
+    path = tmp_path / "meminfo"
+    assert meminfo_available(str(path)) is None
+
+    path.write_text("MemTotal:       8000000 kB\nMemFree:  1000 kB\nMemAvailable:    4000000 kB\n", encoding="utf8")
+    assert meminfo_available(str(path)) == 4000000 * 1024
+
+    path.write_text("MemTotal:       8000000 kB\n", encoding="utf8")
+    assert meminfo_available(str(path)) is None
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_cgroup_available(tmp_path: Path, version: int):
+    """Test."""
+    proc_cgroup = tmp_path / "cgroup"
+    root = tmp_path / "sys_fs_cgroup"
+    if version == 2:
+        proc_cgroup.write_text("0::/ci/job\n", encoding="utf8")
+        directory, limit_name, usage_name = root / "ci" / "job", "memory.max", "memory.current"
+    else:
+        proc_cgroup.write_text("5:cpu:/\n4:memory:/ci/job\n", encoding="utf8")
+        directory, limit_name, usage_name = root / "memory" / "ci" / "job", "memory.limit_in_bytes", "memory.usage_in_bytes"
+    assert cgroup_available(str(root), str(proc_cgroup)) is None
+
+    directory.mkdir(parents=True)
+    (directory / limit_name).write_text("max\n" if version == 2 else "9223372036854771712\n", encoding="utf8")
+    (directory / usage_name).write_text(f"{1024 * MIB}\n", encoding="utf8")
+    assert cgroup_available(str(root), str(proc_cgroup)) is None  # Unlimited.
+
+    (directory / limit_name).write_text(f"{8192 * MIB}\n", encoding="utf8")
+    assert cgroup_available(str(root), str(proc_cgroup)) == 7168 * MIB
+
+    # Namespaced: the cgroup path from /proc/self/cgroup isn't visible, the limit is at the top.
+    top = root / "memory" if version == 1 else root
+    for path in directory.iterdir():
+        path.rename(top / path.name)
+    assert cgroup_available(str(root), str(proc_cgroup)) == 7168 * MIB
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="Requires /proc")
+def test_process_rss():
+    """Test."""
+    assert process_rss(os.getpid()) > MIB
+    assert process_rss(-1) is None
+
+
+def test_memory_shortfall(monkeypatch: MonkeyPatch):
+    """Test."""
+    themes = MultiTheme(["a", "b", "c"]).themes
+    available = [4096 * MIB]
+    monkeypatch.setattr("sphinx_multi_theme.supervisor.available_memory", lambda: available[0])
+    monkeypatch.setattr("sphinx_multi_theme.supervisor.process_rss", lambda pid: 100 * MIB)
+
+    # Disabled.
+    supervisor = Supervisor(None, 3)
+    supervisor.running[1] = Child(1, themes[1], 0.0)
+    assert supervisor.memory_shortfall(themes[2]) == 0
+
+    # Nothing running, always admit.
+    supervisor = Supervisor(None, 3, min_free_memory=512)
+    supervisor.predicted_rss = {"theme_b": 1000, "theme_c": 2000}
+    assert supervisor.memory_shortfall(themes[2]) == 0
+
+    # b is at 100 MiB and grows to 1000 MiB, c needs 2000 MiB, plus 512 MiB free: 3412 MiB.
+    supervisor.running[1] = Child(1, themes[1], 0.0)
+    assert supervisor.memory_shortfall(themes[2]) == 0
+    available[0] = 3000 * MIB
+    assert supervisor.memory_shortfall(themes[2]) == 412 * MIB
+
+    # Unknown themes are predicted from the current process's RSS.
+    supervisor.predicted_rss = {}
+    assert supervisor.memory_shortfall(themes[2]) == 0
+
+    with pytest.raises(SphinxError):
+        Supervisor(None, 3, min_free_memory="512")
@@ -140,8 +140,9 @@ def test_subdir_attrs():
 
     with pytest.raises(SphinxError) as exc:
         MultiTheme(["a", Theme("b", subdir="my_subdir"), Theme("c", subdir="my_subdir")])
-    first = "Theme(name='b', display_name='', subdir='my_subdir', is_active=False)"
-    second = "Theme(name='c', display_name='', subdir='my_subdir', is_active=False)"
+    fields = "own_search_index=False, own_artifacts=False, is_active=False"
+    first = f"Theme(name='b', display_name='', subdir='my_subdir', {fields})"
+    second = f"Theme(name='c', display_name='', subdir='my_subdir', {fields})"
     assert exc.value.args[0] == f"Subdir collision: {first} and {second}"
 
 
@@ -162,3 +163,38 @@ def test_truncate():
     assert len(removed) == 2
     assert removed[0].name == "b"
     assert removed[1].name == "c"
+
+
+def test_indexes():
+    """Test."""
+    themes = MultiTheme(["a", "b", Theme("c", subdir="custom"), "b"])
+
+    assert themes["b"] is themes[3]  # Last one wins for duplicate names.
+    assert themes.by_name == {"a": themes[0], "b": themes[3], "c": themes[2]}
+    assert themes.by_subdir == {"": themes[0], "theme_b": themes[1], "custom": themes[2], "theme_b2": themes[3]}
+    with pytest.raises(KeyError):
+        themes["d"]  # pylint: disable=pointless-statement
+
+    assert themes.prefixes[""] == {"": "", "theme_b": "theme_b", "custom": "custom", "theme_b2": "theme_b2"}
+    assert themes.prefixes["custom"] == {"": "..", "theme_b": "../theme_b", "custom": "", "theme_b2": "../theme_b2"}
+
+    assert themes.relative_prefix("custom") == "custom"
+    assert themes.relative_prefix("") == ""
+    assert themes.relative_prefix("custom", from_subdir="theme_b") == "../custom"
+    themes.set_active(2)
+    assert themes.relative_prefix("custom") == ""
+    assert themes.relative_prefix("") == ".."
+    assert themes.relative_prefix("theme_b2") == "../theme_b2"
+    themes.set_active(-1)
+    assert themes.active is themes[3]
+    assert themes.relative_prefix("custom") == "../custom"
+
+    themes.truncate()
+    assert themes.active is themes[0]
+    assert themes.by_name == {"a": themes[0]}
+    assert themes.by_subdir == {"": themes[0]}
+    assert themes.prefixes == {"": {"": ""}}
+
+    themes_pickled = pickle.loads(pickle.dumps(themes))
+    assert themes_pickled.by_name == themes.by_name
+    assert themes_pickled.prefixes == themes.prefixes
@@ -0,0 +1,34 @@
+"""Tests."""
+import sys
+
+import pytest
+
+from sphinx_multi_theme.utils import preload_themes, theme_entry_points
+
+
+def test(monkeypatch: pytest.MonkeyPatch):
+    """Test."""
+    monkeypatch.delitem(sys.modules, "sphinx_rtd_theme", raising=False)
+
+    assert preload_themes(["classic", "sphinx_rtd_theme", "alabaster"]) == ["sphinx_rtd_theme", "alabaster"]
+    assert "sphinx_rtd_theme" in sys.modules
+    assert "jinja2.ext" in sys.modules
+
+    assert preload_themes(["classic", "does_not_exist"]) == []
+
+
+@pytest.mark.parametrize("api", ["dict", "pkg_resources"])
+def test_entry_points_fallback(monkeypatch: pytest.MonkeyPatch, api: str):
+    """Verify themes are found with the entry points APIs of older Pythons."""
+    if api == "dict":
+        # Python 3.8 and 3.9 return all groups in a dict and don't accept the group argument.
+        groups = {"sphinx.html_themes": list(theme_entry_points().values())}
+        monkeypatch.setattr("sphinx_multi_theme.utils.entry_points", lambda: groups)
+    else:
+        pytest.importorskip("pkg_resources")
+        monkeypatch.setattr("sphinx_multi_theme.utils.entry_points", None)  # Python 3.6 and 3.7.
+    monkeypatch.delitem(sys.modules, "sphinx_rtd_theme", raising=False)
+
+    assert "sphinx_rtd_theme" in theme_entry_points()
+    assert preload_themes(["classic", "sphinx_rtd_theme"]) == ["sphinx_rtd_theme"]
+    assert "sphinx_rtd_theme" in sys.modules
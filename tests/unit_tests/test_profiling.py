@@ -0,0 +1,14 @@
+"""Tests."""
+import os
+
+from sphinx_multi_theme.profiling import ThemeProfiler
+from sphinx_multi_theme.theme import MultiTheme
+
+
+def test_paths():
+    """Verify themes with duplicate names get their own profile files."""
+    multi_theme = MultiTheme(["classic", "alabaster", "alabaster", "classic"])
+
+    paths = [os.path.basename(ThemeProfiler("profiles", t).path) for t in multi_theme]
+
+    assert paths == ["primary.prof", "theme_alabaster.prof", "theme_alabaster2.prof", "theme_classic.prof"]
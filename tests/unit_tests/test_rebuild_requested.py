@@ -0,0 +1,30 @@
+"""Tests."""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from sphinx_multi_theme.fingerprint import rebuild_requested
+
+
+@pytest.mark.parametrize(
+    "argv,expected",
+    [
+        (["docs", "docs/_build/html"], False),
+        (["-a", "docs", "docs/_build/html"], True),
+        (["-E", "docs", "docs/_build/html"], True),
+        (["-T", "-a", "-j", "auto", "docs", "docs/_build/html", "index.rst"], True),
+        (["-a", "docs", "docs/_build/other"], False),  # Not this output directory.
+        (["-M", "html", "docs", "docs/_build", "-E"], True),
+        (["-M", "html", "docs", "docs/_build"], False),
+        (["serve-builds", "/tmp/docs.sock", "--", "-a", "docs", "docs/_build/html"], False),
+        (["-q", "tests", "-p", "no:cacheprovider"], False),
+        ([], False),
+    ],
+)
+def test(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, argv: list, expected: bool):
+    """Test."""
+    monkeypatch.chdir(tmp_path)
+    app = SimpleNamespace(outdir=str(tmp_path / "docs" / "_build" / "html"))
+
+    assert rebuild_requested(app, argv) is expected
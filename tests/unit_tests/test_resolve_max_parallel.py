@@ -0,0 +1,20 @@
+"""Tests."""
+import os
+
+import pytest
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme.supervisor import resolve_max_parallel
+
+
+def test():
+    """Test."""
+    assert resolve_max_parallel(1) == 1
+    assert resolve_max_parallel(4) == 4
+    assert resolve_max_parallel("4") == 4
+    assert resolve_max_parallel(0) == 1
+    assert resolve_max_parallel("auto") == (os.cpu_count() or 1)
+
+    with pytest.raises(SphinxError) as exc:
+        resolve_max_parallel("many")
+    assert exc.value.args[0] == "Invalid value for multi_theme_max_parallel: 'many'"
@@ -0,0 +1,41 @@
+"""Tests."""
+import json
+import resource
+from pathlib import Path
+
+from sphinx_multi_theme.resources import format_usage_table, ResourceUsage, save_usage
+
+
+def test_from_rusage_table(tmp_path: Path):
+    """Test."""
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    usage = ResourceUsage.from_rusage("sphinx_rtd_theme", "theme_sphinx_rtd_theme", 0, 1.234, rusage)
+    assert usage.wall == 1.234
+    assert usage.user == rusage.ru_utime
+    assert usage.max_rss_mib > 0
+    assert usage.minor_faults == rusage.ru_minflt
+
+    failed = ResourceUsage("a", "theme_a", 1, 0.5, 0.25, 0.125, 12.0, 100, 2, 8, 16)
+    lines = format_usage_table([usage, failed])
+    assert len(lines) == 3
+    assert lines[0].startswith("theme".ljust(len("sphinx_rtd_theme") + 2) + "status")
+    assert len({len(line) for line in lines}) == 1
+    assert lines[2].split() == ["a", "1", "0.50", "0.25", "0.12", "12.0", "100", "2", "8", "16"]
+
+    path = tmp_path / "a" / "resources.json"
+    save_usage(str(path), [failed])
+    assert json.loads(path.read_text(encoding="utf8")) == [
+        {
+            "name": "a",
+            "subdir": "theme_a",
+            "exit_status": 1,
+            "wall": 0.5,
+            "user": 0.25,
+            "system": 0.125,
+            "max_rss_mib": 12.0,
+            "minor_faults": 100,
+            "major_faults": 2,
+            "block_in": 8,
+            "block_out": 16,
+        }
+    ]
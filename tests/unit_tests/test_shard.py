@@ -0,0 +1,119 @@
+"""Tests."""
+import json
+import os
+from pathlib import Path
+
+import pytest
+from sphinx.errors import SphinxError
+
+from sphinx_multi_theme.__main__ import main
+from sphinx_multi_theme.shard import merge, parse_shard, shard_of
+from sphinx_multi_theme.utils import FINGERPRINT_FILE_NAME, SHARD_MANIFEST_FILE_NAME
+
+THEMES = ["", "theme_a", "theme_b", "theme_c"]
+
+
+def test_parse_shard():
+    """Test."""
+    assert parse_shard(None) is None
+    assert parse_shard("") is None
+    assert parse_shard("1/1") == (1, 1)
+    assert parse_shard("2/4") == (2, 4)
+
+    for invalid in ("0/4", "5/4", "2", "a/b", "1/2/3", "-1/2"):
+        with pytest.raises(SphinxError) as exc:
+            parse_shard(invalid)
+        assert exc.value.args[0] == f"Invalid shard {invalid!r}, expected e.g. 2/4"
+
+
+def test_shard_of():
+    """Test."""
+    assert [shard_of(i, 1) for i in range(4)] == [1, 1, 1, 1]
+    assert [shard_of(i, 3) for i in range(5)] == [1, 2, 3, 1, 2]
+
+
+def make_shard(path: Path, number: int, total: int, themes=None) -> Path:
+    """Create a fake shard output directory."""
+    themes = THEMES if themes is None else themes
+    built = [s for i, s in enumerate(themes) if shard_of(i, total) == number]
+    path.mkdir()
+    (path / "index.html").write_text(f"primary from {number}", encoding="utf8")
+    (path / ".doctrees").mkdir()
+    (path / ".doctrees" / "environment.pickle").write_text("", encoding="utf8")
+    for subdir in themes[1:]:
+        (path / subdir / "_static").mkdir(parents=True)  # Partial directories of themes owned by other shards.
+        if subdir in built:
+            (path / subdir / "index.html").write_text(f"{subdir} from {number}", encoding="utf8")
+            (path / subdir / "_static" / "a.css").write_text("", encoding="utf8")
+            (path / subdir / FINGERPRINT_FILE_NAME).write_text("", encoding="utf8")
+    manifest = {"shard": number, "total": total, "themes": themes, "built": built}
+    (path / SHARD_MANIFEST_FILE_NAME).write_text(json.dumps(manifest), encoding="utf8")
+    return path
+
+
+def listing(path: Path):
+    """List files relative to path."""
+    return sorted(str(p.relative_to(path)) for p in path.rglob("*") if p.is_file())
+
+
+def test_merge(tmp_path: Path):
+    """Test."""
+    shards = [str(make_shard(tmp_path / f"shard{i}", i, 2)) for i in (2, 1)]
+    outdir = tmp_path / "html"
+
+    owners = merge(shards, str(outdir))
+
+    assert owners == {"": shards[1], "theme_b": shards[1], "theme_a": shards[0], "theme_c": shards[0]}
+    assert (outdir / "index.html").read_text(encoding="utf8") == "primary from 1"
+    assert (outdir / "theme_a" / "index.html").read_text(encoding="utf8") == "theme_a from 2"
+    assert (outdir / "theme_b" / "index.html").read_text(encoding="utf8") == "theme_b from 1"
+    assert listing(outdir) == [
+        "index.html",
+        os.path.join("theme_a", "_static", "a.css"),
+        os.path.join("theme_a", "index.html"),
+        os.path.join("theme_b", "_static", "a.css"),
+        os.path.join("theme_b", "index.html"),
+        os.path.join("theme_c", "_static", "a.css"),
+        os.path.join("theme_c", "index.html"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "numbers, message",
+    [
+        ([1], "Shards missing: [2, 3], duplicated: [] (of 3)"),
+        ([1, 2, 2], "Shards missing: [3], duplicated: [2] (of 3)"),
+    ],
+)
+def test_merge_incomplete(tmp_path: Path, numbers, message: str):
+    """Test."""
+    shards = [str(make_shard(tmp_path / f"dir{i}", n, 3)) for i, n in enumerate(numbers)]
+    with pytest.raises(SphinxError) as exc:
+        merge(shards, str(tmp_path / "html"))
+    assert exc.value.args[0] == message
+    assert not (tmp_path / "html").exists()
+
+
+def test_merge_invalid(tmp_path: Path):
+    """Test."""
+    shard1 = str(make_shard(tmp_path / "shard1", 1, 2))
+    shard2 = make_shard(tmp_path / "shard2", 2, 2, themes=["", "theme_a", "theme_x"])
+    with pytest.raises(SphinxError) as exc:
+        merge([shard1, str(shard2)], str(tmp_path / "html"))
+    assert exc.value.args[0] == f"Shard {shard2} is from a different build than {shard1}"
+
+    (shard2 / SHARD_MANIFEST_FILE_NAME).unlink()
+    with pytest.raises(SphinxError) as exc:
+        merge([shard1, str(shard2)], str(tmp_path / "html"))
+    assert exc.value.args[0].startswith(f"Invalid or missing shard manifest {shard2 / SHARD_MANIFEST_FILE_NAME}: ")
+
+
+def test_main(tmp_path: Path, capsys):
+    """Test."""
+    shards = [str(make_shard(tmp_path / f"shard{i}", i, 2)) for i in (1, 2)]
+
+    assert main(["merge", str(tmp_path / "html"), *shards]) == 0
+    assert "Merged theme_a from" in capsys.readouterr().out
+
+    assert main(["merge", str(tmp_path / "html2"), shards[0]]) == 1
+    assert "Error: Shards missing: [2], duplicated: [] (of 2)" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+"""Tests."""
+import os
+import signal
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sphinx_multi_theme.supervisor import Child, die_with_parent, Supervisor
+from sphinx_multi_theme.theme import MultiTheme
+
+
+def fork_sleeping_child(seconds: float) -> int:
+    """Fork a child process that exits after sleeping.
+
+    :param seconds: Seconds to sleep.
+
+    :return: Child process ID.
+    """
+    pid = os.fork()  # pylint: disable=no-member
+    if pid == 0:
+        time.sleep(seconds)
+        os._exit(0)  # noqa pylint: disable=protected-access
+    return pid
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGCHLD"), reason="Requires SIGCHLD")
+def test_wait_blocks(monkeypatch: pytest.MonkeyPatch):
+    """Test."""
+    themes = MultiTheme(["a", "b", "c"]).themes
+    supervisor = Supervisor(SimpleNamespace(emit=lambda *_: None), 2)
+    polls = []
+    poll = supervisor.poll
+    monkeypatch.setattr(supervisor, "poll", lambda: polls.append(None) or poll())
+
+    for theme, seconds in zip(themes[1:], (0.3, 0.6)):
+        pid = fork_sleeping_child(seconds)
+        supervisor.running[pid] = Child(pid, theme, time.monotonic())
+    supervisor.wait(0)
+
+    assert not supervisor.running
+    assert sorted(supervisor.actual) == ["theme_b", "theme_c"]
+    assert len(polls) < 5  # Polling every POLL_INTERVAL would take about 7.
+    assert signal.getsignal(signal.SIGCHLD) == signal.SIG_DFL
+    assert supervisor.wakeup is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork().")
+def test_die_with_parent_already_dead():
+    """Verify a child exits right away if its parent died before it started watching."""
+    pid = os.fork()  # pylint: disable=no-member
+    if pid == 0:
+        die_with_parent(os.getpid())  # Not the parent, like a parent PID captured after the real parent died.
+        time.sleep(10)
+        os._exit(0)  # noqa pylint: disable=protected-access
+    start = time.monotonic()
+    _, status = os.waitpid(pid, 0)
+
+    assert time.monotonic() - start < 5
+    assert os.WIFSIGNALED(status) or os.WEXITSTATUS(status) == 1
@@ -16,3 +16,7 @@ def test(monkeypatch: MonkeyPatch):
     exit_status.clear()
     terminate_forked_build(mock_app, RuntimeError())
     assert exit_status == [1]
+
+    exit_status.clear()
+    terminate_forked_build(mock_app, MemoryError())
+    assert exit_status == [3]
@@ -22,13 +22,17 @@ def test():
     assert theme.name == "name"
     assert theme.display_name == "Name"
     assert theme.subdir == "subdir"
+    assert theme.own_search_index is False
+    assert theme.own_artifacts is False
     assert theme.is_active is False
     assert theme.is_primary is False
 
     with pytest.raises(AttributeError):
         theme.is_primary = True  # noqa
 
-    assert repr(theme) == "Theme(name='name', display_name='Name', subdir='subdir', is_active=False)"
+    fields = "own_search_index=False, own_artifacts=False, is_active=False"
+    expected = f"Theme(name='name', display_name='Name', subdir='subdir', {fields})"
+    assert repr(theme) == expected
 
     theme_pickled = pickle.loads(pickle.dumps(theme))
     assert repr(theme_pickled) == repr(theme)
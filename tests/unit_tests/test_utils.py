@@ -0,0 +1,18 @@
+"""Tests."""
+from sphinx_multi_theme import utils
+
+
+def test_build_finished_priorities():
+    """Parent build-finished handlers must run in a fixed order, so no two may share a priority."""
+    order = [
+        utils.SPHINX_CONNECT_PRIORITY_DUMP_PROFILE,
+        utils.SPHINX_CONNECT_PRIORITY_WAIT_FOR_CHILDREN,
+        utils.SPHINX_CONNECT_PRIORITY_SHARE_SEARCH_INDEX,
+        utils.SPHINX_CONNECT_PRIORITY_SHARE_ARTIFACTS,
+        utils.SPHINX_CONNECT_PRIORITY_DEDUPLICATE_FILES,
+        utils.SPHINX_CONNECT_PRIORITY_SAVE_SHARD_MANIFEST,
+        utils.SPHINX_CONNECT_PRIORITY_WRITE_OUTPUT_MANIFEST,
+        utils.SPHINX_CONNECT_PRIORITY_PRINT_FILES,
+        utils.SPHINX_CONNECT_PRIORITY_TERMINATE_FORKED_BUILD,
+    ]
+    assert order == sorted(set(order))